@@ -0,0 +1,35 @@
+"""
+File content digests
+--------------------
+Streaming SHA-256 of input files, memoized in a caller-owned index keyed
+by resolved path: the hash is only recomputed when size or mtime change.
+Shared by the validation cache (src/stages) and the training caches.
+"""
+
+import hashlib
+from pathlib import Path
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def stream_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_digest(path, index):
+    """Content hash of one file, reusing the hash in `index` while size/mtime match."""
+    path = Path(path)
+    stat = path.stat()
+    key = str(path.resolve())
+
+    entry = index.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    digest = stream_sha256(path)
+    index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    return digest
@@ -2,7 +2,8 @@
 Generate Summary Report for LedgerX FATURA Pipeline
 ---------------------------------------------------
 
-This script loads the processed OCR CSV and generates
+This script reads the statistics sketch of the processed OCR CSV
+(built in one streaming pass if missing or stale) and generates
 a simple summary report with:
 
 - Total invoices processed
@@ -14,10 +15,11 @@ Output is saved to:
     /opt/airflow/reports/summary_report.txt
 """
 
-import pandas as pd
 from datetime import datetime
 from pathlib import Path
 
+from src.stages.stats_sketches import OCR_SPEC, load_or_build
+
 INPUT_FILE = Path("/opt/airflow/data/processed/fatura_ocr.csv")
 OUTPUT_DIR = Path("/opt/airflow/reports")
 OUTPUT_FILE = OUTPUT_DIR / "summary_report.txt"
@@ -33,12 +35,12 @@ def generate_report():
     if not INPUT_FILE.exists():
         raise FileNotFoundError(f"❌ Input file not found: {INPUT_FILE}")
 
-    # Load data
-    df = pd.read_csv(INPUT_FILE)
+    # Load sketch instead of the full OCR corpus
+    sketch = load_or_build(INPUT_FILE, OCR_SPEC)
 
-    total_rows = len(df)
-    missing_ocr = df['ocr_text'].isna().sum()
-    avg_text_length = df['ocr_text'].astype(str).apply(len).mean()
+    total_rows = sketch.rows
+    missing_ocr = sketch.null_counts.get("ocr_text", 0)
+    avg_text_length = sketch.avg_text_length("ocr_text")
 
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
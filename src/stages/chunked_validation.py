@@ -0,0 +1,81 @@
+"""
+Chunked / sampled validation helpers
+------------------------------------
+Expectation results reduced to mergeable counts, so a file can be
+validated one chunk at a time, and bottom-k sampling for bounded
+pre-flight checks. No Great Expectations import: the stage modules
+(src/stages/run_great_expectations.py) run the expectations themselves.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+MAX_UNEXPECTED_SAMPLES = 20
+
+
+# ===============================
+# Mergeable results
+# ===============================
+
+def summarize_result(result):
+    """Reduce a GE validation result to the mergeable fields we care about."""
+    stats = result.result or {}
+    return {
+        "success": bool(result.success),
+        "element_count": int(stats.get("element_count", 0) or 0),
+        "unexpected_count": int(stats.get("unexpected_count", 0) or 0),
+        "partial_unexpected_list": list(stats.get("partial_unexpected_list", []) or []),
+    }
+
+
+def merge_results(left, right):
+    """Combine two partial results of the same expectation."""
+    if left is None:
+        return right
+
+    samples = left["partial_unexpected_list"] + right["partial_unexpected_list"]
+    return {
+        "success": left["success"] and right["success"],
+        "element_count": left["element_count"] + right["element_count"],
+        "unexpected_count": left["unexpected_count"] + right["unexpected_count"],
+        "partial_unexpected_list": samples[:MAX_UNEXPECTED_SAMPLES],
+    }
+
+
+def finalize_result(merged):
+    total = merged["element_count"]
+    merged["unexpected_percent"] = (
+        100.0 * merged["unexpected_count"] / total if total else 0.0
+    )
+    return merged
+
+
+# ===============================
+# Sampling
+# ===============================
+
+def required_sample_size(epsilon, delta):
+    """Hoeffding bound: rows needed so |observed − true| failure rate ≤ epsilon."""
+    return int(math.ceil(math.log(2.0 / delta) / (2.0 * epsilon ** 2)))
+
+
+def draw_uniform_sample(chunks, n, seed=42, columns=None):
+    """
+    Bottom-k sampling across chunks: every row gets a random key and the n
+    smallest keys are kept, which is a uniform sample without replacement
+    while holding at most one chunk + n rows in memory.
+    """
+    rng = np.random.default_rng(seed)
+    kept = None
+
+    for chunk in chunks:
+        chunk = chunk.assign(_sample_key=rng.random(len(chunk)))
+        kept = chunk if kept is None else pd.concat([kept, chunk])
+        if len(kept) > n:
+            kept = kept.nsmallest(n, "_sample_key")
+
+    if kept is None:
+        return pd.DataFrame(columns=columns)
+    return kept.drop(columns="_sample_key").reset_index(drop=True)
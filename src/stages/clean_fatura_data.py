@@ -2,6 +2,8 @@ import pandas as pd
 from pathlib import Path
 from loguru import logger
 
+from src.stages.stats_sketches import CLEANED_SPEC, DatasetSketch, save_sketch_for
+
 IN_FILE = Path("/opt/airflow/data/processed/fatura_structured.csv")
 OUT_FILE = Path("/opt/airflow/data/processed/fatura_cleaned.csv")
 
@@ -30,5 +32,8 @@ def main():
     df.to_csv(OUT_FILE, index=False)
     logger.info(f"✅ Cleaned file saved → {OUT_FILE}")
 
+    # Sketch while the data is in memory so reports never rescan the file
+    save_sketch_for(OUT_FILE, DatasetSketch(**CLEANED_SPEC).update(df))
+
 if __name__ == "__main__":
     main()
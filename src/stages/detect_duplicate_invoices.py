@@ -0,0 +1,312 @@
+"""
+Duplicate Invoice Detection for LedgerX FATURA
+----------------------------------------------
+Flags invoices that were already submitted, possibly under a different scan.
+
+- Exact layer: normalized (invoice_number, vendor, amount, date) key
+- Fuzzy layer: blocking keys that tolerate one misread field, e.g. same
+  vendor + amount + date with a different invoice number
+
+Keys are 64-bit hashes kept in a persistent on-disk index made of sorted
+segments. A new batch is checked with binary searches over memory-mapped
+segments, so history is never reloaded. Every row gets a global ordinal;
+a match only counts when it points to an earlier ordinal.
+
+Ordinals are stable per row: a row's identity (its file_name when the
+data has one, else its raw content plus an occurrence number) is stored
+in the same index. Re-running on the rewritten cumulative file, or on a
+file with rows added or reordered, reuses the ordinals of the rows seen
+before, so they never match their own earlier entries. A row whose raw
+values changed upstream is a new row.
+
+Outputs:
+    /opt/airflow/data/processed/fatura_duplicates.csv   (row-aligned flags)
+    /opt/airflow/reports/duplicate_invoices.json        (summary)
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+INPUT_FILE = Path("/opt/airflow/data/processed/fatura_cleaned.csv")
+INDEX_DIR = Path("/opt/airflow/data/index/invoice_duplicates")
+FLAGS_FILE = Path("/opt/airflow/data/processed/fatura_duplicates.csv")
+REPORT_FILE = Path("/opt/airflow/reports/duplicate_invoices.json")
+
+# Bump when normalization changes so batches are re-keyed
+KEY_VERSION = 1
+INDEX_FORMAT = 2   # 2: per-row ordinals (1 reserved ordinals per batch)
+MAX_SEGMENTS = 8
+PLACEHOLDER_DATE = "2000-01-01"
+
+# Fuzzy blocking keys: each one drops a single field that OCR may misread
+FUZZY_KEYS = {
+    "vendor_amount_date": ["vendor", "amount", "date"],
+    "number_vendor_amount": ["number", "vendor", "amount"],
+    "number_vendor_date": ["number", "vendor", "date"],
+}
+
+
+# ===============================
+# Normalization
+# ===============================
+
+def normalize_invoice_number(s):
+    s = s.astype("string").str.upper().str.replace(r"[^A-Z0-9]", "", regex=True)
+    s = s.str.lstrip("0")
+    return s.where(s.str.len() > 0)
+
+
+def normalize_vendor(s):
+    s = s.astype("string").str.lower().str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+    s = s.where(s.str.len() > 0)
+    return s.where(s != "unknown vendor")
+
+
+def normalize_amount(s):
+    cents = (pd.to_numeric(s, errors="coerce") * 100).round()
+    # 0.0 is the cleaning placeholder for a missing amount
+    return cents.where(cents > 0).astype("Int64").astype("string")
+
+
+def normalize_date(s):
+    d = pd.to_datetime(s, errors="coerce").dt.strftime("%Y-%m-%d").astype("string")
+    return d.where(d != PLACEHOLDER_DATE)
+
+
+def normalize(df):
+    parts = pd.DataFrame({
+        "number": normalize_invoice_number(df["invoice_number"]),
+        "vendor": normalize_vendor(df["vendor_name"]),
+        "amount": normalize_amount(df["total_amount"]),
+        "date": normalize_date(df["invoice_date"]),
+    })
+    # Generic tokens such as "INVOICE" are not identifying on their own
+    parts["number"] = parts["number"].where(parts["number"].str.contains(r"\d", na=False))
+    return parts
+
+
+def hash_keys(parts, fields, namespace):
+    """64-bit hash per row, or 0 when any field is missing (no key)."""
+    complete = parts[fields].notna().all(axis=1).to_numpy()
+    joined = pd.Series(namespace, index=parts.index, dtype="string")
+    for field in fields:
+        joined = joined + "|" + parts[field].fillna("")
+    text = joined.to_numpy(dtype=object)
+
+    keys = pd.util.hash_array(text)
+    keys[~complete] = 0
+    return keys
+
+
+def row_identities(df):
+    """Stable 64-bit identity per row; identical rows are told apart by occurrence."""
+    if "file_name" in df.columns:
+        base = "file:" + df["file_name"].astype("string").fillna("")
+    else:
+        base = pd.Series("row:", index=df.index, dtype="string")
+        for column in sorted(df.columns):
+            base = base + "|" + df[column].astype("string").fillna("")
+    occurrence = base.groupby(base, sort=False).cumcount().astype("string")
+    return pd.util.hash_array((base + "#" + occurrence).to_numpy(dtype=object))
+
+
+def build_keys(df):
+    parts = normalize(df)
+    exact = hash_keys(parts, ["number", "vendor", "amount", "date"], f"exact:v{KEY_VERSION}")
+    fuzzy = {
+        name: hash_keys(parts, fields, f"{name}:v{KEY_VERSION}")
+        for name, fields in FUZZY_KEYS.items()
+    }
+    return exact, fuzzy
+
+
+# ===============================
+# Persistent segmented hash index
+# ===============================
+
+class InvoiceHashIndex:
+    """Sorted (key, ordinal) segments on disk, searched via memory maps."""
+
+    def __init__(self, index_dir):
+        self.dir = Path(index_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.meta_path = self.dir / "meta.json"
+        self.meta = {"format": INDEX_FORMAT, "next_ordinal": 0, "next_segment": 0, "segments": []}
+        if self.meta_path.exists():
+            stored = json.loads(self.meta_path.read_text())
+            if stored.get("format") == INDEX_FORMAT:
+                self.meta = stored
+            else:
+                # Batch-level ordinals cannot be mapped to rows: start over
+                logger.warning(f"⚠️ Outdated duplicate index format in {self.dir}; rebuilding")
+                self.meta["next_segment"] = stored.get("next_segment", 0)
+                for name in stored.get("segments", []):
+                    (self.dir / f"{name}.keys.npy").unlink(missing_ok=True)
+                    (self.dir / f"{name}.refs.npy").unlink(missing_ok=True)
+
+    def _save_meta(self):
+        tmp = self.meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.meta, indent=2))
+        tmp.replace(self.meta_path)
+
+    def _load_segment(self, name):
+        keys = np.load(self.dir / f"{name}.keys.npy", mmap_mode="r")
+        refs = np.load(self.dir / f"{name}.refs.npy", mmap_mode="r")
+        return keys, refs
+
+    def _write_segment(self, keys, refs):
+        order = np.lexsort((refs, keys))
+        name = f"segment_{self.meta['next_segment']:05d}"
+        np.save(self.dir / f"{name}.keys.npy", keys[order])
+        np.save(self.dir / f"{name}.refs.npy", refs[order])
+        self.meta["next_segment"] += 1
+        return name
+
+    def lookup(self, keys):
+        """Earliest ordinal stored under each key, or -1."""
+        found = np.full(len(keys), -1, dtype=np.int64)
+        valid = keys != 0
+
+        for name in self.meta["segments"]:
+            seg_keys, seg_refs = self._load_segment(name)
+            if len(seg_keys) == 0:
+                continue
+            pos = np.searchsorted(seg_keys, keys)
+            pos = np.minimum(pos, len(seg_keys) - 1)
+            hit = valid & (seg_keys[pos] == keys)
+
+            refs = np.asarray(seg_refs[pos])
+            better = hit & ((found < 0) | (refs < found))
+            found[better] = refs[better]
+        return found
+
+    def add(self, keys, refs):
+        mask = keys != 0
+        if mask.any():
+            self.meta["segments"].append(self._write_segment(keys[mask], refs[mask]))
+        if len(self.meta["segments"]) > MAX_SEGMENTS:
+            self.compact()
+
+    def compact(self):
+        """Merge all segments into one, keeping the earliest ordinal per key."""
+        parts = [self._load_segment(n) for n in self.meta["segments"]]
+        keys = np.concatenate([np.asarray(k) for k, _ in parts])
+        refs = np.concatenate([np.asarray(r) for _, r in parts])
+
+        order = np.lexsort((refs, keys))
+        keys, refs = keys[order], refs[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+
+        old = self.meta["segments"]
+        self.meta["segments"] = [self._write_segment(keys[first], refs[first])]
+        self._save_meta()
+        for name in old:
+            (self.dir / f"{name}.keys.npy").unlink(missing_ok=True)
+            (self.dir / f"{name}.refs.npy").unlink(missing_ok=True)
+        logger.info(f"🗜️ Compacted {len(old)} index segments → {len(keys[first])} keys")
+
+    def reserve_ordinals(self, identities):
+        """
+        Ordinal per row identity: the stored one for rows seen before, fresh
+        ones for the rest. Returns (ordinals, is_new mask).
+        """
+        ordinals = self.lookup(identities)
+        is_new = ordinals < 0
+        start = self.meta["next_ordinal"]
+        ordinals[is_new] = np.arange(start, start + is_new.sum(), dtype=np.int64)
+        self.meta["next_ordinal"] = start + int(is_new.sum())
+        return ordinals, is_new
+
+    def commit(self):
+        self._save_meta()
+
+
+# ===============================
+# Detection
+# ===============================
+
+def earlier_match(index, keys, ordinals):
+    """Earliest earlier ordinal sharing a key — from history or this batch."""
+    match = index.lookup(keys)
+    match[match >= ordinals] = -1
+
+    # Within-batch repeats: the first occurrence is the original
+    in_batch = pd.Series(ordinals).groupby(keys).transform("min").to_numpy().copy()
+    in_batch[(keys == 0) | (in_batch >= ordinals)] = -1
+
+    both = (match >= 0) & (in_batch >= 0)
+    return np.where(both, np.minimum(match, in_batch), np.maximum(match, in_batch))
+
+
+def detect_duplicates(df, index):
+    exact_keys, fuzzy_keys = build_keys(df)
+    identities = row_identities(df)
+    ordinals, is_new = index.reserve_ordinals(identities)
+
+    exact_of = earlier_match(index, exact_keys, ordinals)
+
+    fuzzy_of = np.full(len(df), -1, dtype=np.int64)
+    fuzzy_rule = np.full(len(df), "", dtype=object)
+    for name, keys in fuzzy_keys.items():
+        m = earlier_match(index, keys, ordinals)
+        take = (m >= 0) & (fuzzy_of < 0)
+        fuzzy_of[take] = m[take]
+        fuzzy_rule[take] = name
+
+    # Rows seen before are already indexed
+    if is_new.any():
+        columns = [identities, exact_keys, *fuzzy_keys.values()]
+        index.add(
+            np.concatenate([keys[is_new] for keys in columns]),
+            np.tile(ordinals[is_new], len(columns)),
+        )
+    index.commit()
+
+    is_exact = exact_of >= 0
+    is_possible = (fuzzy_of >= 0) & ~is_exact
+
+    return pd.DataFrame({
+        "invoice_ordinal": ordinals,
+        "is_exact_duplicate": is_exact.astype(int),
+        "is_possible_duplicate": is_possible.astype(int),
+        "duplicate_of": np.where(is_exact, exact_of, np.where(is_possible, fuzzy_of, -1)),
+        "match_rule": np.where(is_exact, "exact", np.where(is_possible, fuzzy_rule, "")),
+    })
+
+
+def main():
+    logger.info("🔁 Checking batch for duplicate invoices...")
+
+    if not INPUT_FILE.exists():
+        raise FileNotFoundError(f"Cleaned file not found: {INPUT_FILE}")
+
+    df = pd.read_csv(INPUT_FILE)
+
+    index = InvoiceHashIndex(INDEX_DIR)
+    flags = detect_duplicates(df, index)
+
+    FLAGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    flags.to_csv(FLAGS_FILE, index=False)
+
+    summary = {
+        "rows": int(len(flags)),
+        "exact_duplicates": int(flags["is_exact_duplicate"].sum()),
+        "possible_duplicates": int(flags["is_possible_duplicate"].sum()),
+        "by_rule": flags.loc[flags["match_rule"] != "", "match_rule"].value_counts().to_dict(),
+        "indexed_invoices": int(index.meta["next_ordinal"]),
+    }
+
+    REPORT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    REPORT_FILE.write_text(json.dumps(summary, indent=4))
+
+    logger.info(f"Duplicate summary: {summary}")
+    logger.success(f"✅ Duplicate flags saved → {FLAGS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
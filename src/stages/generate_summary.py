@@ -1,7 +1,8 @@
-import pandas as pd
 from pathlib import Path
 from loguru import logger
 
+from src.stages.stats_sketches import CLEANED_SPEC, load_or_build
+
 FILE = Path("/opt/airflow/data/processed/fatura_cleaned.csv")
 OUT = Path("/opt/airflow/reports/summary_report.txt")
 
@@ -11,13 +12,16 @@ def main():
         OUT.write_text("❌ No cleaned file found.")
         return
 
-    df = pd.read_csv(FILE)
+    # O(1) in data size once the cleaning stage has written the sketch
+    sketch = load_or_build(FILE, CLEANED_SPEC)
+    p50, p95, p99 = sketch.quantiles("total_amount", [0.50, 0.95, 0.99])
 
     summary = [
         "=== LedgerX Fatura Summary Report ===",
-        f"Rows: {len(df)}",
-        f"Vendors: {df['vendor_name'].nunique()}",
-        f"Total Amount Sum: {df['total_amount'].sum():.2f}",
+        f"Rows: {sketch.rows}",
+        f"Vendors (approx.): {sketch.distinct_count('vendor_name')}",
+        f"Total Amount Sum: {sketch.sums['total_amount']:.2f}",
+        f"Total Amount p50/p95/p99: {p50:.2f} / {p95:.2f} / {p99:.2f}",
         "=====================================",
         "",
     ]
@@ -29,7 +33,7 @@ def main():
     critical_cols = ["invoice_number", "invoice_date", "total_amount", "vendor_name", "currency"]
 
     # Missing ratio for each critical column
-    missing_ratios = df[critical_cols].isna().mean()
+    missing_ratios = {col: sketch.missing_ratio(col) for col in critical_cols}
 
     anomalies = []
     for col, ratio in missing_ratios.items():
@@ -1,25 +1,133 @@
+import os
+
+import pandas as pd
 from loguru import logger
 import great_expectations as ge
 from pathlib import Path
 
+from src.stages.chunked_validation import (
+    draw_uniform_sample,
+    finalize_result,
+    merge_results,
+    required_sample_size,
+    summarize_result,
+)
+from src.stages.validation_cache import fingerprint, load_result, save_result
+
 # ABSOLUTE PATH for Airflow container
 DATA_PATH = Path("/opt/airflow/data/processed/fatura_ocr.csv")
 
+EXPECTED_COLUMNS = ["file_name", "ocr_text"]
+
+# Pinned so every chunk is read with the same schema, instead of each
+# chunk inferring its own dtypes (e.g. an all-numeric file_name chunk)
+COLUMN_DTYPES = {"file_name": str, "ocr_text": str}
+
+# "chunked" → every row validated, one chunk at a time (default)
+# "sample"  → bounded uniform sample for fast pre-flight checks
+VALIDATION_MODE = os.environ.get("LEDGERX_GE_MODE", "chunked")
+CHUNK_SIZE = int(os.environ.get("LEDGERX_GE_CHUNK_SIZE", "50000"))
+
+# Sampling mode: estimate each failure rate within ±EPSILON with 1-DELTA confidence
+SAMPLE_EPSILON = float(os.environ.get("LEDGERX_GE_SAMPLE_EPSILON", "0.01"))
+SAMPLE_DELTA = float(os.environ.get("LEDGERX_GE_SAMPLE_DELTA", "0.05"))
+
+# Everything that changes the outcome of this stage besides the data itself
+RULE_SET = {
+    "columns": EXPECTED_COLUMNS,
+    "not_null": ["ocr_text"],
+    "types": {"file_name": "str"},
+    "read_dtypes": {column: dtype.__name__ for column, dtype in COLUMN_DTYPES.items()},
+    "mode": VALIDATION_MODE,
+    "epsilon": SAMPLE_EPSILON,
+    "delta": SAMPLE_DELTA,
+}
+
+
+# 🧩 Expectation helpers --------------------------------------------------------
+def run_column_expectations(df):
+    """Run the per-row expectations on one chunk (or sample) of the OCR file."""
+    dataset = ge.from_pandas(df)
+    return {
+        "nulls": dataset.expect_column_values_to_not_be_null("ocr_text"),
+        "types": dataset.expect_column_values_to_be_of_type("file_name", "str"),
+    }
+
+
+def check_header():
+    """Validate column layout from the header only — no rows are loaded."""
+    header = pd.read_csv(DATA_PATH, nrows=0)
+    dataset = ge.from_pandas(header)
+    return dataset.expect_table_columns_to_match_ordered_list(EXPECTED_COLUMNS)
+
+
+# 🚚 Chunked mode ---------------------------------------------------------------
+def iter_chunks():
+    """Stream only the validated columns in fixed-size chunks."""
+    return pd.read_csv(
+        DATA_PATH, usecols=EXPECTED_COLUMNS, dtype=COLUMN_DTYPES, chunksize=CHUNK_SIZE
+    )
+
+
+def validate_chunked():
+    merged = {}
+    rows = 0
+
+    for chunk in iter_chunks():
+        rows += len(chunk)
+        for name, result in run_column_expectations(chunk).items():
+            merged[name] = merge_results(merged.get(name), summarize_result(result))
+
+    logger.info(f"📦 Validated {rows} rows in chunks of {CHUNK_SIZE}")
+    return {name: finalize_result(r) for name, r in merged.items()}
+
+
+# 🎲 Sampling mode --------------------------------------------------------------
+def validate_sampled():
+    n = required_sample_size(SAMPLE_EPSILON, SAMPLE_DELTA)
+    sample = draw_uniform_sample(iter_chunks(), n, columns=EXPECTED_COLUMNS)
+    logger.info(
+        f"🎲 Pre-flight sample: {len(sample)} rows "
+        f"(±{SAMPLE_EPSILON:.3f} at {1 - SAMPLE_DELTA:.0%} confidence)"
+    )
+
+    results = {}
+    for name, result in run_column_expectations(sample).items():
+        merged = finalize_result(summarize_result(result))
+        merged["error_bound_percent"] = 100.0 * SAMPLE_EPSILON
+        results[name] = merged
+    return results
+
+
 def main():
     if not DATA_PATH.exists():
         logger.error(f"❌ Missing file: {DATA_PATH}")
         return
 
-    df = ge.read_csv(str(DATA_PATH))
-    logger.info(f"📦 Loaded {len(df)} rows for validation")
+    fp = fingerprint([DATA_PATH], RULE_SET)
+    results = load_result("great_expectations", fp)
 
-    results = {
-        "columns": df.expect_table_columns_to_match_ordered_list(["file_name", "ocr_text"]),
-        "nulls": df.expect_column_values_to_not_be_null("ocr_text"),
-        "types": df.expect_column_values_to_be_of_type("file_name", "str"),
-    }
+    if results is None:
+        header_result = check_header()
+
+        if VALIDATION_MODE == "sample":
+            column_results = validate_sampled()
+        else:
+            column_results = validate_chunked()
+
+        results = {"columns": {"success": bool(header_result.success)}}
+        results.update(column_results)
+        save_result("great_expectations", fp, results)
+
+    column_results = {k: r for k, r in results.items() if "element_count" in r}
+
+    for name, r in column_results.items():
+        logger.info(
+            f"🔎 {name}: {r['unexpected_count']}/{r['element_count']} unexpected "
+            f"({r['unexpected_percent']:.2f}%) sample={r['partial_unexpected_list'][:5]}"
+        )
 
-    failed = [k for k, r in results.items() if not r.success]
+    failed = [k for k, r in results.items() if not r["success"]]
     if failed:
         logger.error(f"❌ Schema checks failed: {failed}")
         exit(1)
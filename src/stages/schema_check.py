@@ -2,6 +2,8 @@ import pandas as pd
 from pathlib import Path
 from loguru import logger
 
+from src.stages.validation_cache import fingerprint, load_result, save_result
+
 # Cleaned structured file
 INPUT_FILE = Path("/opt/airflow/data/processed/fatura_cleaned.csv")
 OUTPUT_FILE = Path("/opt/airflow/reports/schema_check.txt")
@@ -15,8 +17,6 @@ def check_schema():
         print(msg)
         return
 
-    df = pd.read_csv(INPUT_FILE)
-
     # ✔ Expected FINAL structured schema
     expected_columns = [
         "invoice_number",
@@ -26,6 +26,16 @@ def check_schema():
         "total_amount",
     ]
 
+    fp = fingerprint([INPUT_FILE], {"expected_columns": expected_columns})
+    cached = load_result("schema_check", fp)
+    if cached is not None:
+        OUTPUT_FILE.write_text(cached["report"])
+        logger.info(f"Schema check restored from cache → {OUTPUT_FILE}")
+        print("Schema check complete.")
+        return
+
+    df = pd.read_csv(INPUT_FILE)
+
     results = []
 
     # Check required columns
@@ -39,7 +49,9 @@ def check_schema():
     results.append(f"Total rows: {len(df)}")
 
     # Save report
-    OUTPUT_FILE.write_text("\n".join(results))
+    report = "\n".join(results)
+    OUTPUT_FILE.write_text(report)
+    save_result("schema_check", fp, {"report": report})
 
     logger.info(f"Schema check complete → {OUTPUT_FILE}")
     print("Schema check complete.")
@@ -0,0 +1,343 @@
+"""
+Mergeable Statistics Sketches for LedgerX FATURA
+------------------------------------------------
+Summary reports used to rescan whole CSVs. Instead, each dataset gets a
+small sketch file saved next to it (``<file>.sketch.json``) holding:
+
+- exact counters: rows, nulls per column, column sums, text lengths
+- HyperLogLog registers for distinct counts (e.g. vendor_name)
+- KLL compactors for quantiles (e.g. total_amount)
+
+Sketches are updated chunk by chunk and can be merged, so sharded or
+incremental runs combine their sketches instead of re-reading data.
+"""
+
+import base64
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+SKETCH_SUFFIX = ".sketch.json"
+CHUNK_SIZE = 100_000
+
+# What each dataset tracks
+CLEANED_SPEC = {
+    "distinct_cols": ["vendor_name"],
+    "quantile_cols": ["total_amount"],
+    "sum_cols": ["total_amount"],
+    "text_cols": [],
+}
+OCR_SPEC = {
+    "distinct_cols": [],
+    "quantile_cols": [],
+    "sum_cols": [],
+    "text_cols": ["ocr_text"],
+}
+
+
+# ===============================
+# HyperLogLog (distinct counts)
+# ===============================
+
+class HyperLogLog:
+    def __init__(self, p=14, registers=None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = (
+            np.zeros(self.m, dtype=np.uint8) if registers is None else registers
+        )
+
+    def update(self, values):
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return
+
+        # Stable 64-bit hashes (same across processes and machines)
+        h = pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+        idx = (h >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = h & np.uint64((1 << (64 - self.p)) - 1)
+
+        # rank = position of the leftmost 1-bit in the (64 - p)-bit remainder;
+        # rest < 2**53 so the float conversion (and frexp's exponent) is exact
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (64 - self.p - bit_length + 1).astype(np.uint8)
+
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_dict(self):
+        return {"p": self.p, "registers": base64.b64encode(self.registers.tobytes()).decode()}
+
+    @classmethod
+    def from_dict(cls, data):
+        registers = np.frombuffer(base64.b64decode(data["registers"]), dtype=np.uint8).copy()
+        return cls(p=data["p"], registers=registers)
+
+
+# ===============================
+# KLL (quantiles)
+# ===============================
+
+class KLLSketch:
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+
+                items = np.sort(items)
+                # An odd item out stays behind; the rest is halved and promoted
+                leftover, items = items[: len(items) % 2], items[len(items) % 2:]
+                promoted = items[self._rng.integers(2)::2]
+
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                # Capacities depend on depth, so re-check from the bottom
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values):
+        values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        self.n += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        if self.n == 0:
+            return [float("nan")] * len(qs)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(lvl), 2.0 ** i) for i, lvl in enumerate(self.levels)]
+        )
+        order = np.argsort(items)
+        items, cum = items[order], np.cumsum(weights[order])
+
+        pos = np.searchsorted(cum, np.asarray(qs) * cum[-1], side="left")
+        out = items[np.minimum(pos, len(items) - 1)]
+        return [
+            self.min if q <= 0 else self.max if q >= 1 else float(v)
+            for q, v in zip(qs, out)
+        ]
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min,
+            "max": self.max,
+            "levels": [lvl.tolist() for lvl in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(k=data["k"])
+        sketch.n = data["n"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        sketch.levels = [np.asarray(lvl, dtype=np.float64) for lvl in data["levels"]]
+        return sketch
+
+
+# ===============================
+# Dataset-level sketch
+# ===============================
+
+class DatasetSketch:
+    def __init__(self, distinct_cols=(), quantile_cols=(), sum_cols=(), text_cols=()):
+        self.rows = 0
+        self.null_counts = {}
+        self.sums = {c: 0.0 for c in sum_cols}
+        self.text_lengths = {c: 0 for c in text_cols}
+        self.distinct = {c: HyperLogLog() for c in distinct_cols}
+        self.quantile_sketches = {c: KLLSketch() for c in quantile_cols}
+        self.source = None
+
+    def update(self, df):
+        self.rows += len(df)
+
+        for col, n in df.isna().sum().items():
+            self.null_counts[col] = self.null_counts.get(col, 0) + int(n)
+        for col in self.sums:
+            self.sums[col] += float(pd.to_numeric(df[col], errors="coerce").sum())
+        for col in self.text_lengths:
+            self.text_lengths[col] += int(df[col].astype(str).str.len().sum())
+        for col, hll in self.distinct.items():
+            hll.update(df[col])
+        for col, kll in self.quantile_sketches.items():
+            kll.update(df[col])
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col, n in other.null_counts.items():
+            self.null_counts[col] = self.null_counts.get(col, 0) + n
+        for col, s in other.sums.items():
+            self.sums[col] = self.sums.get(col, 0.0) + s
+        for col, n in other.text_lengths.items():
+            self.text_lengths[col] = self.text_lengths.get(col, 0) + n
+        for col, hll in other.distinct.items():
+            if col in self.distinct:
+                self.distinct[col].merge(hll)
+            else:
+                self.distinct[col] = HyperLogLog.from_dict(hll.to_dict())
+        for col, kll in other.quantile_sketches.items():
+            if col in self.quantile_sketches:
+                self.quantile_sketches[col].merge(kll)
+            else:
+                self.quantile_sketches[col] = KLLSketch.from_dict(kll.to_dict())
+        self.source = None
+        return self
+
+    # ---- report accessors ----
+    def missing_ratio(self, col):
+        return self.null_counts.get(col, 0) / self.rows if self.rows else 0.0
+
+    def distinct_count(self, col):
+        return self.distinct[col].count()
+
+    def quantiles(self, col, qs):
+        return self.quantile_sketches[col].quantiles(qs)
+
+    def avg_text_length(self, col):
+        return self.text_lengths[col] / self.rows if self.rows else float("nan")
+
+    # ---- persistence ----
+    def to_dict(self):
+        return {
+            "rows": self.rows,
+            "null_counts": self.null_counts,
+            "sums": self.sums,
+            "text_lengths": self.text_lengths,
+            "distinct": {c: h.to_dict() for c, h in self.distinct.items()},
+            "quantiles": {c: q.to_dict() for c, q in self.quantile_sketches.items()},
+            "source": self.source,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls()
+        sketch.rows = data["rows"]
+        sketch.null_counts = data["null_counts"]
+        sketch.sums = data["sums"]
+        sketch.text_lengths = data["text_lengths"]
+        sketch.distinct = {c: HyperLogLog.from_dict(h) for c, h in data["distinct"].items()}
+        sketch.quantile_sketches = {
+            c: KLLSketch.from_dict(q) for c, q in data["quantiles"].items()
+        }
+        sketch.source = data.get("source")
+        return sketch
+
+    def save(self, path):
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict()))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+# ===============================
+# File helpers
+# ===============================
+
+def sketch_path(data_path):
+    data_path = Path(data_path)
+    return data_path.with_name(data_path.name + SKETCH_SUFFIX)
+
+
+def _source_stamp(data_path):
+    stat = Path(data_path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def save_sketch_for(data_path, sketch):
+    """Persist a sketch next to its dataset, stamped with the file it describes."""
+    sketch.source = _source_stamp(data_path)
+    sketch.save(sketch_path(data_path))
+    logger.info(f"🧮 Sketch saved → {sketch_path(data_path)}")
+
+
+def build_sketch(data_path, spec, chunksize=CHUNK_SIZE):
+    """Stream a CSV once, updating a sketch chunk by chunk."""
+    sketch = DatasetSketch(**spec)
+    for chunk in pd.read_csv(data_path, chunksize=chunksize):
+        sketch.update(chunk)
+    save_sketch_for(data_path, sketch)
+    return sketch
+
+
+def load_or_build(data_path, spec, chunksize=CHUNK_SIZE):
+    """Use the stored sketch when it still matches the file, else rebuild it."""
+    path = sketch_path(data_path)
+    if path.exists():
+        sketch = DatasetSketch.load(path)
+        if sketch.source == _source_stamp(data_path):
+            logger.info(f"⚡ Using stored sketch → {path}")
+            return sketch
+        logger.info(f"♻️ Sketch is stale, rebuilding → {path}")
+    return build_sketch(data_path, spec, chunksize=chunksize)
+
+
+def merge_sketches(paths):
+    """Merge sketch files from several shards into one."""
+    merged = None
+    for p in paths:
+        sketch = DatasetSketch.load(p)
+        merged = sketch if merged is None else merged.merge(sketch)
+    return merged
@@ -5,6 +5,8 @@ import json
 
 INPUT_FILE = Path("data/processed/fatura_ocr.csv")
 REPORT_FILE = Path("reports/validation_summary.json")
+DUPLICATES_FILE = Path("data/processed/fatura_duplicates.csv")
+NEAR_DUPLICATES_FILE = Path("data/processed/fatura_near_duplicates.csv")
 
 def validate_fatura():
     logger.info(f"Loading OCR output from {INPUT_FILE}")
@@ -23,13 +25,27 @@ def validate_fatura():
         "valid_records": int(total - (missing_text + empty_text))
     }
 
+    # Invoice-level duplicates flagged by detect_duplicate_invoices.py
+    duplicate_invoices = 0
+    if DUPLICATES_FILE.exists():
+        flags = pd.read_csv(DUPLICATES_FILE)
+        duplicate_invoices = int(flags["is_exact_duplicate"].sum())
+        summary["duplicate_invoices"] = duplicate_invoices
+        summary["possible_duplicate_invoices"] = int(flags["is_possible_duplicate"].sum())
+
+    # OCR texts that are near-copies of another document (MinHash-LSH clusters)
+    if NEAR_DUPLICATES_FILE.exists():
+        clusters = pd.read_csv(NEAR_DUPLICATES_FILE)
+        summary["near_duplicate_clusters"] = int(clusters["cluster_id"].nunique())
+        summary["near_duplicate_records"] = int((clusters["is_representative"] == 0).sum())
+
     logger.info(f"Validation summary: {summary}")
 
     REPORT_FILE.parent.mkdir(exist_ok=True)
     with open(REPORT_FILE, "w") as f:
         json.dump(summary, f, indent=4)
 
-    if missing_text or empty_text or duplicate_files:
+    if missing_text or empty_text or duplicate_files or duplicate_invoices:
         logger.warning("⚠️  Some data quality issues found.")
     else:
         logger.success("✅  All records validated successfully.")
@@ -0,0 +1,92 @@
+"""
+Validation Result Cache for LedgerX FATURA
+------------------------------------------
+Lets validation stages skip work on retries and reruns of byte-identical
+inputs. A fingerprint combines the input files with the stage's rule set:
+
+- size + mtime are checked first (free)
+- the streaming SHA-256 is only recomputed when those change
+
+Set LEDGERX_FORCE_VALIDATION=1 to ignore stored results.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from loguru import logger
+
+from src.common.file_digests import file_digest
+
+CACHE_DIR = Path(
+    os.environ.get("LEDGERX_VALIDATION_CACHE", "/opt/airflow/reports/.validation_cache")
+)
+DIGEST_INDEX = "file_digests.json"
+
+
+def force_enabled():
+    return os.environ.get("LEDGERX_FORCE_VALIDATION", "0").lower() in ("1", "true", "yes")
+
+
+def _read_json(path):
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2, sort_keys=True, default=str))
+    tmp.replace(path)
+
+
+def _iter_files(path):
+    """A path may be a single file or a directory of files (e.g. tests/)."""
+    path = Path(path)
+    if path.is_dir():
+        for p in sorted(path.rglob("*")):
+            if p.is_file() and "__pycache__" not in p.parts:
+                yield p
+    elif path.exists():
+        yield path
+
+
+def fingerprint(paths, rules):
+    """Fingerprint of input files (or directories) plus the rule set applied to them."""
+    index = _read_json(CACHE_DIR / DIGEST_INDEX)
+    h = hashlib.sha256()
+
+    for path in paths:
+        root = Path(path)
+        h.update(str(root).encode())
+        for p in _iter_files(root):
+            rel = p.relative_to(root) if root.is_dir() else p.name
+            h.update(str(rel).encode())
+            h.update(file_digest(p, index).encode())
+
+    h.update(json.dumps(rules, sort_keys=True, default=str).encode())
+
+    _write_json(CACHE_DIR / DIGEST_INDEX, index)
+    return h.hexdigest()
+
+
+def load_result(stage, fp):
+    """Return the stored result for this stage + fingerprint, or None."""
+    if force_enabled():
+        logger.info(f"♻️ {stage}: force flag set, ignoring cached validation result")
+        return None
+
+    entry = _read_json(CACHE_DIR / f"{stage}.json")
+    if entry.get("fingerprint") != fp:
+        return None
+
+    logger.info(f"⚡ {stage}: inputs unchanged ({fp[:12]}), reusing cached result")
+    return entry["result"]
+
+
+def save_result(stage, fp, result):
+    _write_json(CACHE_DIR / f"{stage}.json", {"fingerprint": fp, "result": result})
@@ -0,0 +1,197 @@
+"""
+Content-addressed artifact store for the local MLflow runs
+----------------------------------------------------------
+Pipelines are split into their steps and every step is stored once,
+by the sha256 of its pickle:
+
+    mlruns/.cas/<sha[:2]>/<sha>.pkl
+
+A run only holds a small reference (<model_name>/cas_ref.json) plus one
+`cas.<model_name>.<step>` tag per step, so an identical preprocessor or
+an unchanged model logged again costs neither disk nor write time.
+(Models whose pickle embeds training metadata, e.g. CatBoost, still get
+a new blob per fit.)
+
+Garbage collection keeps the blobs referenced by retained runs:
+
+    python -m src.training.artifact_store gc --keep-days 30 --keep-last 5 [--dry-run]
+
+A run is retained if it started within --keep-days or is among the
+--keep-last latest runs with the same experiment and run name. Blobs
+younger than GRACE_SECONDS are never collected (their run may not have
+logged its reference yet).
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import joblib
+import mlflow.artifacts
+from loguru import logger
+from mlflow.entities import RunTag, ViewType
+from mlflow.tracking import MlflowClient
+from sklearn.pipeline import Pipeline
+
+CAS_DIR = Path(os.environ.get("LEDGERX_CAS_DIR", "mlruns/.cas"))
+REF_FILE = "cas_ref.json"
+TAG_PREFIX = "cas."
+GRACE_SECONDS = 3600
+
+
+# ===============================
+# Blobs
+# ===============================
+
+def blob_path(sha):
+    return CAS_DIR / sha[:2] / f"{sha}.pkl"
+
+
+def put(obj):
+    """Store `obj` by content; returns (sha, size, written). Existing blobs are not rewritten."""
+    buffer = io.BytesIO()
+    joblib.dump(obj, buffer)
+    data = buffer.getvalue()
+    sha = hashlib.sha256(data).hexdigest()
+
+    path = blob_path(sha)
+    if path.exists():
+        os.utime(path)  # refreshed blobs survive the GC grace period
+        return sha, len(data), False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+    return sha, len(data), True
+
+
+def get(sha):
+    path = blob_path(sha)
+    if not path.exists():
+        raise FileNotFoundError(f"Artifact {sha} is not in {CAS_DIR} (garbage-collected?)")
+    return joblib.load(path)
+
+
+# ===============================
+# Pipelines ↔ run references
+# ===============================
+
+def log_pipeline_ref(run_id, model_name, pipeline):
+    """Store each pipeline step by hash and attach the references to the run."""
+    steps = pipeline.steps if isinstance(pipeline, Pipeline) else [("model", pipeline)]
+
+    refs, written, total = [], 0, 0
+    for step_name, step in steps:
+        sha, size, is_new = put(step)
+        refs.append({"step": step_name, "sha256": sha, "size": size})
+        total += size
+        written += size if is_new else 0
+
+    client = MlflowClient()
+    client.log_dict(run_id, {"type": type(pipeline).__name__, "steps": refs}, f"{model_name}/{REF_FILE}")
+    client.log_batch(run_id, tags=[
+        RunTag(f"{TAG_PREFIX}{model_name}.{r['step']}", r["sha256"]) for r in refs
+    ])
+
+    logger.info(
+        f"🧩 {model_name}: {len(refs)} step(s), {total / 1e6:.1f} MB "
+        f"({(total - written) / 1e6:.1f} MB deduplicated)"
+    )
+    return refs
+
+
+def load_pipeline_ref(run_id, model_name):
+    """Rebuild the pipeline logged by log_pipeline_ref for a run."""
+    ref = mlflow.artifacts.load_dict(f"runs:/{run_id}/{model_name}/{REF_FILE}")
+    steps = [(r["step"], get(r["sha256"])) for r in ref["steps"]]
+    return Pipeline(steps) if ref["type"] == "Pipeline" else steps[0][1]
+
+
+# ===============================
+# Garbage collection
+# ===============================
+
+def _all_runs(client):
+    experiments = client.search_experiments(view_type=ViewType.ALL)
+    ids = [e.experiment_id for e in experiments]
+    if not ids:
+        return []
+
+    runs, token = [], None
+    while True:
+        page = client.search_runs(ids, run_view_type=ViewType.ALL, max_results=1000, page_token=token)
+        runs += list(page)
+        token = page.token
+        if not token:
+            return runs
+
+
+def retained_runs(runs, keep_days, keep_last, now=None):
+    """Active runs inside the retention policy."""
+    now = now or time.time()
+    cutoff_ms = (now - keep_days * 86400) * 1000
+
+    groups = defaultdict(list)
+    for run in runs:
+        if run.info.lifecycle_stage == "deleted":
+            continue
+        name = run.data.tags.get("mlflow.runName", "")
+        groups[(run.info.experiment_id, name)].append(run)
+
+    kept = []
+    for group in groups.values():
+        group.sort(key=lambda r: r.info.start_time or 0, reverse=True)
+        kept += [
+            r for i, r in enumerate(group)
+            if i < keep_last or (r.info.start_time or 0) >= cutoff_ms
+        ]
+    return kept
+
+
+def collect_garbage(keep_days=30, keep_last=5, dry_run=False, now=None):
+    """Delete blobs no retained run references; returns (deleted, freed_bytes)."""
+    now = now or time.time()
+    runs = retained_runs(_all_runs(MlflowClient()), keep_days, keep_last, now)
+    live = {
+        sha for run in runs
+        for key, sha in run.data.tags.items() if key.startswith(TAG_PREFIX)
+    }
+
+    deleted, freed = 0, 0
+    for path in CAS_DIR.glob("*/*.pkl"):
+        stat = path.stat()
+        if path.stem in live or now - stat.st_mtime < GRACE_SECONDS:
+            continue
+        deleted += 1
+        freed += stat.st_size
+        if not dry_run:
+            path.unlink(missing_ok=True)
+
+    verb = "Would delete" if dry_run else "Deleted"
+    logger.info(
+        f"🧹 {verb} {deleted} blob(s), {freed / 1e6:.1f} MB "
+        f"({len(runs)} runs retained, {len(live)} live blobs)"
+    )
+    return deleted, freed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LedgerX content-addressed artifact store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gc = sub.add_parser("gc", help="delete blobs not referenced by retained runs")
+    gc.add_argument("--keep-days", type=float, default=30)
+    gc.add_argument("--keep-last", type=int, default=5, help="latest runs kept per run name")
+    gc.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "gc":
+        collect_garbage(args.keep_days, args.keep_last, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
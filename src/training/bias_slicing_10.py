@@ -1,11 +1,12 @@
 from pathlib import Path
-import joblib
+import numpy as np
 import pandas as pd
 from loguru import logger
 
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 
-from .load_data_01 import load_data, split_data
+from .prediction_cache import load_predictions
+from .split_cache import load_split
 
 # Paths
 MODEL_TUNED_PATH = Path("models/best_model_tuned.pkl")
@@ -27,30 +28,76 @@ def compute_metrics(y_true, y_pred):
     }
 
 
+def slice_confusion_counts(codes, y_true, y_pred, n_groups):
+    """(n_groups, 4) counts of [tn, fp, fn, tp] per group code; code -1 is ignored."""
+    valid = codes >= 0
+    cell = codes[valid] * 4 + y_true[valid] * 2 + y_pred[valid]
+    return np.bincount(cell, minlength=n_groups * 4).reshape(n_groups, 4)
+
+
+def _ratio(num, den):
+    out = np.zeros(len(num))
+    np.divide(num, den, out=out, where=den > 0)  # zero_division=0
+    return out
+
+
 def evaluate_slices(y_true, y_pred, group_series, group_name, min_support=20):
     """
     Evaluate metrics per group for a given slicing variable.
     Returns a list of dicts: one row per group.
+
+    One pass over the rows: groups are factorized, confusion counts come
+    from a single bincount and every metric is derived from the counts.
     """
     logger.info(f"🔍 Evaluating bias slices for '{group_name}'")
 
-    results = []
     df_group = pd.DataFrame(
         {"y_true": y_true, "y_pred": y_pred, group_name: group_series}
     )
 
-    for value in sorted(df_group[group_name].dropna().unique()):
-        mask = df_group[group_name] == value
-        y_t = df_group.loc[mask, "y_true"]
-        y_p = df_group.loc[mask, "y_pred"]
+    groups = df_group[group_name]
+    if isinstance(groups.dtype, pd.CategoricalDtype):
+        groups = groups.astype(object)  # order by value, not by category position
+    codes, uniques = pd.factorize(groups, sort=True)
+
+    counts = slice_confusion_counts(
+        codes,
+        (df_group["y_true"].to_numpy() == 1).astype(np.int64),
+        (df_group["y_pred"].to_numpy() == 1).astype(np.int64),
+        len(uniques),
+    )
+    tn, fp, fn, tp = counts.T.astype(np.float64)
+    support = counts.sum(axis=1)
+
+    metrics = {
+        "accuracy": _ratio(tp + tn, support),
+        "precision": _ratio(tp, tp + fp),
+        "recall": _ratio(tp, tp + fn),
+        "f1": _ratio(2 * tp, 2 * tp + fp + fn),
+    }
 
-        if len(y_t) < min_support:
-            continue  # skip very small groups, too noisy
+    # skip very small groups, too noisy
+    keep = np.flatnonzero(support >= min_support)
+    values = np.asarray(uniques, dtype=object)[keep].tolist()
+    columns = zip(
+        values,
+        support[keep].tolist(),
+        *(metrics[name][keep].tolist() for name in ("accuracy", "precision", "recall", "f1")),
+    )
 
-        metrics = compute_metrics(y_t, y_p)
-        row = {"group": group_name, "value": str(value)}
-        row.update(metrics)
-        results.append(row)
+    # Python round() keeps the report identical to the sklearn-based version
+    results = [
+        {
+            "group": group_name,
+            "value": str(value),
+            "support": n,
+            "accuracy": round(acc, 4),
+            "precision": round(prec, 4),
+            "recall": round(rec, 4),
+            "f1": round(f1, 4),
+        }
+        for value, n, acc, prec, rec, f1 in columns
+    ]
 
     return results
 
@@ -58,14 +105,7 @@ def evaluate_slices(y_true, y_pred, group_series, group_name, min_support=20):
 def main():
     logger.info("📘 Running Bias Slicing & Fairness Analysis")
 
-    # 1) Load data & split
-    df = load_data()
-    X_train, X_val, X_test, y_train, y_val, y_test = split_data(df)
-
-    # Align attributes for test set
-    df_test_attrs = df.loc[X_test.index].copy()
-
-    # 2) Load best tuned model if present
+    # 1) Load best tuned model if present
     if MODEL_TUNED_PATH.exists():
         model_path = MODEL_TUNED_PATH
     elif MODEL_BASE_PATH.exists():
@@ -75,11 +115,15 @@ def main():
             "Neither best_model_tuned.pkl nor best_model.pkl was found in models/"
         )
 
-    model = joblib.load(model_path)
-    logger.info(f"📦 Loaded model for bias analysis → {model_path}")
+    # 2) Test predictions, shared with 08 / 11 (one inference pass per model)
+    preds = load_predictions(model_path)
+    y_test, y_pred = preds.y_true, preds.y_pred
+
+    # Slice attributes come straight from the test features
+    X_train, X_val, X_test, *_ = load_split()
+    df_test_attrs = X_test
 
     # 3) Global performance
-    y_pred = model.predict(X_test)
     global_metrics = compute_metrics(y_test, y_pred)
     global_f1 = global_metrics["f1"]
 
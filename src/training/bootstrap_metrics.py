@@ -0,0 +1,143 @@
+"""
+Bootstrap confidence intervals and threshold sweep
+--------------------------------------------------
+Both run without Python loops over replicates or thresholds:
+
+- bootstrap: each chunk of replicates is a (replicates × rows) index
+  matrix, turned into per-row multiplicities with one bincount. Confusion
+  counts are then matrix-vector products. ROC-AUC uses cumulative sums
+  of negative weight over the score-sorted rows (ties count half).
+- sweep: rows sorted by score once; cumulative TP / FP at every distinct
+  score give the confusion matrix for every threshold.
+
+    LEDGERX_BOOTSTRAP_REPLICATES = 2000 (default)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+N_REPLICATES = int(os.environ.get("LEDGERX_BOOTSTRAP_REPLICATES", "2000"))
+CI_LEVEL = 0.95
+BOOTSTRAP_SEED = 42
+CHUNK_ELEMENTS = 1 << 24   # replicates × rows held in memory at once
+
+METRICS = ("accuracy", "precision", "recall", "f1", "roc_auc")
+
+
+def _ratio(num, den):
+    """num / den with 0 where den == 0 (sklearn's zero_division=0)."""
+    num, den = np.asarray(num, dtype=np.float64), np.asarray(den, dtype=np.float64)
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+# ===============================
+# Weighted metrics (one row per replicate)
+# ===============================
+
+def _tie_groups(y_true, y_prob):
+    """Sparse (rows × distinct scores) indicators of positives / negatives, scores ascending."""
+    _, group = np.unique(y_prob, return_inverse=True)
+    n_groups = group.max() + 1 if len(group) else 0
+    rows = np.arange(len(y_true))
+
+    def indicator(mask):
+        return sparse.csr_matrix(
+            (np.ones(mask.sum()), (rows[mask], group[mask])), shape=(len(y_true), n_groups)
+        )
+
+    return indicator(y_true), indicator(~y_true)
+
+
+def weighted_metrics(W, y_true, y_pred, groups):
+    """Metrics for every row of the (replicates × rows) weight matrix W."""
+    tp = W @ (y_true & y_pred)
+    fp = W @ (~y_true & y_pred)
+    fn = W @ (y_true & ~y_pred)
+    total = W.sum(axis=1)
+
+    precision = _ratio(tp, tp + fp)
+    recall = _ratio(tp, tp + fn)
+
+    # AUC = P(score_pos > score_neg) + ½ P(tie), over weighted pairs
+    pos_groups, neg_groups = groups
+    P = (pos_groups.T @ W.T).T   # positive weight per distinct score
+    N = (neg_groups.T @ W.T).T
+    neg_below = np.cumsum(N, axis=1) - N
+    pairs = P.sum(axis=1) * N.sum(axis=1)
+    wins = (P * (neg_below + 0.5 * N)).sum(axis=1)
+    roc_auc = np.full(len(W), np.nan)  # undefined with a single class
+    np.divide(wins, pairs, out=roc_auc, where=pairs > 0)
+
+    return {
+        "accuracy": _ratio(total - fp - fn, total),
+        "precision": precision,
+        "recall": recall,
+        "f1": _ratio(2 * tp, 2 * tp + fp + fn),
+        "roc_auc": roc_auc,
+    }
+
+
+def bootstrap_ci(y_true, y_pred, y_prob, n_replicates=N_REPLICATES, level=CI_LEVEL, seed=BOOTSTRAP_SEED):
+    """{metric: (point estimate, lower, upper)} with percentile intervals."""
+    y_true = np.asarray(y_true).astype(bool)
+    y_pred = np.asarray(y_pred).astype(bool)
+    y_prob = np.asarray(y_prob, dtype=np.float64)
+    n = len(y_true)
+    groups = _tie_groups(y_true, y_prob)
+
+    point = weighted_metrics(np.ones((1, n)), y_true, y_pred, groups)
+
+    rng = np.random.default_rng(seed)
+    chunk = max(1, CHUNK_ELEMENTS // max(n, 1))
+    samples = {metric: [] for metric in METRICS}
+    for start in range(0, n_replicates, chunk):
+        size = min(chunk, n_replicates - start)
+        idx = rng.integers(0, n, size=(size, n))
+        # Row multiplicities of every replicate in one bincount
+        offsets = (idx + (np.arange(size) * n)[:, None]).ravel()
+        W = np.bincount(offsets, minlength=size * n).reshape(size, n).astype(np.float64)
+        for metric, values in weighted_metrics(W, y_true, y_pred, groups).items():
+            samples[metric].append(values)
+
+    alpha = (1 - level) / 2 * 100
+    result = {}
+    for metric in METRICS:
+        values = np.concatenate(samples[metric])
+        low, high = np.nanpercentile(values, [alpha, 100 - alpha])
+        result[metric] = (float(point[metric][0]), float(low), float(high))
+    return result
+
+
+# ===============================
+# Threshold sweep
+# ===============================
+
+def threshold_sweep(y_true, y_prob):
+    """Confusion counts and metrics at every distinct score (predict 1 if score >= threshold)."""
+    y_true = np.asarray(y_true).astype(bool)
+    y_prob = np.asarray(y_prob, dtype=np.float64)
+
+    order = np.argsort(y_prob, kind="mergesort")[::-1]
+    scores, labels = y_prob[order], y_true[order]
+
+    # Last position of each distinct score in descending order
+    last = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+    tp = np.cumsum(labels)[last]
+    fp = (last + 1) - tp
+    positives, negatives = labels.sum(), len(labels) - labels.sum()
+    fn, tn = positives - tp, negatives - fp
+
+    return pd.DataFrame({
+        "threshold": scores[last],
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "precision": _ratio(tp, tp + fp),
+        "recall": _ratio(tp, positives),
+        "f1": _ratio(2 * tp, 2 * tp + fp + fn),
+        "accuracy": _ratio(tp + tn, len(labels)),
+        "fpr": _ratio(fp, negatives),
+    })
@@ -1,13 +1,24 @@
+import json
+import os
 import pandas as pd
 from pathlib import Path
 from loguru import logger
 
+from . import feature_store, label_rules
+from .label_rules import CompiledRules, load_rules
+
 # ===============================
 # Paths
 # ===============================
 CLEANED_FILE = Path("data/processed/fatura_cleaned.csv")
 OUT_FILE = Path("data/processed/fatura_model_ready.csv")
 REPORT_FILE = Path("data/reports/feature_build_report.txt")
+DUPLICATES_FILE = Path("data/processed/fatura_duplicates.csv")
+NEAR_DUPLICATES_FILE = Path("data/processed/fatura_near_duplicates.csv")
+META_FILE = Path("data/processed/fatura_model_ready.meta.json")
+
+# Reference date for time-dependent features (the DAG passes its logical date)
+AS_OF_ENV = "LEDGERX_AS_OF_DATE"
 
 
 # ===============================
@@ -18,32 +29,134 @@ def derive_invoice_number_length(df):
     return df["invoice_number"].astype(str).str.len()
 
 
-def derive_invoice_age_days(df):
-    # Convert invoice_date to datetime
-    df["invoice_date"] = pd.to_datetime(df["invoice_date"], errors="coerce")
-    today = pd.Timestamp.today()
-    return (today - df["invoice_date"]).dt.days
+def resolve_as_of(value=None):
+    """Explicit date, else $LEDGERX_AS_OF_DATE, else today (midnight)."""
+    value = value or os.environ.get(AS_OF_ENV)
+    as_of = pd.Timestamp(value) if value else pd.Timestamp.today()
+    return as_of.normalize()
 
 
-def compute_failure_label(df):
+def derive_invoice_age_days(df, as_of):
+    invoice_date = pd.to_datetime(df["invoice_date"], errors="coerce")
+    return (as_of - invoice_date).dt.days
+
+
+def derive_duplicate_flags(df):
     """
-    failure_label = 1 if ANY:
-    - vendor_name == UNKNOWN_VENDOR
-    - currency == UNK
-    - total_amount <= 0
-    - invoice_number missing
-    - invoice_date == "2000-01-01" (invalid placeholder used in cleaning)
+    Row-aligned flags from src/stages/detect_duplicate_invoices.py.
+    Falls back to 0 when the duplicate stage has not run for this file.
     """
+    if DUPLICATES_FILE.exists():
+        flags = pd.read_csv(DUPLICATES_FILE)
+        if len(flags) == len(df):
+            return flags["is_exact_duplicate"].values, flags["is_possible_duplicate"].values
+        logger.warning(
+            f"⚠️ {DUPLICATES_FILE} has {len(flags)} rows, expected {len(df)}. Ignoring it."
+        )
+    return 0, 0
 
-    conditions = (
-        (df["vendor_name"] == "UNKNOWN_VENDOR") |
-        (df["currency"] == "UNK") |
-        (df["total_amount"] <= 0) |
-        (df["invoice_number"].isna()) |
-        (df["invoice_date"].astype(str) == "2000-01-01")
-    )
 
-    return conditions.astype(int)
+def derive_near_duplicate_flag(df):
+    """
+    1 for OCR documents that are near-copies of an earlier document
+    (src/stages/detect_near_duplicates.py). Rows align with the OCR file;
+    falls back to 0 when its row count does not match.
+    """
+    flag = pd.Series(0, index=df.index)
+    if NEAR_DUPLICATES_FILE.exists():
+        clusters = pd.read_csv(NEAR_DUPLICATES_FILE)
+        if len(clusters) == len(df):
+            copies = clusters.loc[clusters["is_representative"] == 0, "row"]
+            flag.iloc[copies.values] = 1
+        else:
+            logger.warning(
+                f"⚠️ {NEAR_DUPLICATES_FILE} has {len(clusters)} rows, expected {len(df)}. Ignoring it."
+            )
+    return flag
+
+
+def compute_failure_rule_mask(df, rules=None):
+    """
+    Bitmask of the failure rules (src/training/failure_rules.json) that
+    fired per row; bit i ↔ rule i. Default rules: unknown vendor, UNK
+    currency, total_amount <= 0, missing invoice_number, 2000-01-01
+    placeholder date.
+    """
+    return (rules or CompiledRules.from_file()).evaluate(df)
+
+
+def compute_failure_label(df, rules=None):
+    """failure_label = 1 if ANY rule fired."""
+    return (compute_failure_rule_mask(df, rules) != 0).astype(int)
+
+
+def build_static_features(df):
+    """Everything that does not depend on the as-of date, plus the label."""
+    df = df.copy()
+    # Row ordinal of the cleaned file; the key for feature-store lookups
+    df.insert(0, feature_store.ID_COLUMN, range(len(df)))
+    df["invoice_date"] = pd.to_datetime(df["invoice_date"], errors="coerce")
+
+    df["invoice_number_length"] = derive_invoice_number_length(df)
+
+    # Since we do not have OCR:
+    df["ocr_text_length"] = 0
+    df["blur_flag"] = 0
+
+    df["duplicate_invoice_flag"], df["possible_duplicate_flag"] = derive_duplicate_flags(df)
+    df["near_duplicate_flag"] = derive_near_duplicate_flag(df)
+
+    df["failure_rule_mask"] = compute_failure_rule_mask(df)
+    df["failure_label"] = (df["failure_rule_mask"] != 0).astype(int)
+    return df
+
+
+def build_temporal_features(df, as_of):
+    """Columns recomputed when the as-of date moves (cheap: invoice_date only)."""
+    return pd.DataFrame({
+        feature_store.ID_COLUMN: df[feature_store.ID_COLUMN],
+        "invoice_age_days": derive_invoice_age_days(df, as_of),
+    })
+
+
+def column_order(static_columns):
+    """Model-ready column order: invoice_age_days follows invoice_number_length."""
+    columns = list(static_columns)
+    columns.insert(columns.index("invoice_number_length") + 1, "invoice_age_days")
+    return columns
+
+
+def build_features(df, as_of):
+    static = build_static_features(df)
+    temporal = build_temporal_features(static, as_of)
+    return static.merge(temporal, on=feature_store.ID_COLUMN)[column_order(static.columns)]
+
+
+# Any edit to these changes the definition hash → a new feature version
+STATIC_FUNCTIONS = [
+    derive_invoice_number_length,
+    derive_duplicate_flags,
+    derive_near_duplicate_flag,
+    compute_failure_rule_mask,
+    build_static_features,
+    # The rule engine itself: a change to how rules compile relabels rows
+    label_rules.load_rules,
+    label_rules._rule_type,
+    label_rules._validate,
+    label_rules.CompiledRules,
+]
+TEMPORAL_FUNCTIONS = [derive_invoice_age_days, build_temporal_features]
+SOURCE_FILES = [CLEANED_FILE, DUPLICATES_FILE, NEAR_DUPLICATES_FILE]
+
+
+def static_definition_params():
+    """Rule file plus the op tables CompiledRules dispatches on."""
+    return {
+        "failure_rules": load_rules(),
+        "compare_ops": {op: fn.__name__ for op, fn in label_rules.COMPARE_OPS.items()},
+        "null_ops": sorted(label_rules.NULL_OPS),
+        "types": sorted(label_rules.TYPES),
+    }
 
 
 # ===============================
@@ -65,19 +178,38 @@ def main():
     logger.info(f"📄 Loaded cleaned file → {len(df)} rows")
 
     # ============================================
-    # 2. Create Derived Features (Structured Only)
+    # 2. Derive Features (or reuse stored versions)
     # ============================================
-    df["invoice_number_length"] = derive_invoice_number_length(df)
-    df["invoice_age_days"] = derive_invoice_age_days(df)
+    as_of = resolve_as_of()
+    logger.info(f"📅 As-of date for time-dependent features → {as_of.date()}")
 
-    # Since we do not have OCR:
-    df["ocr_text_length"] = 0
-    df["blur_flag"] = 0
+    src_hash = feature_store.source_hash(SOURCE_FILES)
+    static_hash = feature_store.definition_hash(STATIC_FUNCTIONS, static_definition_params())
+    temporal_hash = feature_store.definition_hash(TEMPORAL_FUNCTIONS)
 
-    # ============================================
-    # 3. Compute Failure Label
-    # ============================================
-    df["failure_label"] = compute_failure_label(df)
+    version_dir = feature_store.find_version(static_hash, src_hash)
+    if version_dir is not None:
+        logger.info(f"♻️ Feature definitions and sources unchanged → reusing {version_dir}")
+    else:
+        version_dir = feature_store.materialize(
+            build_static_features(df), static_hash, src_hash
+        )
+
+    # Only the as-of columns are refreshed when the date moves
+    temporal_dir = feature_store.find_temporal(version_dir, temporal_hash, as_of)
+    if temporal_dir is None:
+        static = feature_store.read_features(
+            version_dir, columns=[feature_store.ID_COLUMN, "invoice_date"]
+        )
+        temporal_dir = feature_store.materialize_temporal(
+            build_temporal_features(static, as_of),
+            version_dir,
+            temporal_hash,
+            as_of,
+            column_order(feature_store.read_manifest(version_dir)["columns"]),
+        )
+
+    df = feature_store.read_features(version_dir, temporal=temporal_dir)
 
     logger.info(
         f"🏷 failure_label distribution → "
@@ -85,22 +217,37 @@ def main():
     )
 
     # ============================================
-    # 4. Save Final Model-Ready Dataset
+    # 3. Save Final Model-Ready Dataset
     # ============================================
     OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(OUT_FILE, index=False)
+    feature_store.set_latest(version_dir, export_path=OUT_FILE, temporal=temporal_dir)
     logger.success(f"💾 Saved model-ready CSV → {OUT_FILE}")
 
+    # The as-of date travels with the dataset (same inputs + date → same bytes)
+    META_FILE.write_text(json.dumps({
+        "as_of": str(as_of.date()),
+        "source_hash": src_hash,
+        "static_definition_hash": static_hash,
+        "temporal_definition_hash": temporal_hash,
+        "feature_version": str(version_dir),
+        "temporal_version": str(temporal_dir),
+    }, indent=4))
+
     # ============================================
-    # 5. Write Summary Report
+    # 4. Write Summary Report
     # ============================================
     summary_lines = [
         "=== LedgerX Model-Ready Dataset Report (Structured-Only) ===",
         f"Rows: {len(df)}",
+        f"As-of date: {as_of.date()}",
         "",
         "--- Failure Label Distribution ---",
         str(df["failure_label"].value_counts().to_dict()),
         "",
+        "--- Rows per Failure Rule ---",
+        str(CompiledRules.from_file().counts(df["failure_rule_mask"].to_numpy())),
+        "",
         "--- Missing Values Summary ---",
         str(df.isna().sum().to_dict()),
         "",
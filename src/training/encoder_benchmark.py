@@ -0,0 +1,106 @@
+"""
+Categorical encoder benchmark
+-----------------------------
+Compares every encoder in preprocessing_02.ENCODERS on the real split:
+feature width, preprocessor fit / transform time and model fit / predict
+time + validation F1 (LightGBM, and CatBoost which is the only model that
+consumes the "native" raw categories).
+
+    python -m src.training.encoder_benchmark
+Output:
+    data/reports/encoder_benchmark.txt
+"""
+
+import time
+import warnings
+from pathlib import Path
+
+import lightgbm as lgb
+from catboost import CatBoostClassifier
+from loguru import logger
+from sklearn.metrics import f1_score
+
+from .split_cache import load_split
+from .model_definitions_03 import catboost_device_params, lightgbm_device_params
+from .preprocessing_02 import ENCODERS, build_preprocessor, native_cat_feature_indices
+
+REPORT_FILE = Path("data/reports/encoder_benchmark.txt")
+ROUNDS = 200
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _model_row(model, Z_train, y_train, Z_val, y_val):
+    _, fit_s = _timed(lambda: model.fit(Z_train, y_train))
+    y_pred, predict_s = _timed(lambda: model.predict(Z_val))
+    return fit_s, predict_s, f1_score(y_val, y_pred)
+
+
+def benchmark_encoders(X_train, y_train, X_val, y_val):
+    rows = []
+    for encoder in ENCODERS:
+        preprocessor = build_preprocessor(text_features=False, encoder=encoder)
+        Z_train, prep_fit_s = _timed(lambda: preprocessor.fit_transform(X_train, y_train))
+        Z_val, prep_transform_s = _timed(lambda: preprocessor.transform(X_val))
+
+        models = {}
+        if encoder != "native":
+            models["LightGBM"] = lgb.LGBMClassifier(n_estimators=ROUNDS, **lightgbm_device_params())
+        cat_features = native_cat_feature_indices() if encoder == "native" else None
+        models["CatBoost"] = CatBoostClassifier(
+            iterations=ROUNDS, verbose=False, allow_writing_files=False,
+            cat_features=cat_features, **catboost_device_params(),
+        )
+
+        for model_name, model in models.items():
+            fit_s, predict_s, f1 = _model_row(model, Z_train, y_train, Z_val, y_val)
+            rows.append({
+                "encoder": encoder,
+                "model": model_name,
+                "width": Z_train.shape[1],
+                "prep_fit_s": prep_fit_s,
+                "prep_transform_s": prep_transform_s,
+                "fit_s": fit_s,
+                "predict_s": predict_s,
+                "f1": f1,
+            })
+            logger.info(f"⏱️ {encoder:>13} + {model_name:<8} width={Z_train.shape[1]:<5} fit={fit_s:.2f}s F1={f1:.4f}")
+    return rows
+
+
+def main():
+    logger.info("📏 Benchmarking categorical encoders...")
+
+    X_train, X_val, X_test, y_train, y_val, y_test = load_split()
+    rows = benchmark_encoders(X_train, y_train, X_val, y_val)
+
+    header = (
+        f"{'encoder':<14}{'model':<10}{'width':>7}{'prep_fit_s':>12}"
+        f"{'prep_tf_s':>11}{'fit_s':>9}{'predict_s':>11}{'val_f1':>9}"
+    )
+    lines = [
+        "=== LedgerX Categorical Encoder Benchmark ===",
+        f"Rows: train={len(X_train)}, val={len(X_val)} | boosting rounds: {ROUNDS}",
+        "",
+        header,
+        "-" * len(header),
+    ]
+    for r in rows:
+        lines.append(
+            f"{r['encoder']:<14}{r['model']:<10}{r['width']:>7}{r['prep_fit_s']:>12.3f}"
+            f"{r['prep_transform_s']:>11.3f}{r['fit_s']:>9.3f}{r['predict_s']:>11.3f}{r['f1']:>9.4f}"
+        )
+
+    REPORT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    REPORT_FILE.write_text("\n".join(lines) + "\n")
+    logger.success(f"📝 Encoder benchmark written → {REPORT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-import joblib
+import time
+
 import pandas as pd
 from pathlib import Path
 import matplotlib.pyplot as plt
@@ -13,7 +14,8 @@ from sklearn.metrics import (
 )
 from loguru import logger
 
-from .load_data_01 import load_data, split_data
+from .bootstrap_metrics import CI_LEVEL, N_REPLICATES, bootstrap_ci, threshold_sweep
+from .prediction_cache import load_predictions
 
 MODEL_PATH = Path("models/best_model.pkl")
 REPORT_DIR = Path("data/reports")
@@ -55,21 +57,35 @@ def plot_roc_curve(y_true, y_prob, out_path):
     plt.savefig(out_path)
     plt.close()
 
+def write_uncertainty_reports(y_test, y_pred, y_prob):
+    """Bootstrap CIs and the threshold sweep, next to model_evaluation.txt."""
+    start = time.perf_counter()
+    intervals = bootstrap_ci(y_test, y_pred, y_prob)
+    sweep = threshold_sweep(y_test, y_prob)
+    logger.info(f"🎲 Bootstrap CIs + threshold sweep in {time.perf_counter() - start:.2f}s")
+
+    ci_path = REPORT_DIR / "model_evaluation_bootstrap.txt"
+    with open(ci_path, "w") as f:
+        f.write(f"{CI_LEVEL:.0%} bootstrap confidence intervals ({N_REPLICATES} replicates):\n")
+        for k, (point, low, high) in intervals.items():
+            f.write(f"{k}: {point:.4f} [{low:.4f}, {high:.4f}]\n")
+
+    sweep_path = REPORT_DIR / "threshold_sweep.csv"
+    sweep.to_csv(sweep_path, index=False, float_format="%.6g")
+
+    best = sweep.loc[sweep["f1"].idxmax()]
+    logger.info(f"🎚️ Best F1 threshold: {best['threshold']:.4f} (f1={best['f1']:.4f})")
+    logger.success(f"📄 Bootstrap CIs → {ci_path}, threshold sweep → {sweep_path}")
+
 def main():
 
     logger.info("📘 Running Model Evaluation")
 
-    df = load_data()
-    X_train, X_val, X_test, y_train, y_val, y_test = split_data(df)
-
     if not MODEL_PATH.exists():
         raise FileNotFoundError("Best model not found")
 
-    model = joblib.load(MODEL_PATH)
-    logger.info(f"📦 Loaded model from {MODEL_PATH}")
-
-    y_pred = model.predict(X_test)
-    y_prob = model.predict_proba(X_test)[:, 1]
+    preds = load_predictions(MODEL_PATH)
+    y_test, y_pred, y_prob = preds.y_true, preds.y_pred, preds.y_prob
 
     metrics = {
         "accuracy": round(accuracy_score(y_test, y_pred), 4),
@@ -94,6 +110,8 @@ def main():
         f.write(str(cm))
 
     logger.success(f"📄 Evaluation report saved → {report_path}")
+
+    write_uncertainty_reports(y_test, y_pred, y_prob)
     logger.success("🖼️ confusion_matrix.png & roc_curve.png generated!")
 
 if __name__ == "__main__":
@@ -0,0 +1,252 @@
+import hashlib
+import inspect
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from src.common.file_digests import file_digest
+
+# ===============================
+# Layout
+# ===============================
+# data/feature_store/<feature_set>/
+#     latest.json                         → pointer to the newest version
+#     digests.json                        → size/mtime → sha256 of sources
+#     defs=<def_hash>/source=<src_hash>/
+#         _manifest.json
+#         part-00000.parquet              → invoice_id 0 .. PARTITION_ROWS-1
+#         part-00001.parquet              → ...
+#         temporal=<def_hash>/as_of=<YYYY-MM-DD>/
+#             _manifest.json
+#             part-00000.parquet          → time-dependent columns only
+STORE_DIR = Path("data/feature_store")
+FEATURE_SET = "invoice_failure"
+PARTITION_ROWS = 100_000
+ID_COLUMN = "invoice_id"
+
+
+def _set_dir(feature_set=FEATURE_SET):
+    return STORE_DIR / feature_set
+
+
+def _read_json(path):
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=2, default=str))
+    tmp.replace(path)
+
+
+# ===============================
+# Version keys
+# ===============================
+
+def source_hash(paths, feature_set=FEATURE_SET):
+    """Content hash of all input files (missing optional inputs are skipped)."""
+    index_path = _set_dir(feature_set) / "digests.json"
+    index = _read_json(index_path)
+
+    h = hashlib.sha256()
+    for path in paths:
+        path = Path(path)
+        if path.exists():
+            h.update(path.name.encode())
+            h.update(file_digest(path, index).encode())
+
+    _write_json(index_path, index)
+    return h.hexdigest()
+
+
+def definition_hash(functions, params=None):
+    """Hash of the feature code itself plus any parameters that change its output."""
+    h = hashlib.sha256()
+    for fn in functions:
+        h.update(inspect.getsource(fn).encode())
+    h.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _version_dir(def_hash, src_hash, feature_set=FEATURE_SET):
+    return _set_dir(feature_set) / f"defs={def_hash[:16]}" / f"source={src_hash[:16]}"
+
+
+# ===============================
+# Write / read
+# ===============================
+
+def _write_partitions(df, out_dir):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    df = df.reset_index(drop=True)
+    partition = df[ID_COLUMN] // PARTITION_ROWS
+    for part_id, part in df.groupby(partition, sort=True):
+        part.to_parquet(out_dir / f"part-{int(part_id):05d}.parquet", index=False)
+    return df
+
+
+def find_version(def_hash, src_hash, feature_set=FEATURE_SET):
+    """Directory of an existing materialization, or None."""
+    version_dir = _version_dir(def_hash, src_hash, feature_set)
+    return version_dir if (version_dir / "_manifest.json").exists() else None
+
+
+def materialize(df, def_hash, src_hash, metadata=None, feature_set=FEATURE_SET):
+    """Write a feature frame as invoice_id-range partitions and mark it latest."""
+    version_dir = _version_dir(def_hash, src_hash, feature_set)
+    df = _write_partitions(df, version_dir)
+
+    manifest = {
+        "feature_set": feature_set,
+        "definition_hash": def_hash,
+        "source_hash": src_hash,
+        "rows": int(len(df)),
+        "columns": list(df.columns),
+        "partition_rows": PARTITION_ROWS,
+        "created": datetime.now().isoformat(),
+        **(metadata or {}),
+    }
+    _write_json(version_dir / "_manifest.json", manifest)
+    set_latest(version_dir, feature_set)
+
+    logger.success(f"🗄️ Materialized {len(df)} rows → {version_dir}")
+    return version_dir
+
+
+def temporal_dir(version_dir, def_hash, as_of):
+    return Path(version_dir) / f"temporal={def_hash[:16]}" / f"as_of={pd.Timestamp(as_of).date()}"
+
+
+def find_temporal(version_dir, def_hash, as_of):
+    out_dir = temporal_dir(version_dir, def_hash, as_of)
+    return out_dir if (out_dir / "_manifest.json").exists() else None
+
+
+def materialize_temporal(df, version_dir, def_hash, as_of, columns):
+    """
+    Store time-dependent columns for one as-of date next to a static version.
+    Only these columns are recomputed when the date moves; `columns` is the
+    full column order of the combined frame.
+    """
+    out_dir = temporal_dir(version_dir, def_hash, as_of)
+    df = _write_partitions(df, out_dir)
+    _write_json(out_dir / "_manifest.json", {
+        "definition_hash": def_hash,
+        "as_of": str(pd.Timestamp(as_of).date()),
+        "rows": int(len(df)),
+        "temporal_columns": [c for c in df.columns if c != ID_COLUMN],
+        "columns": list(columns),
+        "created": datetime.now().isoformat(),
+    })
+    logger.success(f"🕒 Materialized as-of {pd.Timestamp(as_of).date()} columns → {out_dir}")
+    return out_dir
+
+
+def set_latest(version_dir, feature_set=FEATURE_SET, export_path=None, temporal=None):
+    """
+    Point `latest` at a version (plus its as-of columns in `temporal`);
+    `export_path` records the CSV written from it.
+    """
+    pointer = {"version_dir": str(version_dir)}
+    if temporal is not None:
+        pointer["temporal_dir"] = str(temporal)
+    if export_path is not None:
+        stat = Path(export_path).stat()
+        pointer["export"] = {
+            "path": str(export_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+    _write_json(_set_dir(feature_set) / "latest.json", pointer)
+
+
+def latest_version(feature_set=FEATURE_SET):
+    pointer = _read_json(_set_dir(feature_set) / "latest.json")
+    return pointer or None
+
+
+def read_manifest(version_dir):
+    return _read_json(Path(version_dir) / "_manifest.json")
+
+
+def _resolve(version_dir, temporal, feature_set):
+    if version_dir is None:
+        pointer = latest_version(feature_set)
+        if pointer is None:
+            raise FileNotFoundError(f"No materialized features for '{feature_set}'")
+        version_dir, temporal = pointer["version_dir"], pointer.get("temporal_dir")
+    return Path(version_dir), (Path(temporal) if temporal else None)
+
+
+def _join_temporal(df, temporal, parts, columns, **read_kwargs):
+    """Attach as-of columns (same partition layout) in the combined column order."""
+    timed = [pd.read_parquet(temporal / p.name, **read_kwargs) for p in parts]
+    df = df.merge(pd.concat(timed, ignore_index=True), on=ID_COLUMN, how="left")
+    return df[columns or read_manifest(temporal)["columns"]]
+
+
+def read_features(version_dir=None, columns=None, feature_set=FEATURE_SET, temporal=None):
+    """Bulk read of a whole version (all partitions), optionally column-projected."""
+    version_dir, temporal = _resolve(version_dir, temporal, feature_set)
+
+    manifest = read_manifest(version_dir)
+    static_cols = None
+    if columns:
+        static_cols = [c for c in columns if c in manifest["columns"]]
+        static_cols = [ID_COLUMN] + [c for c in static_cols if c != ID_COLUMN]
+
+    parts = sorted(version_dir.glob("part-*.parquet"))
+    df = pd.concat(
+        [pd.read_parquet(p, columns=static_cols) for p in parts], ignore_index=True
+    )
+    if temporal is None:
+        return df[columns or manifest["columns"]]
+    return _join_temporal(df, temporal, parts, columns)
+
+
+def lookup(invoice_ids, version_dir=None, feature_set=FEATURE_SET, temporal=None):
+    """Online point lookup: only the partitions holding the requested ids are read."""
+    version_dir, temporal = _resolve(version_dir, temporal, feature_set)
+
+    ids = pd.Series(invoice_ids, dtype="int64")
+    frames, parts = [], []
+    for part_id, wanted in ids.groupby(ids // PARTITION_ROWS):
+        path = version_dir / f"part-{int(part_id):05d}.parquet"
+        if path.exists():
+            filters = [(ID_COLUMN, "in", wanted.tolist())]
+            frames.append(pd.read_parquet(path, filters=filters))
+            parts.append(path)
+
+    columns = read_manifest(temporal or version_dir)["columns"]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    found = pd.concat(frames, ignore_index=True)
+    if temporal is not None:
+        filters = [(ID_COLUMN, "in", ids.tolist())]
+        found = _join_temporal(found, temporal, parts, columns, filters=filters)
+    # Requested order; unknown ids come back as all-NaN rows
+    found = found.set_index(ID_COLUMN)
+    return found.reindex(ids.values).rename_axis(ID_COLUMN).reset_index()
+
+
+def read_if_current(export_path, feature_set=FEATURE_SET):
+    """
+    Features of the latest version, but only if `export_path` is still the
+    exact CSV written from it (so training never silently diverges from it).
+    """
+    pointer = latest_version(feature_set)
+    export = (pointer or {}).get("export")
+    if not export or not Path(export_path).exists():
+        return None
+
+    stat = Path(export_path).stat()
+    if (export["size"], export["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+        return None
+    return read_features(
+        pointer["version_dir"], feature_set=feature_set, temporal=pointer.get("temporal_dir")
+    )
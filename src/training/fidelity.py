@@ -0,0 +1,160 @@
+"""
+Multi-fidelity tuning on training-data rungs
+--------------------------------------------
+With LEDGERX_FIDELITY_SCHEDULE="0.05,0.2,1.0" every tuning trial first
+fits on a 5% stratified subsample of X_train, reports its validation F1,
+and only configurations in the top 1/PROMOTION_FACTOR of their rung are
+promoted to the next, larger subsample; the last rung is the full split.
+
+Subsamples are nested (the 5% rows are inside the 20% rows) and
+stratified on failure_label. Their row positions are materialized once
+per split next to the cached split and shared by every worker:
+
+    data/splits/<key>/rungs/0.05.npy
+"""
+
+import math
+import os
+import time
+
+import numpy as np
+import optuna
+from loguru import logger
+from sklearn.metrics import f1_score
+
+from .load_data_01 import RANDOM_STATE
+from .trainer_05 import fit_pipeline
+
+# Empty = off (every trial fits on the full training split)
+FIDELITY_SCHEDULE = os.environ.get("LEDGERX_FIDELITY_SCHEDULE", "")
+PROMOTION_FACTOR = 3   # top third of each rung moves up
+MIN_RUNG_TRIALS = 3    # trials scored on a rung before it starts pruning
+
+
+def parse_schedule(text=None):
+    """"0.05,0.2" → (0.05, 0.2, 1.0); empty → ()."""
+    text = FIDELITY_SCHEDULE if text is None else text
+    fractions = sorted({float(f) for f in text.split(",") if f.strip()})
+    if not fractions:
+        return ()
+    if fractions[0] <= 0 or fractions[-1] > 1:
+        raise ValueError(f"Fidelity fractions must be in (0, 1]: {text}")
+    if fractions[-1] != 1.0:
+        fractions.append(1.0)
+    return tuple(fractions)
+
+
+def rung_pruner():
+    """Prunes trials outside the top 1/PROMOTION_FACTOR of their rung."""
+    return optuna.pruners.PercentilePruner(
+        percentile=100 * (1 - 1 / PROMOTION_FACTOR),
+        n_startup_trials=MIN_RUNG_TRIALS,
+        n_warmup_steps=0,
+    )
+
+
+# ===============================
+# Subsamples
+# ===============================
+
+def nested_positions(y, fractions, seed=RANDOM_STATE):
+    """{fraction: sorted row positions}, stratified by class and nested."""
+    y = np.asarray(y)
+    rng = np.random.default_rng(seed)
+    orders = {cls: rng.permutation(np.flatnonzero(y == cls)) for cls in np.unique(y)}
+
+    positions = {}
+    for fraction in fractions:
+        picked = [order[: max(1, math.ceil(fraction * len(order)))] for order in orders.values()]
+        positions[fraction] = np.sort(np.concatenate(picked))
+    return positions
+
+
+def _save_atomic(path, array):
+    """Readers never see a half-written file (concurrent tuning workers)."""
+    tmp = path.with_name(f".{path.stem}.{os.getpid()}.tmp.npy")
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+def rung_positions(y_train, fractions, rung_dir=None):
+    """
+    {fraction: row positions}, read from `rung_dir` when stored there,
+    otherwise computed and stored. tune_families_parallel calls this once
+    before spawning workers, so workers normally only read.
+    """
+    positions = {}
+    missing = []
+    for fraction in fractions:
+        path = rung_dir / f"{fraction}.npy" if rung_dir else None
+        if path is not None and path.exists():
+            positions[fraction] = np.load(path)
+        else:
+            missing.append(fraction)
+
+    if missing:
+        computed = nested_positions(y_train, fractions)
+        for fraction in missing:
+            positions[fraction] = computed[fraction]
+            if rung_dir is not None:
+                rung_dir.mkdir(parents=True, exist_ok=True)
+                _save_atomic(rung_dir / f"{fraction}.npy", computed[fraction])
+    return positions
+
+
+def materialize_rungs(X_train, y_train, fractions, rung_dir=None):
+    """
+    [(fraction, X, y)] for the schedule. Row positions are read from
+    `rung_dir` when present, otherwise computed and stored there.
+    """
+    positions = rung_positions(y_train, fractions, rung_dir)
+
+    rungs = []
+    for fraction in fractions:
+        pos = positions[fraction]
+        if fraction == 1.0:
+            rungs.append((fraction, X_train, y_train))
+        else:
+            rungs.append((fraction, X_train.iloc[pos], y_train.iloc[pos]))
+
+    sizes = ", ".join(f"{f:.0%}={len(y)}" for f, _, y in rungs)
+    logger.info(f"🪜 Fidelity rungs → {sizes}")
+    return rungs
+
+
+# ===============================
+# Trial
+# ===============================
+
+def fit_on_rungs(trial, preprocessor, model, rungs, X_val, y_val):
+    """
+    Fit rung by rung, reporting validation F1 as step 1, 2, ...; raises
+    optuna.TrialPruned when the trial is not promoted. Returns the
+    pipeline fitted on the last (full) rung.
+    """
+    for step, (fraction, X, y) in enumerate(rungs, start=1):
+        start = time.perf_counter()
+        pipeline, best_iteration = fit_pipeline(preprocessor, model, X, y, X_val, y_val)
+        seconds = time.perf_counter() - start
+
+        trial.set_user_attr("rung_fraction", fraction)
+        trial.set_user_attr("rung_seconds", seconds)
+        trial.set_user_attr("best_iteration", best_iteration)
+
+        if step == len(rungs):
+            return pipeline
+
+        trial.report(f1_score(y_val, pipeline.predict(X_val)), step=step)
+        if trial.should_prune():
+            raise optuna.TrialPruned(f"not promoted past the {fraction:.0%} rung")
+
+
+def rung_counts(study, fractions):
+    """Trials that reached each rung (COMPLETE trials reached the last one)."""
+    counts = [0] * len(fractions)
+    for t in study.get_trials(deepcopy=False):
+        reached = t.user_attrs.get("rung_fraction")
+        if reached in fractions:
+            for i in range(fractions.index(reached) + 1):
+                counts[i] += 1
+    return counts
@@ -1,18 +1,54 @@
+import os
 from pathlib import Path
 import pandas as pd
 from loguru import logger
 from sklearn.model_selection import train_test_split
 
+from . import feature_store
+
 DATA_FILE = Path("data/processed/fatura_model_ready.csv")
 
+# Drop near-duplicate OCR copies so they cannot leak across train/val/test
+DROP_NEAR_DUPLICATES = os.environ.get("LEDGERX_DROP_NEAR_DUPLICATES", "0") == "1"
+
+# 70 / 15 / 15 stratified split
+TEST_SIZE = 0.30
+VAL_TEST_SIZE = 0.50
+RANDOM_STATE = 42
+
+# failure_label is just failure_rule_mask != 0: neither may reach X
+LABEL_COLUMNS = ["failure_label", "failure_rule_mask"]
+
+# Parquet keeps datetimes, the CSV does not: parse them on both read paths
+DATE_COLUMNS = ["invoice_date"]
+
+
+def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+    return df
+
 
 def load_data() -> pd.DataFrame:
     if not DATA_FILE.exists():
         logger.error(f"❌ Missing dataset: {DATA_FILE}")
         raise FileNotFoundError(f"{DATA_FILE} not found")
 
-    df = pd.read_csv(DATA_FILE)
-    logger.info(f"📄 Loaded dataset → {len(df)} rows")
+    # Columnar bulk read when the CSV is an untouched export of the store
+    df = feature_store.read_if_current(DATA_FILE)
+    if df is not None:
+        logger.info(f"📄 Loaded dataset from feature store → {len(df)} rows")
+    else:
+        df = pd.read_csv(DATA_FILE)
+        logger.info(f"📄 Loaded dataset → {len(df)} rows")
+    df = parse_dates(df)
+
+    if DROP_NEAR_DUPLICATES and "near_duplicate_flag" in df.columns:
+        before = len(df)
+        df = df[df["near_duplicate_flag"] == 0]
+        logger.info(f"🧹 Dropped {before - len(df)} near-duplicate rows")
+
     return df
 
 
@@ -20,15 +56,15 @@ def split_data(df: pd.DataFrame):
     if "failure_label" not in df.columns:
         raise KeyError("Column 'failure_label' not found in dataset")
 
-    X = df.drop(columns=["failure_label"])
+    X = df.drop(columns=LABEL_COLUMNS, errors="ignore")
     y = df["failure_label"]
 
     X_train, X_temp, y_train, y_temp = train_test_split(
-        X, y, test_size=0.30, random_state=42, stratify=y
+        X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
     )
 
     X_val, X_test, y_val, y_test = train_test_split(
-        X_temp, y_temp, test_size=0.50, random_state=42, stratify=y_temp
+        X_temp, y_temp, test_size=VAL_TEST_SIZE, random_state=RANDOM_STATE, stratify=y_temp
     )
 
     logger.info(
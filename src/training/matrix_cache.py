@@ -0,0 +1,155 @@
+"""
+Transformed-matrix cache
+------------------------
+The preprocessor is fitted once per split and the transformed train /
+val / test matrices are stored as raw .npy arrays (CSR data / indices /
+indptr for sparse output) that are memory-mapped on load. Entries are
+keyed by a hash of the split data plus the preprocessor configuration,
+so every model — and every later run on unchanged data — reuses them.
+
+    data/cache/matrices/<key>/
+        meta.json
+        preprocessor.pkl          (fitted, for the saved Pipeline)
+        train.data.npy / train.indices.npy / train.indptr.npy   (sparse)
+        val.npy                                                 (dense)
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from loguru import logger
+from scipy import sparse
+
+CACHE_DIR = Path("data/cache/matrices")
+SPLITS = ("train", "val", "test")
+
+
+# ===============================
+# Cache key
+# ===============================
+
+def data_hash(frames):
+    h = hashlib.sha256()
+    for df in frames:
+        h.update(",".join(map(str, df.columns)).encode())
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _stable(value):
+    """repr() without memory addresses (column-selector callables)."""
+    if callable(value) and not hasattr(value, "get_params"):
+        return f"{value.__module__}.{value.__qualname__}"
+    return repr(value)
+
+
+def preprocessor_config(preprocessor):
+    params = preprocessor.get_params(deep=True)
+    config = {k: _stable(v) for k, v in sorted(params.items())}
+    # File-backed inputs (e.g. the hashed text matrix) invalidate on change
+    for k, v in params.items():
+        if isinstance(v, str) and Path(v).is_file():
+            stat = Path(v).stat()
+            config[f"{k}.__stamp__"] = f"{stat.st_size}:{stat.st_mtime_ns}"
+    config["__sklearn__"] = sklearn.__version__
+    return config
+
+
+def cache_key(preprocessor, X_train, X_val, X_test, y_train=None):
+    h = hashlib.sha256()
+    h.update(data_hash([X_train, X_val, X_test]).encode())
+    if y_train is not None:  # supervised encoders (target encoding) depend on it
+        h.update(data_hash([y_train.to_frame()]).encode())
+    h.update(json.dumps(preprocessor_config(preprocessor), sort_keys=True).encode())
+    return h.hexdigest()[:24]
+
+
+# ===============================
+# Store / load
+# ===============================
+
+def _save_matrix(out_dir, name, Z):
+    if sparse.issparse(Z):
+        Z = Z.tocsr()
+        np.save(out_dir / f"{name}.data.npy", Z.data)
+        np.save(out_dir / f"{name}.indices.npy", Z.indices)
+        np.save(out_dir / f"{name}.indptr.npy", Z.indptr)
+        return {"format": "csr", "shape": list(Z.shape)}
+    Z = np.ascontiguousarray(Z)
+    if Z.dtype == object:  # raw categories for CatBoost: cannot be memory-mapped
+        np.save(out_dir / f"{name}.npy", Z, allow_pickle=True)
+        return {"format": "object", "shape": list(Z.shape)}
+    np.save(out_dir / f"{name}.npy", Z)
+    return {"format": "dense", "shape": list(Z.shape)}
+
+
+def _load_matrix(out_dir, name, info):
+    if info["format"] == "csr":
+        arrays = [
+            np.load(out_dir / f"{name}.{part}.npy", mmap_mode="c")
+            for part in ("data", "indices", "indptr")
+        ]
+        return sparse.csr_matrix(tuple(arrays), shape=tuple(info["shape"]), copy=False)
+    if info["format"] == "object":
+        return np.load(out_dir / f"{name}.npy", allow_pickle=True)
+    return np.load(out_dir / f"{name}.npy", mmap_mode="c")
+
+
+def load_matrices(key):
+    """(fitted preprocessor, {split: matrix}) for a cache key, or None."""
+    out_dir = CACHE_DIR / key
+    meta_path = out_dir / "meta.json"
+    if not meta_path.exists():
+        return None
+
+    meta = json.loads(meta_path.read_text())
+    preprocessor = joblib.load(out_dir / "preprocessor.pkl")
+    matrices = {name: _load_matrix(out_dir, name, meta["matrices"][name]) for name in SPLITS}
+    return preprocessor, matrices
+
+
+def save_matrices(key, preprocessor, matrices):
+    out_dir = CACHE_DIR / key
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    info = {name: _save_matrix(out_dir, name, matrices[name]) for name in SPLITS}
+    joblib.dump(preprocessor, out_dir / "preprocessor.pkl")
+
+    # meta.json last: its presence marks a complete entry
+    (out_dir / "meta.json").write_text(json.dumps({"key": key, "matrices": info}, indent=2))
+
+
+def transform_splits(preprocessor, X_train, X_val, X_test, y_train=None):
+    """
+    Fit `preprocessor` on X_train once and transform all three splits,
+    or reuse a cached result. Returns (fitted_preprocessor, {split: matrix}).
+    The train matrix comes from fit_transform, so cross-fitted encoders
+    (target encoding) give out-of-fold values there.
+    """
+    key = cache_key(preprocessor, X_train, X_val, X_test, y_train)
+
+    cached = load_matrices(key)
+    if cached is not None:
+        logger.info(f"♻️ Reusing transformed matrices → {CACHE_DIR / key}")
+        return cached
+
+    logger.info("🔧 Fitting preprocessor once for all models...")
+    fitted = preprocessor
+    matrices = {
+        "train": fitted.fit_transform(X_train, y_train),
+        "val": fitted.transform(X_val),
+        "test": fitted.transform(X_test),
+    }
+    save_matrices(key, fitted, matrices)
+
+    shapes = {name: m.shape for name, m in matrices.items()}
+    logger.success(f"💾 Cached transformed matrices {shapes} → {CACHE_DIR / key}")
+
+    # Hand out the memory-mapped copies so every model reads the same pages
+    _, matrices = load_matrices(key)
+    return fitted, matrices
@@ -1,20 +1,149 @@
+"""
+MLflow logging helpers
+----------------------
+- params / metrics go out as one log_batch call per dict instead of one
+  request per key
+- model artifacts are pickled on the caller's thread (a snapshot, so a
+  later refit of a shared step cannot leak in) and uploaded on a
+  background thread; the bounded queue (LEDGERX_MLFLOW_QUEUE, default 4
+  pending models) applies back-pressure instead of holding every
+  pipeline in memory
+- pending uploads are flushed at interpreter exit, or explicitly with
+  flush_artifacts() (worker processes skip atexit handlers)
+- by default pipelines go to the content-addressed store
+  (src/training/artifact_store.py); LEDGERX_ARTIFACT_STORE=mlflow logs
+  full MLflow sklearn models instead
+"""
+
+import atexit
+import os
+import pickle
+import queue
+import threading
+import time
+
 import mlflow
 import mlflow.sklearn
+from loguru import logger
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
+
+from .artifact_store import log_pipeline_ref
+
+ARTIFACT_QUEUE_SIZE = int(os.environ.get("LEDGERX_MLFLOW_QUEUE", "4"))
+
+# cas: deduplicated pipeline steps (src/training/artifact_store.py)
+# mlflow: a full MLflow sklearn model per run
+ARTIFACT_STORE = os.environ.get("LEDGERX_ARTIFACT_STORE", "cas").lower()
+
+# Per-request limits of the MLflow REST API
+MAX_PARAMS_PER_BATCH = 100
+MAX_METRICS_PER_BATCH = 1000
 
 
 def init_experiment(experiment_name="ledgerx_failure_model"):
     mlflow.set_experiment(experiment_name)
 
 
+def _run_id():
+    # Never open a run implicitly: nothing would end it
+    run = mlflow.active_run()
+    if run is None:
+        raise RuntimeError("No active MLflow run — log inside mlflow.start_run()")
+    return run.info.run_id
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
 def log_params(params: dict):
-    for k, v in params.items():
-        mlflow.log_param(k, v)
+    if not params:
+        return
+    run_id = _run_id()
+    entries = [Param(str(k), str(v)) for k, v in params.items()]
+    for chunk in _chunks(entries, MAX_PARAMS_PER_BATCH):
+        MlflowClient().log_batch(run_id, params=chunk)
+
+
+def log_metrics(metrics: dict, step: int = 0):
+    if not metrics:
+        return
+    run_id = _run_id()
+    timestamp = int(time.time() * 1000)
+    entries = [Metric(str(k), float(v), timestamp, step) for k, v in metrics.items()]
+    for chunk in _chunks(entries, MAX_METRICS_PER_BATCH):
+        MlflowClient().log_batch(run_id, metrics=chunk)
 
 
-def log_metrics(metrics: dict):
-    for k, v in metrics.items():
-        mlflow.log_metric(k, v)
+# ===============================
+# Background artifact uploads
+# ===============================
+
+class ArtifactUploader:
+    """One daemon thread draining a bounded queue of upload jobs."""
+
+    def __init__(self, maxsize=ARTIFACT_QUEUE_SIZE):
+        self.jobs = queue.Queue(maxsize=max(1, maxsize))
+        self.failures = []
+        self.thread = threading.Thread(target=self._drain, name="mlflow-artifacts", daemon=True)
+        self.thread.start()
+
+    def _drain(self):
+        while True:
+            label, fn = self.jobs.get()
+            try:
+                fn()
+                logger.info(f"📤 Uploaded {label}")
+            except Exception as e:
+                self.failures.append((label, e))
+                logger.error(f"❌ MLflow upload of {label} failed: {e}")
+            finally:
+                self.jobs.task_done()
+
+    def submit(self, label, fn):
+        self.jobs.put((label, fn))  # blocks while the queue is full
+
+    def flush(self):
+        self.jobs.join()
+        failures, self.failures = self.failures, []
+        return failures
+
+
+_uploader = None
+_uploader_lock = threading.Lock()
+
+
+def _get_uploader():
+    global _uploader
+    with _uploader_lock:
+        if _uploader is None:
+            _uploader = ArtifactUploader()
+            atexit.register(flush_artifacts)
+    return _uploader
 
 
 def log_pipeline(model_name: str, pipeline):
-    mlflow.sklearn.log_model(pipeline, model_name)
+    """Queue the pipeline for upload to the active run; returns after pickling it."""
+    run_id = _run_id()
+    # Snapshot now: callers may refit shared steps (one preprocessor reused
+    # across models) before the background thread reaches this job
+    payload = pickle.dumps(pipeline, protocol=pickle.HIGHEST_PROTOCOL)
+    if ARTIFACT_STORE == "cas":
+        upload = lambda: log_pipeline_ref(run_id, model_name, pickle.loads(payload))  # noqa: E731
+    else:
+        upload = lambda: mlflow.sklearn.log_model(  # noqa: E731
+            pickle.loads(payload), name=model_name, run_id=run_id
+        )
+    _get_uploader().submit(f"{model_name} model (run {run_id[:8]})", upload)
+
+
+def flush_artifacts():
+    """Block until every queued upload finished; returns the failed ones."""
+    if _uploader is None:
+        return []
+    pending = _uploader.jobs.unfinished_tasks
+    if pending:
+        logger.info(f"⏳ Waiting for {pending} MLflow artifact upload(s)...")
+    return _uploader.flush()
@@ -1,8 +1,124 @@
+import functools
+import json
+import os
+import platform
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 import xgboost as xgb
 import lightgbm as lgb
+import catboost
 from catboost import CatBoostClassifier
+from catboost.utils import get_gpu_device_count
+
+from .preprocessing_02 import encoder_for, native_cat_feature_indices
+
+HARDWARE_PROFILE_FILE = Path("data/reports/hardware_profile.json")
+
+# auto (probe + benchmark) | cpu | gpu (forced, fails without a GPU)
+DEVICE = os.environ.get("LEDGERX_DEVICE", "auto").lower()
+
+# CPU profile: fewer histogram bins train noticeably faster with no F1 loss here
+CPU_MAX_BIN = 127
+
+
+# ===============================
+# Device detection (probed once per process)
+# ===============================
+
+def cpu_threads():
+    cores = os.environ.get("LEDGERX_TRAINING_CORES")
+    return max(1, int(cores) if cores else (os.cpu_count() or 1))
+
+
+def _probe_data():
+    rng = np.random.default_rng(0)
+    X = rng.random((64, 4))
+    return X, (X[:, 0] > 0.5).astype(int)
+
+
+def gpu_available():
+    """Any GPU visible to the process (device count only, no training fit)."""
+    try:
+        return get_gpu_device_count() > 0
+    except Exception:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def gpu_forced():
+    """LEDGERX_DEVICE=gpu: GPU params for every library, never a silent CPU fallback."""
+    if DEVICE != "gpu":
+        return False
+    if not gpu_available():
+        raise RuntimeError("LEDGERX_DEVICE=gpu but no GPU is available")
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def xgboost_has_gpu():
+    if DEVICE == "cpu":
+        return False
+    if gpu_forced():
+        return True
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            xgb.XGBClassifier(device="cuda", n_estimators=1).fit(*_probe_data())
+        # CPU-only systems silently fall back with a warning instead of failing
+        return not any("changed from GPU to CPU" in str(w.message) for w in caught)
+    except Exception:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def lightgbm_has_gpu():
+    if DEVICE == "cpu":
+        return False
+    if gpu_forced():
+        return True
+    try:
+        lgb.LGBMClassifier(device="gpu", n_estimators=1, verbose=-1).fit(*_probe_data())
+        return True
+    except Exception:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def catboost_has_gpu():
+    if DEVICE == "cpu":
+        return False
+    return gpu_forced() or gpu_available()
+
+
+def xgboost_device_params():
+    if xgboost_has_gpu():
+        return {"tree_method": "hist", "device": "cuda"}
+    return {"tree_method": "hist", "device": "cpu", "max_bin": CPU_MAX_BIN, "n_jobs": cpu_threads()}
+
+
+def lightgbm_device_params():
+    if lightgbm_has_gpu():
+        return {"device": "gpu"}
+    # Col-wise histograms suit the wide, sparse one-hot matrix
+    return {
+        "device": "cpu",
+        "max_bin": CPU_MAX_BIN,
+        "force_col_wise": True,
+        "n_jobs": cpu_threads(),
+        "verbose": -1,
+    }
+
+
+def catboost_device_params():
+    if catboost_has_gpu():
+        return {"task_type": "GPU"}
+    return {"task_type": "CPU", "border_count": CPU_MAX_BIN, "thread_count": cpu_threads()}
 
 
 def get_logistic_regression():
@@ -29,9 +145,9 @@ def get_xgboost():
         learning_rate=0.1,
         subsample=0.8,
         colsample_bytree=0.8,
-        tree_method="hist",  # CPU-safe
         random_state=42,
         eval_metric="logloss",
+        **xgboost_device_params(),
     )
     params = {
         "n_estimators": 300,
@@ -39,7 +155,7 @@ def get_xgboost():
         "learning_rate": 0.1,
         "subsample": 0.8,
         "colsample_bytree": 0.8,
-        "tree_method": "hist",
+        **xgboost_device_params(),
     }
     return "XGBoost", model, params
 
@@ -51,7 +167,7 @@ def get_lightgbm():
         learning_rate=0.05,
         subsample=0.8,
         colsample_bytree=0.8,
-        device="gpu",
+        **lightgbm_device_params(),
     )
     params = {
         "boosting_type": "gbdt",
@@ -59,26 +175,35 @@ def get_lightgbm():
         "learning_rate": 0.05,
         "subsample": 0.8,
         "colsample_bytree": 0.8,
-        "device": "gpu",
+        **lightgbm_device_params(),
     }
     return "LightGBM", model, params
 
 
+def catboost_categorical_params():
+    """Native categorical handling when the preprocessor passes raw categories."""
+    if encoder_for("CatBoost") == "native":
+        return {"cat_features": native_cat_feature_indices()}
+    return {}
+
+
 def get_catboost():
+    # Native categorical handling when the preprocessor passes raw categories
     model = CatBoostClassifier(
         iterations=500,
         depth=10,
         learning_rate=0.08,
         loss_function="Logloss",
         verbose=False,
-        task_type="GPU",
+        **catboost_device_params(),
+        **catboost_categorical_params(),
     )
     params = {
         "iterations": 500,
         "depth": 10,
         "learning_rate": 0.08,
         "loss_function": "Logloss",
-        "task_type": "GPU",
+        **catboost_device_params(),
     }
     return "CatBoost", model, params
 
@@ -97,3 +222,78 @@ def get_all_models():
         models[name] = (model, params)
 
     return models
+
+
+# ===============================
+# Hardware profile + timing benchmark
+# ===============================
+
+def _benchmark_fits(rows=20_000, features=50, rounds=50):
+    """Seconds for a small fixed fit per library with the selected device settings."""
+    rng = np.random.default_rng(42)
+    X = rng.random((rows, features)).astype(np.float32)
+    y = (X[:, :5].sum(axis=1) + rng.normal(0, 0.5, rows) > 2.5).astype(int)
+
+    candidates = {
+        "xgboost": xgb.XGBClassifier(n_estimators=rounds, **xgboost_device_params()),
+        "lightgbm": lgb.LGBMClassifier(n_estimators=rounds, **lightgbm_device_params()),
+        "catboost": CatBoostClassifier(
+            iterations=rounds, verbose=False, allow_writing_files=False, **catboost_device_params()
+        ),
+    }
+
+    timings = {}
+    for name, model in candidates.items():
+        start = time.perf_counter()
+        model.fit(X, y)
+        timings[name] = round(time.perf_counter() - start, 3)
+    return timings
+
+
+@functools.lru_cache(maxsize=None)
+def hardware_profile():
+    """
+    Selected devices plus a small timing benchmark, cached in
+    data/reports/hardware_profile.json per host / library versions / device mode.
+    The benchmark only runs in auto mode; cpu / gpu are explicit choices.
+    """
+    identity = {
+        "host": platform.node(),
+        "threads": cpu_threads(),
+        "device_mode": DEVICE,
+        "versions": {
+            "xgboost": xgb.__version__,
+            "lightgbm": lgb.__version__,
+            "catboost": catboost.__version__,
+        },
+    }
+
+    if HARDWARE_PROFILE_FILE.exists():
+        profile = json.loads(HARDWARE_PROFILE_FILE.read_text())
+        if profile.get("identity") == identity:
+            return profile
+
+    profile = {
+        "identity": identity,
+        "devices": {
+            "xgboost": xgboost_device_params()["device"],
+            "lightgbm": lightgbm_device_params()["device"],
+            "catboost": catboost_device_params()["task_type"],
+        },
+        "benchmark_seconds": _benchmark_fits() if DEVICE == "auto" else {},
+    }
+    HARDWARE_PROFILE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    HARDWARE_PROFILE_FILE.write_text(json.dumps(profile, indent=4))
+    logger.info(f"🖥️ Hardware profile → {profile['devices']} | benchmark {profile['benchmark_seconds']}")
+    return profile
+
+
+def hardware_run_params():
+    """Flat view of the hardware profile for MLflow params."""
+    profile = hardware_profile()
+    params = {"hw_threads": profile["identity"]["threads"]}
+    for lib, device in profile["devices"].items():
+        params[f"hw_device_{lib}"] = device
+    for lib, seconds in profile["benchmark_seconds"].items():
+        params[f"hw_bench_{lib}_s"] = seconds
+    return params
@@ -0,0 +1,139 @@
+"""
+Parallel multi-model training
+-----------------------------
+Runs the candidate models at the same time in worker processes and splits
+the machine's cores between them, so wall time approaches the slowest
+model instead of the sum.
+
+- Each worker gets a thread budget; it is applied to the estimator
+  (n_jobs / thread_count) and to native BLAS/OpenMP pools via threadpoolctl.
+- Workers read the memory-mapped matrices from src/training/matrix_cache.py
+  by key (no large arrays are pickled) and log their own MLflow run.
+
+Enable in train_pipeline_07 with LEDGERX_PARALLEL_TRAINING=1; cap the
+cores with LEDGERX_TRAINING_CORES.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from loguru import logger
+
+# Relative cost of each family; heavier models get more threads
+MODEL_WEIGHTS = {
+    "LogisticRegression": 1,
+    "RandomForest": 2,
+    "XGBoost": 2,
+    "LightGBM": 2,
+    "CatBoost": 3,
+}
+
+
+def available_cores():
+    cores = os.environ.get("LEDGERX_TRAINING_CORES")
+    return max(1, int(cores) if cores else (os.cpu_count() or 1))
+
+
+def allocate_cores(model_names, total_cores):
+    """
+    Thread budget per model, summing to at most `total_cores`.
+    Every model gets one core; the rest is shared by weight.
+    """
+    names = list(model_names)
+    if total_cores <= len(names):
+        return {name: 1 for name in names}
+
+    budget = {name: 1 for name in names}
+    spare = total_cores - len(names)
+    weights = {name: MODEL_WEIGHTS.get(name, 1) for name in names}
+    total_weight = sum(weights.values())
+
+    for name in names:
+        budget[name] += spare * weights[name] // total_weight
+
+    # Hand out rounding leftovers, heaviest first
+    leftover = total_cores - sum(budget.values())
+    for name in sorted(names, key=weights.get, reverse=True)[:leftover]:
+        budget[name] += 1
+    return budget
+
+
+def set_thread_budget(model, threads):
+    """Apply a thread budget through whichever parameter the estimator exposes."""
+    # CatBoost's get_params() only lists explicitly set parameters
+    if type(model).__module__.startswith("catboost"):
+        model.set_params(thread_count=threads)
+    elif "n_jobs" in model.get_params():  # sklearn, XGBoost, LightGBM
+        model.set_params(n_jobs=threads)
+    return model
+
+
+def _train_worker(model_name, model, params, threads, cache_key, y_train, y_val, experiment):
+    """Runs in a child process: limit threads, load shared matrices, train + log."""
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+
+    from threadpoolctl import threadpool_limits
+
+    from .matrix_cache import load_matrices
+    from .mlflow_utils_04 import flush_artifacts, init_experiment
+    from .trainer_05 import train_model_on_matrices
+
+    init_experiment(experiment)
+    preprocessor, matrices = load_matrices(cache_key)
+    set_thread_budget(model, threads)
+
+    start = time.perf_counter()
+    with threadpool_limits(limits=threads):
+        pipeline, f1 = train_model_on_matrices(
+            model_name=model_name,
+            model=model,
+            fitted_preprocessor=preprocessor,
+            Z_train=matrices["train"],
+            y_train=y_train,
+            Z_val=matrices["val"],
+            y_val=y_val,
+            params={**(params or {}), "n_threads": threads},
+        )
+    seconds = time.perf_counter() - start
+    flush_artifacts()  # pool workers exit without running atexit handlers
+    return pipeline, f1, seconds
+
+
+def train_models_parallel(models, cache_keys, y_train, y_val, experiment, total_cores=None):
+    """
+    Train {name: (model, params)} concurrently on the matrix-cache entry
+    `cache_keys[name]`. Returns {name: (pipeline, f1)} like the sequential
+    loop; failed models are logged and left out.
+    """
+    total_cores = total_cores or available_cores()
+    budget = allocate_cores(models, total_cores)
+    logger.info(f"🧵 Parallel training on {total_cores} cores → {budget}")
+
+    # spawn: forked children inherit already-started OpenMP/MLflow threads
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=min(len(models), total_cores), mp_context=ctx) as pool:
+        futures = {
+            pool.submit(
+                _train_worker, name, model, params, budget[name],
+                cache_keys[name], y_train, y_val, experiment,
+            ): name
+            for name, (model, params) in models.items()
+        }
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                pipeline, f1, seconds = future.result()
+                results[name] = (pipeline, f1)
+                logger.info(f"⏱️ {name} finished in {seconds:.1f}s ({budget[name]} threads)")
+            except Exception as e:
+                logger.error(f"❌ {name} failed: {e}")
+
+    logger.info(f"⏱️ Parallel training wall time: {time.perf_counter() - start:.1f}s")
+    return results
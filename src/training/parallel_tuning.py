@@ -0,0 +1,258 @@
+"""
+Parallel Optuna tuning on a persistent study store
+--------------------------------------------------
+All studies live in one Optuna journal file, so trials survive a crash
+and several processes can work on the same study at once. Each trial
+records the host / pid running it; only trials whose process is gone
+are failed on resume.
+
+- The CatBoost / XGBoost / LightGBM studies tune at the same time; each
+  family gets a share of the cores (parallel_training.allocate_cores)
+  split over one or more worker processes.
+- Every trial runs under a fixed thread budget (estimator threads via
+  LEDGERX_TRAINING_CORES, BLAS/OpenMP pools via threadpoolctl).
+- A study is named after the family, its categorical encoder and the
+  split key, so a rerun on the same data resumes from the stored trials
+  and only runs the ones still missing.
+
+    data/optuna/tuning.journal
+
+Knobs: LEDGERX_TUNING_TRIALS (per family, default 20),
+LEDGERX_TUNING_WORKERS (processes per family), LEDGERX_TRAINING_CORES,
+LEDGERX_PRUNER (src/training/pruning.py), LEDGERX_FIDELITY_SCHEDULE
+(src/training/fidelity.py), LEDGERX_WARM_START (src/training/warm_start.py).
+"""
+
+import multiprocessing
+import os
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import optuna
+from loguru import logger
+from optuna.storages import JournalStorage
+from optuna.storages.journal import JournalFileBackend
+from optuna.study import MaxTrialsCallback
+from optuna.trial import TrialState
+
+from .parallel_training import allocate_cores, available_cores
+from .fidelity import materialize_rungs, parse_schedule, rung_pruner, rung_positions
+from .pruning import make_pruner
+from .warm_start import seed_study
+
+STUDY_DIR = Path("data/optuna")
+JOURNAL_FILE = STUDY_DIR / "tuning.journal"
+
+N_TRIALS = int(os.environ.get("LEDGERX_TUNING_TRIALS", "20"))
+TUNING_WORKERS = os.environ.get("LEDGERX_TUNING_WORKERS")
+
+# Trials that count towards a study's budget
+FINISHED_STATES = (TrialState.COMPLETE, TrialState.PRUNED)
+
+# user_attrs key holding the host / pid of the process running a trial
+OWNER_ATTR = "owner"
+UNOWNED_GRACE_SECONDS = 60
+
+
+# ===============================
+# Study store
+# ===============================
+
+def open_storage(path=None):
+    path = Path(path or JOURNAL_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return JournalStorage(JournalFileBackend(str(path)))
+
+
+def study_name(family, encoder, split_key, fidelity=()):
+    name = f"ledgerx_{family}_{encoder}_{split_key}"
+    if fidelity:  # rung scores are not comparable with full-data trials
+        name += "_rungs-" + "-".join(f"{f:g}" for f in fidelity)
+    return name
+
+
+def load_study(name, storage):
+    return optuna.create_study(
+        study_name=name, storage=storage, direction="maximize",
+        pruner=rung_pruner() if parse_schedule() else make_pruner(), load_if_exists=True,
+    )
+
+
+def finished_trials(study):
+    return len(study.get_trials(deepcopy=False, states=FINISHED_STATES))
+
+
+def trial_owner():
+    return {"host": platform.node(), "pid": os.getpid()}
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # alive, owned by another user
+        return True
+    return True
+
+
+def _owner_gone(trial, now):
+    owner = trial.user_attrs.get(OWNER_ATTR)
+    if owner is None:
+        # Tagged right after it starts; untagged past the grace period → crashed
+        started = trial.datetime_start
+        return started is None or (now - started).total_seconds() > UNOWNED_GRACE_SECONDS
+    if owner["host"] != platform.node():
+        return False  # another machine's processes cannot be checked from here
+    return not _pid_alive(owner["pid"])
+
+
+def fail_interrupted_trials(study):
+    """
+    RUNNING trials whose worker process no longer exists can never finish;
+    mark them failed. Trials of live processes (e.g. a concurrent tuning
+    run on the same journal) are left alone.
+    """
+    now = datetime.now()
+    stale = [
+        trial for trial in study.get_trials(deepcopy=False, states=(TrialState.RUNNING,))
+        if _owner_gone(trial, now)
+    ]
+    for trial in stale:
+        study.tell(trial.number, state=TrialState.FAIL)
+    return len(stale)
+
+
+# ===============================
+# Workers
+# ===============================
+
+def workers_per_family(family_cores):
+    if TUNING_WORKERS:
+        return max(1, int(TUNING_WORKERS))
+    # Two threads per trial is where the boosting libraries stop scaling well
+    return max(1, family_cores // 2)
+
+
+def _tune_worker(family, name, journal, n_trials, threads):
+    """Runs in a child process: pin the thread budget, then pull trials from the shared study."""
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    # model_definitions_03.cpu_threads() → n_jobs / thread_count of every trial
+    os.environ["LEDGERX_TRAINING_CORES"] = str(threads)
+
+    from threadpoolctl import threadpool_limits
+
+    from .split_cache import SPLITS_DIR, load_split, split_key
+    from .tune_hyperparams_09 import OBJECTIVES, family_preprocessor
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    X_train, X_val, _, y_train, y_val, _ = load_split()
+    preprocessor = family_preprocessor(family)
+    objective = OBJECTIVES[family]
+
+    fidelity = parse_schedule()
+    rungs = None
+    if fidelity:
+        rungs = materialize_rungs(X_train, y_train, fidelity, SPLITS_DIR / split_key() / "rungs")
+
+    owner = trial_owner()
+
+    def run_trial(trial):
+        # Lets fail_interrupted_trials tell a live trial from a crashed one
+        trial.set_user_attr(OWNER_ATTR, owner)
+        return objective(trial, X_train, y_train, X_val, y_val, preprocessor, rungs=rungs)
+
+    study = load_study(name, open_storage(journal))
+    start = time.perf_counter()
+    with threadpool_limits(limits=threads):
+        study.optimize(
+            run_trial,
+            n_trials=n_trials,
+            callbacks=[MaxTrialsCallback(n_trials, states=FINISHED_STATES)],
+        )
+    return time.perf_counter() - start
+
+
+def tune_families_parallel(families, split_key, encoders, n_trials=N_TRIALS, total_cores=None,
+                           fingerprint=None, experiment=None, report_path=None):
+    """
+    Tune {family: model_name} concurrently. `encoders[family]` is the
+    categorical encoder the family trains with. Returns {family: study};
+    families whose workers all failed are logged and left out.
+
+    With a data `fingerprint`, new studies are warm-started from earlier
+    ones (src/training/warm_start.py); `experiment` / `report_path` are
+    the MLflow tuning experiment and tuning report to seed from.
+    """
+    total_cores = total_cores or available_cores()
+    by_name = allocate_cores(families.values(), total_cores)
+    budget = {family: by_name[name] for family, name in families.items()}
+    storage = open_storage()
+
+    jobs = []
+    studies = {}
+    for family in families:
+        name = study_name(family, encoders[family], split_key, parse_schedule())
+        study = load_study(name, storage)
+        studies[family] = study
+
+        if fingerprint is not None and not study.get_trials(deepcopy=False):
+            trial_budget = seed_study(
+                study, storage, f"ledgerx_{family}_{encoders[family]}_", family, families[family],
+                {**fingerprint, "fidelity": list(parse_schedule())},
+                n_trials, experiment=experiment, report_path=report_path,
+            )
+            study.set_user_attr("trial_budget", trial_budget)
+        trial_budget = study.user_attrs.get("trial_budget", n_trials)
+
+        interrupted = fail_interrupted_trials(study)
+        done = finished_trials(study)
+        remaining = max(0, trial_budget - done)
+        if interrupted:
+            logger.warning(f"⚠️ {family}: {interrupted} interrupted trial(s) marked failed")
+        if done:
+            logger.info(f"♻️ {family}: resuming study {name} ({done}/{trial_budget} trials stored)")
+        if not remaining:
+            continue
+
+        workers = min(workers_per_family(budget[family]), remaining)
+        threads = max(1, budget[family] // workers)
+        logger.info(f"🧵 {family}: {remaining} trials on {workers} worker(s) × {threads} thread(s)")
+        jobs += [(family, name, trial_budget, threads) for _ in range(workers)]
+
+    if jobs and parse_schedule():
+        # Store the rung positions before any worker starts: workers only read them
+        from .split_cache import SPLITS_DIR, load_split
+
+        y_train = load_split(columns=[])[3]
+        rung_positions(y_train, parse_schedule(), SPLITS_DIR / split_key / "rungs")
+
+    if jobs:
+        # spawn: forked children inherit already-started OpenMP/MLflow threads
+        ctx = multiprocessing.get_context("spawn")
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=len(jobs), mp_context=ctx) as pool:
+            futures = {
+                pool.submit(_tune_worker, family, name, str(JOURNAL_FILE), trials, threads): family
+                for family, name, trials, threads in jobs
+            }
+            for future in as_completed(futures):
+                family = futures[future]
+                try:
+                    seconds = future.result()
+                    logger.info(f"⏱️ {family} worker finished in {seconds:.1f}s")
+                except Exception as e:
+                    logger.error(f"❌ {family} tuning worker failed: {e}")
+        logger.info(f"⏱️ Parallel tuning wall time: {time.perf_counter() - start:.1f}s")
+
+    results = {}
+    for family, study in studies.items():
+        if any(t.state == TrialState.COMPLETE for t in study.get_trials(deepcopy=False)):
+            results[family] = study
+        else:
+            logger.error(f"❌ {family}: no completed trials")
+    return results
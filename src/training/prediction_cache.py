@@ -0,0 +1,188 @@
+"""
+Shared test-set predictions for the post-training analyses
+----------------------------------------------------------
+Evaluation (08), bias slicing (10) and sensitivity analysis (11) all need
+the same inference pass over X_test. It runs once per (model file, split)
+and is stored columnar next to the transformed features:
+
+    data/cache/predictions/<model sha[:16]>-<split key>/
+        meta.json            model path, feature names, matrix format
+        index.npy            test row labels
+        y_true.npy / y_pred.npy / y_prob.npy
+        features.npy         transformed X_test (CSR parts when sparse)
+
+A retrained or re-tuned model has a new hash, so stale entries are never
+read; LEDGERX_FORCE_PREDICTIONS=1 recomputes anyway.
+"""
+
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from loguru import logger
+from sklearn.pipeline import Pipeline
+
+from src.common.file_digests import file_digest
+
+from .matrix_cache import _load_matrix, _save_matrix
+from .split_cache import load_split, split_key
+
+PREDICTIONS_DIR = Path("data/cache/predictions")
+DIGEST_INDEX = "digests.json"
+
+
+@dataclass
+class Predictions:
+    model_path: Path
+    key: str
+    y_true: pd.Series      # indexed like X_test
+    y_pred: np.ndarray
+    y_prob: np.ndarray     # P(failure)
+    features: object       # transformed X_test (ndarray or CSR), None without a preprocessor
+    feature_names: list
+
+
+def force_enabled():
+    return os.environ.get("LEDGERX_FORCE_PREDICTIONS", "0").lower() in ("1", "true", "yes")
+
+
+def _model_digest(model_path):
+    index_path = PREDICTIONS_DIR / DIGEST_INDEX
+    index = json.loads(index_path.read_text()) if index_path.exists() else {}
+    before = json.dumps(index, sort_keys=True)
+    digest = file_digest(model_path, index)
+
+    if json.dumps(index, sort_keys=True) != before:
+        PREDICTIONS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(index, indent=2))
+        tmp.replace(index_path)
+    return digest
+
+
+def prediction_key(model_path):
+    return f"{_model_digest(model_path)[:16]}-{split_key()}"
+
+
+def _feature_names(preprocessor, n_features):
+    try:
+        return [str(name) for name in preprocessor.get_feature_names_out()]
+    except Exception:
+        logger.warning("Could not extract feature names from preprocessor. Using generic names.")
+        return [f"feat_{i}" for i in range(n_features)]
+
+
+# ===============================
+# Store / load
+# ===============================
+
+def _predict(model_path):
+    """One inference pass: transform X_test once, predict on the matrix."""
+    _, _, X_test, _, _, y_test = load_split()
+    pipeline = joblib.load(model_path)
+    logger.info(f"📦 Loaded model for test predictions → {model_path}")
+
+    if isinstance(pipeline, Pipeline) and len(pipeline.steps) > 1:
+        preprocessor, model = pipeline[:-1], pipeline.steps[-1][1]
+        features = preprocessor.transform(X_test)
+        names = _feature_names(preprocessor, features.shape[1])
+    else:
+        model, features, names = pipeline, None, []
+
+    inputs = X_test if features is None else features
+    return {
+        "y_test": y_test,
+        "y_pred": np.asarray(model.predict(inputs)),
+        "y_prob": np.asarray(model.predict_proba(inputs)[:, 1], dtype=np.float64),
+        "features": features,
+        "feature_names": names,
+    }
+
+
+def save_predictions(key, model_path, result):
+    out_dir = PREDICTIONS_DIR / key
+    tmp_dir = PREDICTIONS_DIR / f".{key}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    y_test = result["y_test"]
+    np.save(tmp_dir / "index.npy", y_test.index.to_numpy())
+    np.save(tmp_dir / "y_true.npy", y_test.to_numpy())
+    np.save(tmp_dir / "y_pred.npy", result["y_pred"])
+    np.save(tmp_dir / "y_prob.npy", result["y_prob"])
+
+    meta = {
+        "key": key,
+        "model_path": str(model_path),
+        "target": y_test.name,
+        "target_dtype": str(y_test.dtype),
+        "feature_names": result["feature_names"],
+        "features": None,
+    }
+    if result["features"] is not None:
+        meta["features"] = _save_matrix(tmp_dir, "features", result["features"])
+
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+    shutil.rmtree(out_dir, ignore_errors=True)  # forced recompute
+    try:
+        tmp_dir.rename(out_dir)
+    except OSError:  # another stage finished first; its copy is identical
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def read_predictions(key):
+    out_dir = PREDICTIONS_DIR / key
+    meta_path = out_dir / "meta.json"
+    if not meta_path.exists():
+        return None
+
+    meta = json.loads(meta_path.read_text())
+    mapped = {
+        name: np.load(out_dir / f"{name}.npy", mmap_mode="c").view(np.ndarray)
+        for name in ("y_true", "y_pred", "y_prob")
+    }
+    y_true = pd.Series(
+        mapped["y_true"],
+        index=pd.Index(np.load(out_dir / "index.npy")),
+        name=meta["target"], dtype=meta["target_dtype"],
+    )
+    features = None
+    if meta["features"] is not None:
+        features = _load_matrix(out_dir, "features", meta["features"])
+
+    return Predictions(
+        model_path=Path(meta["model_path"]),
+        key=key,
+        y_true=y_true,
+        y_pred=mapped["y_pred"],
+        y_prob=mapped["y_prob"],
+        features=features,
+        feature_names=meta["feature_names"],
+    )
+
+
+def load_predictions(model_path):
+    """Test-set predictions of the model at `model_path`, computed on first use."""
+    start = time.perf_counter()
+    key = prediction_key(model_path)
+
+    if not force_enabled():
+        cached = read_predictions(key)
+        if cached is not None:
+            logger.info(
+                f"♻️ Reusing test predictions {key} "
+                f"({(time.perf_counter() - start) * 1000:.0f} ms, no inference)"
+            )
+            return cached
+
+    save_predictions(key, model_path, _predict(model_path))
+    logger.success(
+        f"💾 Test predictions cached in {time.perf_counter() - start:.1f}s → {PREDICTIONS_DIR / key}"
+    )
+    return read_predictions(key)
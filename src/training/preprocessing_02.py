@@ -1,7 +1,20 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.impute import SimpleImputer
+from sklearn.model_selection import StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler, TargetEncoder
 from loguru import logger
 
+from .text_features import N_FEATURES, OUT_FILE as TEXT_FEATURES_FILE, hash_texts
+
 CATEGORICAL_FEATURES = ["vendor_name", "currency"]
 NUMERICAL_FEATURES = [
     "invoice_number_length",
@@ -11,14 +24,188 @@ NUMERICAL_FEATURES = [
     "blur_flag",
 ]
 
+# Append hashed OCR text features (src/training/text_features.py)
+TEXT_FEATURES = os.environ.get("LEDGERX_TEXT_FEATURES", "0") == "1"
+
+# onehot | onehot_capped | target | hashing | native
+#   native: CatBoost receives the raw categories (cat_features); the other
+#   models fall back to onehot_capped
+CATEGORICAL_ENCODER = os.environ.get("LEDGERX_CATEGORICAL_ENCODER", "onehot").lower()
+ENCODERS = ("onehot", "onehot_capped", "target", "hashing", "native")
+
+MIN_CATEGORY_FREQUENCY = 20   # onehot_capped: rarer vendors share one "infrequent" column
+MAX_CATEGORIES = 64
+CATEGORY_HASH_FEATURES = 256
+MISSING_CATEGORY = "__missing__"
+
+
+class CategoryHasher(BaseEstimator, TransformerMixin):
+    """Stateless hashing of "column=value" tokens into a fixed-width sparse block."""
+
+    def __init__(self, n_features=CATEGORY_HASH_FEATURES):
+        self.n_features = n_features
+
+    def fit(self, X, y=None):
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        return self
+
+    def transform(self, X):
+        values = X.astype("string").fillna(MISSING_CATEGORY)
+        tokens = zip(*[(f"{col}=" + values[col]).tolist() for col in values.columns])
+        hasher = FeatureHasher(
+            n_features=self.n_features, input_type="string", alternate_sign=False
+        )
+        return hasher.transform(tokens)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.array([f"cat_hash_{i}" for i in range(self.n_features)], dtype=object)
+
+
+def make_categorical_encoder(encoder):
+    if encoder == "onehot":
+        return OneHotEncoder(handle_unknown="ignore")
+    if encoder == "onehot_capped":
+        return OneHotEncoder(
+            handle_unknown="infrequent_if_exist",
+            min_frequency=MIN_CATEGORY_FREQUENCY,
+            max_categories=MAX_CATEGORIES,
+        )
+    if encoder == "target":
+        # fit_transform is cross-fitted (out-of-fold) on the training split
+        folds = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+        return TargetEncoder(target_type="binary", cv=folds)
+    if encoder == "hashing":
+        return CategoryHasher()
+    if encoder == "native":
+        # Raw strings for CatBoost's own categorical handling
+        return SimpleImputer(strategy="constant", fill_value=MISSING_CATEGORY)
+    raise ValueError(f"Unknown categorical encoder '{encoder}' (expected one of {ENCODERS})")
+
+
+def encoder_for(model_name, encoder=None):
+    """Encoder a given model (None = any non-CatBoost model) trains with."""
+    encoder = encoder or CATEGORICAL_ENCODER
+    if encoder == "native" and model_name != "CatBoost":
+        return "onehot_capped"
+    return encoder
+
+
+def native_cat_feature_indices():
+    """Column positions of the raw categories in the "native" preprocessor output."""
+    return list(range(len(CATEGORICAL_FEATURES)))
+
+
+TEXT_INPUT_COLUMNS = ["invoice_id", "ocr_text"]
+
+
+class TextInputColumns(BaseEstimator, TransformerMixin):
+    """
+    Adds an empty `ocr_text` column when X has none, so the text block of
+    the ColumnTransformer always selects the same fixed columns.
+    """
+
+    def fit(self, X, y=None):
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        return self
 
-def build_preprocessor():
+    def transform(self, X):
+        if "ocr_text" in X.columns:
+            return X
+        return X.assign(ocr_text=pd.Series(pd.NA, index=X.index, dtype="string"))
+
+    def get_feature_names_out(self, input_features=None):
+        names = list(self.feature_names_in_ if input_features is None else input_features)
+        return np.asarray(names + ([] if "ocr_text" in names else ["ocr_text"]), dtype=object)
+
+
+class TextFeatureLookup(BaseEstimator, TransformerMixin):
+    """
+    Sparse hashed-text rows for the invoices in X (invoice_id, ocr_text).
+
+    - rows carrying raw `ocr_text` → hashed on the fly (online scoring)
+    - rows without text → rows of the precomputed matrix, gathered by invoice_id
+
+    The matrix is loaded on first use and is never pickled with the model.
+    """
+
+    def __init__(self, matrix_path=str(TEXT_FEATURES_FILE)):
+        self.matrix_path = matrix_path
+
+    def fit(self, X, y=None):
+        return self
+
+    def _matrix(self):
+        if getattr(self, "_cache", None) is None:
+            self._cache = sparse.load_npz(self.matrix_path).tocsr()
+        return self._cache
+
+    def _lookup(self, invoice_ids):
+        matrix = self._matrix()
+        ids = invoice_ids.to_numpy(dtype=np.int64)
+        known = (ids >= 0) & (ids < matrix.shape[0])
+
+        # Invoices without OCR text get an all-zero row
+        rows = matrix[np.where(known, ids, 0)]
+        return sparse.diags(known.astype(np.float32)) @ rows
+
+    def transform(self, X):
+        text = X["ocr_text"]
+        given = text.notna().to_numpy()
+        if given.all():
+            return hash_texts(text)  # no matrix needed
+        if not given.any():
+            return self._lookup(X["invoice_id"])
+
+        # Mixed frame: hashed rows replace the looked-up ones where text is given
+        positions = np.flatnonzero(given)
+        place = sparse.csr_matrix(
+            (np.ones(len(positions), dtype=np.float32), (positions, np.arange(len(positions)))),
+            shape=(len(X), len(positions)),
+        )
+        looked_up = sparse.diags((~given).astype(np.float32)) @ self._lookup(X["invoice_id"])
+        return (looked_up + place @ hash_texts(text[given])).tocsr()
+
+    def get_feature_names_out(self, input_features=None):
+        return np.array([f"text_hash_{i}" for i in range(N_FEATURES)], dtype=object)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_cache", None)
+        return state
+
+
+def build_preprocessor(text_features=None, encoder=None):
     logger.info("🔧 Building preprocessing transformer")
 
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ("cat", OneHotEncoder(handle_unknown="ignore"), CATEGORICAL_FEATURES),
-            ("num", StandardScaler(), NUMERICAL_FEATURES),
-        ]
-    )
+    if text_features is None:
+        text_features = TEXT_FEATURES
+    # Without an explicit encoder, "native" mode means onehot_capped (non-CatBoost)
+    encoder = encoder or encoder_for(None)
+
+    transformers = [
+        ("cat", make_categorical_encoder(encoder), CATEGORICAL_FEATURES),
+        ("num", StandardScaler(), NUMERICAL_FEATURES),
+    ]
+
+    if encoder == "native":
+        if text_features:
+            raise ValueError("The native encoder yields a dense object matrix; disable text features")
+        # Categories stay first (see native_cat_feature_indices)
+        return ColumnTransformer(transformers=transformers, sparse_threshold=0.0)
+
+    if text_features:
+        if not Path(TEXT_FEATURES_FILE).exists():
+            raise FileNotFoundError(
+                f"{TEXT_FEATURES_FILE} not found — run python -m src.training.text_features"
+            )
+        logger.info(f"🔤 Adding hashed OCR text features ({N_FEATURES} columns, sparse)")
+        transformers.append(("text", TextFeatureLookup(str(TEXT_FEATURES_FILE)), TEXT_INPUT_COLUMNS))
+
+        # Keep the stacked output sparse instead of densifying it
+        return Pipeline([
+            ("text_input", TextInputColumns()),
+            ("columns", ColumnTransformer(transformers=transformers, sparse_threshold=1.0)),
+        ])
+
+    preprocessor = ColumnTransformer(transformers=transformers)
     return preprocessor
@@ -0,0 +1,179 @@
+"""
+Optuna trial pruning for the boosting objectives
+------------------------------------------------
+Each library reports the validation logloss (negated, so higher is
+better like the study's F1 objective) every REPORT_INTERVAL boosting
+rounds; the study's pruner stops unpromising trials mid-training.
+
+    LEDGERX_PRUNER = median (default) | sha | hyperband | none
+
+Every trial records how many rounds it trained, how many it was allowed
+and its fit time, so the report can estimate the time pruning saved.
+In multi-fidelity mode (src/training/fidelity.py) the data rungs replace
+the per-round reports.
+"""
+
+import os
+import time
+
+import optuna
+from loguru import logger
+
+from .fidelity import fit_on_rungs
+from .trainer_05 import fit_pipeline
+
+PRUNER = os.environ.get("LEDGERX_PRUNER", "median").lower()
+PRUNERS = ("median", "sha", "hyperband", "none")
+
+REPORT_INTERVAL = 10     # rounds between intermediate reports
+MIN_RESOURCE = 50        # rounds every trial gets before it can be pruned
+MAX_RESOURCE = 1000      # largest n_estimators / iterations in the search spaces
+REDUCTION_FACTOR = 3
+
+
+def make_pruner(name=None):
+    name = (name or PRUNER).lower()
+    if name == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=MIN_RESOURCE)
+    if name == "sha":
+        return optuna.pruners.SuccessiveHalvingPruner(
+            min_resource=MIN_RESOURCE, reduction_factor=REDUCTION_FACTOR
+        )
+    if name == "hyperband":
+        return optuna.pruners.HyperbandPruner(
+            min_resource=MIN_RESOURCE, max_resource=MAX_RESOURCE, reduction_factor=REDUCTION_FACTOR
+        )
+    if name == "none":
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"Unknown pruner '{name}' (expected one of {PRUNERS})")
+
+
+# ===============================
+# Per-library callbacks
+# ===============================
+
+class _Reporter:
+    """Shared bookkeeping: report -logloss and remember where training stopped."""
+
+    def __init__(self, trial):
+        self.trial = trial
+        self.rounds = 0
+        self.pruned_at = None
+
+    def step(self, iteration, logloss):
+        self.rounds = iteration + 1
+        if self.rounds % REPORT_INTERVAL:
+            return False
+        self.trial.report(-logloss, step=self.rounds)
+        if self.trial.should_prune():
+            self.pruned_at = self.rounds
+            return True
+        return False
+
+
+def _xgboost_callback(trial):
+    from xgboost.callback import TrainingCallback
+
+    class XGBoostPruning(TrainingCallback, _Reporter):
+        def __init__(self):
+            _Reporter.__init__(self, trial)
+
+        def after_iteration(self, model, epoch, evals_log):
+            # True stops boosting
+            return self.step(epoch, evals_log["validation_0"]["logloss"][-1])
+
+    return XGBoostPruning()
+
+
+class LightGBMPruning(_Reporter):
+    order = 30  # after early stopping
+
+    def __call__(self, env):
+        import lightgbm as lgb
+
+        for _, metric, value, _ in env.evaluation_result_list:
+            if metric == "binary_logloss" and self.step(env.iteration, value):
+                raise lgb.callback.EarlyStopException(env.iteration, env.evaluation_result_list)
+
+
+class CatBoostPruning(_Reporter):
+    def after_iteration(self, info):
+        # False stops boosting
+        return not self.step(info.iteration - 1, info.metrics["validation"]["Logloss"][-1])
+
+
+def pruning_callback(trial, model):
+    """The reporting callback matching `model`'s library, or None."""
+    family = type(model).__module__.split(".")[0]
+    if family == "xgboost":
+        return _xgboost_callback(trial)
+    if family == "lightgbm":
+        return LightGBMPruning(trial)
+    if family == "catboost" and model.get_params().get("task_type", "CPU") == "CPU":
+        return CatBoostPruning(trial)  # CatBoost's GPU mode has no Python callbacks
+    return None
+
+
+def planned_rounds(model):
+    params = model.get_params()
+    return params.get("n_estimators") or params.get("iterations") or MAX_RESOURCE
+
+
+# ===============================
+# Objective helper
+# ===============================
+
+def fit_trial(trial, preprocessor, model, X_train, y_train, X_val, y_val, rungs=None):
+    """
+    fit_pipeline() with intermediate reporting. Raises optuna.TrialPruned
+    when the pruner stops the trial; otherwise returns the pipeline.
+
+    With `rungs` (src/training/fidelity.py) the trial climbs the data
+    subsamples instead and the rung scores are the intermediate values.
+    """
+    trial.set_user_attr("rounds_planned", planned_rounds(model))
+    if rungs:
+        trial.set_user_attr("rungs_planned", [fraction for fraction, _, _ in rungs])
+        return fit_on_rungs(trial, preprocessor, model, rungs, X_val, y_val)
+
+    callback = pruning_callback(trial, model)
+    start = time.perf_counter()
+    pipeline, best_iteration = fit_pipeline(
+        preprocessor, model, X_train, y_train, X_val, y_val,
+        callbacks=[callback] if callback else None,
+    )
+
+    trial.set_user_attr("fit_seconds", time.perf_counter() - start)
+    trial.set_user_attr("best_iteration", best_iteration)
+    if callback is not None:
+        trial.set_user_attr("rounds_trained", callback.rounds)
+        if callback.pruned_at is not None:
+            raise optuna.TrialPruned(f"pruned at round {callback.pruned_at}")
+    return pipeline
+
+
+def _seconds_saved(attrs):
+    rounds = attrs.get("rounds_trained")
+    if rounds and "fit_seconds" in attrs and "rounds_planned" in attrs:
+        # Time per round so far × rounds the trial no longer needed
+        return attrs["fit_seconds"] / rounds * max(0, attrs["rounds_planned"] - rounds)
+
+    fraction = attrs.get("rung_fraction")
+    if fraction and "rung_seconds" in attrs and "rungs_planned" in attrs:
+        # Fit time scales roughly with rows: the skipped, larger rungs
+        skipped = sum(f for f in attrs["rungs_planned"] if f > fraction)
+        return attrs["rung_seconds"] / fraction * skipped
+    return 0.0
+
+
+def pruning_summary(study):
+    """Completed / pruned trial counts and the estimated fit time pruning saved."""
+    trials = study.get_trials(deepcopy=False)
+    pruned = [t for t in trials if t.state == optuna.trial.TrialState.PRUNED]
+    complete = [t for t in trials if t.state == optuna.trial.TrialState.COMPLETE]
+
+    saved = sum(_seconds_saved(t.user_attrs) for t in pruned)
+
+    summary = {"complete": len(complete), "pruned": len(pruned), "seconds_saved": saved}
+    logger.info(f"✂️ {study.study_name}: {summary['pruned']} pruned trials, ~{saved:.0f}s saved")
+    return summary
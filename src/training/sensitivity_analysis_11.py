@@ -1,11 +1,10 @@
 from pathlib import Path
 import joblib
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 from loguru import logger
 
-from .load_data_01 import load_data, split_data
+from .prediction_cache import load_predictions
 
 # Try importing shap – user must install it via `pip install shap`
 import shap
@@ -40,20 +39,6 @@ def get_pipeline():
     return pipeline, model_path
 
 
-def get_feature_names(preprocessor, X_sample: pd.DataFrame):
-    """
-    Try to get transformed feature names from the ColumnTransformer.
-    Fallback to generic names if unavailable.
-    """
-    try:
-        # sklearn >= 1.0
-        feature_names = preprocessor.get_feature_names_out()
-        return list(feature_names)
-    except Exception:
-        logger.warning("Could not extract feature names from preprocessor. Using generic names.")
-        return [f"feat_{i}" for i in range(preprocessor.transform(X_sample).shape[1])]
-
-
 def plot_feature_importance(model, feature_names, out_path, top_n=20):
     """
     Plot bar chart of top_n feature importances.
@@ -89,19 +74,17 @@ def plot_feature_importance(model, feature_names, out_path, top_n=20):
     logger.success(f"📊 Feature importance plot saved → {out_path}")
 
 
-def compute_shap_summary(model, preprocessor, X_train: pd.DataFrame, feature_names, out_path, max_samples=500):
+def compute_shap_summary(model, X_features, feature_names, out_path, max_samples=500):
     """
     Compute and save a SHAP summary plot for the tree-based model.
-    We compute SHAP on the transformed feature space.
+    SHAP runs on the cached transformed test features (no re-transform).
     """
     # Subsample for speed
-    if len(X_train) > max_samples:
-        X_sample = X_train.sample(n=max_samples, random_state=42)
+    if X_features.shape[0] > max_samples:
+        rows = np.random.default_rng(42).choice(X_features.shape[0], size=max_samples, replace=False)
+        X_trans = X_features[np.sort(rows)]
     else:
-        X_sample = X_train.copy()
-
-    # Transform features
-    X_trans = preprocessor.transform(X_sample)
+        X_trans = X_features
 
     logger.info(f"Using {X_trans.shape[0]} samples and {X_trans.shape[1]} transformed features for SHAP.")
 
@@ -131,29 +114,25 @@ def compute_shap_summary(model, preprocessor, X_train: pd.DataFrame, feature_nam
 def main():
     logger.info("📘 Running Sensitivity Analysis (Feature Importance & SHAP)")
 
-    # 1) Load data and split
-    df = load_data()
-    X_train, X_val, X_test, y_train, y_val, y_test = split_data(df)
-
-    # 2) Load pipeline and extract components
+    # 1) Load pipeline and extract components
     pipeline, model_path = get_pipeline()
 
     if "preprocessor" not in pipeline.named_steps or "model" not in pipeline.named_steps:
         raise ValueError("Pipeline must contain 'preprocessor' and 'model' steps.")
 
-    preprocessor = pipeline.named_steps["preprocessor"]
     model = pipeline.named_steps["model"]
 
-    # 3) Determine transformed feature names
-    feature_names = get_feature_names(preprocessor, X_train)
+    # 2) Transformed test features + feature names, shared with 08 / 10
+    preds = load_predictions(model_path)
+    feature_names = preds.feature_names
 
-    # 4) Plot feature importance (if available)
+    # 3) Plot feature importance (if available)
     plot_feature_importance(model, feature_names, FI_FIG_PATH, top_n=20)
 
-    # 5) Compute SHAP summary
-    compute_shap_summary(model, preprocessor, X_train, feature_names, SHAP_FIG_PATH)
+    # 4) Compute SHAP summary
+    compute_shap_summary(model, preds.features, feature_names, SHAP_FIG_PATH)
 
-    # 6) Write sensitivity report
+    # 5) Write sensitivity report
     logger.info(f"📝 Writing sensitivity report → {SENSITIVITY_REPORT_PATH}")
     with open(SENSITIVITY_REPORT_PATH, "w", encoding="utf-8") as f:
         f.write("LedgerX – Sensitivity Analysis Report\n")
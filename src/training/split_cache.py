@@ -0,0 +1,207 @@
+"""
+Cached train / val / test split
+-------------------------------
+The stratified split is computed once per dataset version and stored as
+index arrays plus one .npy partition per split and column. Entry points
+(07–11) load it memory-mapped, reading only the columns they ask for,
+and always get the same rows as split_data(load_data()).
+
+    data/splits/<key>/
+        meta.json                     columns, dtypes, row counts
+        train.index.npy               original row labels
+        train.y.npy                   failure_label
+        train.<column>.npy            numeric values (datetimes as int64)
+        train.<column>.codes.npy      strings: codes into meta categories
+
+The key covers the content hash of the model-ready CSV, the split
+parameters and the near-duplicate filter.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.common.file_digests import file_digest
+
+from . import load_data_01
+from .load_data_01 import load_data, split_data
+
+SPLITS_DIR = Path("data/splits")
+DIGEST_INDEX = "digests.json"
+SPLITS = ("train", "val", "test")
+TARGET = "failure_label"
+FORMAT_VERSION = 3   # 2: invoice_date parsed on the CSV path too; 3: no failure_rule_mask in X
+
+
+# ===============================
+# Key
+# ===============================
+
+def split_key():
+    """Dataset version + split parameters → 16-char key."""
+    index_path = SPLITS_DIR / DIGEST_INDEX
+    index = json.loads(index_path.read_text()) if index_path.exists() else {}
+    before = json.dumps(index, sort_keys=True)
+    digest = file_digest(load_data_01.DATA_FILE, index)
+
+    if json.dumps(index, sort_keys=True) != before:
+        # Atomic replace: tuning workers read this file concurrently
+        SPLITS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(index, indent=2))
+        tmp.replace(index_path)
+
+    params = {
+        "data": digest,
+        "drop_near_duplicates": load_data_01.DROP_NEAR_DUPLICATES,
+        "test_size": load_data_01.TEST_SIZE,
+        "val_test_size": load_data_01.VAL_TEST_SIZE,
+        "random_state": load_data_01.RANDOM_STATE,
+        "format": FORMAT_VERSION,
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# ===============================
+# Column partitions
+# ===============================
+
+def _encode_column(out_dir, split, column, series):
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or (
+        pd.api.types.is_numeric_dtype(dtype) and isinstance(dtype, np.dtype)
+    ):
+        np.save(out_dir / f"{split}.{column}.npy", series.to_numpy())
+        return {"kind": "numeric"}
+    if isinstance(dtype, np.dtype) and dtype.kind == "M":
+        np.save(out_dir / f"{split}.{column}.npy", series.to_numpy().view(np.int64))
+        return {"kind": "datetime"}
+
+    codes, categories = pd.factorize(series, use_na_sentinel=True)
+    np.save(out_dir / f"{split}.{column}.codes.npy", codes.astype(np.int32))
+    return {"kind": "codes", "categories": categories.tolist()}
+
+
+def _mapped(path):
+    """Copy-on-write memory map, exposed as a plain ndarray view."""
+    return np.load(path, mmap_mode="c").view(np.ndarray)
+
+
+def _decode_column(out_dir, split, column, info, dtype):
+    if info["kind"] == "numeric":
+        return _mapped(out_dir / f"{split}.{column}.npy")
+    if info["kind"] == "datetime":
+        values = _mapped(out_dir / f"{split}.{column}.npy")
+        return values.view(np.dtype(dtype))  # keeps the stored resolution
+
+    codes = np.load(out_dir / f"{split}.{column}.codes.npy")
+    categories = np.asarray(info["categories"], dtype=object)
+    values = categories.take(np.maximum(codes, 0)) if len(categories) else np.full(len(codes), None)
+    values[codes < 0] = None
+    return pd.array(values, dtype=dtype)
+
+
+# ===============================
+# Store / load
+# ===============================
+
+def save_split(key, splits):
+    """Write {split: (X, y)} atomically under SPLITS_DIR/<key>."""
+    out_dir = SPLITS_DIR / key
+    tmp_dir = SPLITS_DIR / f".{key}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    X_first = splits["train"][0]
+    meta = {
+        "key": key,
+        "columns": list(X_first.columns),
+        "dtypes": {c: str(X_first[c].dtype) for c in X_first.columns},
+        "target_dtype": str(splits["train"][1].dtype),
+        "rows": {},
+        "encoding": {},
+    }
+
+    for split, (X, y) in splits.items():
+        np.save(tmp_dir / f"{split}.index.npy", X.index.to_numpy())
+        np.save(tmp_dir / f"{split}.y.npy", y.to_numpy())
+        meta["rows"][split] = len(X)
+        meta["encoding"][split] = {
+            column: _encode_column(tmp_dir, split, column, X[column]) for column in X.columns
+        }
+
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=2, default=str))
+    try:
+        tmp_dir.rename(out_dir)
+    except OSError:  # another process finished first; its copy is identical
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def read_split(key, columns=None):
+    """6-tuple like split_data(), restricted to `columns`, or None if not cached."""
+    out_dir = SPLITS_DIR / key
+    meta_path = out_dir / "meta.json"
+    if not meta_path.exists():
+        return None
+
+    meta = json.loads(meta_path.read_text())
+    columns = meta["columns"] if columns is None else list(columns)
+    missing = set(columns) - set(meta["columns"])
+    if missing:
+        raise KeyError(f"Columns not in cached split: {sorted(missing)}")
+
+    X, y = {}, {}
+    for split in SPLITS:
+        index = pd.Index(np.load(out_dir / f"{split}.index.npy"))
+        X[split] = pd.DataFrame(
+            {
+                column: _decode_column(
+                    out_dir, split, column,
+                    meta["encoding"][split][column], meta["dtypes"][column],
+                )
+                for column in columns
+            },
+            index=index,
+            columns=columns,
+        )
+        y[split] = pd.Series(
+            _mapped(out_dir / f"{split}.y.npy"),
+            index=index, name=TARGET, dtype=meta["target_dtype"],
+        )
+        if len(X[split]) != meta["rows"][split]:
+            raise ValueError(f"Cached split {key} is corrupt ({split} row count)")
+
+    return X["train"], X["val"], X["test"], y["train"], y["val"], y["test"]
+
+
+def load_split(columns=None):
+    """
+    (X_train, X_val, X_test, y_train, y_val, y_test) for the current
+    dataset version, materializing the split on first use.
+    """
+    start = time.perf_counter()
+    key = split_key()
+
+    cached = read_split(key, columns)
+    if cached is not None:
+        logger.info(
+            f"♻️ Loaded cached split {key} in {(time.perf_counter() - start) * 1000:.0f} ms "
+            f"→ train: {len(cached[0])}, val: {len(cached[1])}, test: {len(cached[2])}"
+        )
+        return cached
+
+    X_train, X_val, X_test, y_train, y_val, y_test = split_data(load_data())
+    save_split(key, {
+        "train": (X_train, y_train),
+        "val": (X_val, y_val),
+        "test": (X_test, y_test),
+    })
+    logger.success(f"💾 Split materialized → {SPLITS_DIR / key}")
+    return read_split(key, columns)
@@ -0,0 +1,94 @@
+"""
+Hashed OCR text features
+------------------------
+Streams fatura_ocr.csv in chunks through a stateless HashingVectorizer:
+no vocabulary pass, fixed width, memory bounded by one chunk plus the
+sparse result. Rows align with fatura_cleaned.csv, so row i belongs to
+invoice_id i in the model-ready data.
+
+Output (next to the tabular features):
+    data/processed/fatura_text_features.npz        (CSR, float32)
+    data/processed/fatura_text_features.meta.json
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from src.common.file_digests import file_digest
+
+OCR_FILE = Path("data/processed/fatura_ocr.csv")
+OUT_FILE = Path("data/processed/fatura_text_features.npz")
+META_FILE = Path("data/processed/fatura_text_features.meta.json")
+
+CHUNK_SIZE = 5_000
+N_FEATURES = 2 ** 14
+
+# Char n-grams inside word boundaries are robust to OCR misreads
+VECTORIZER_PARAMS = {
+    "n_features": N_FEATURES,
+    "analyzer": "char_wb",
+    "ngram_range": (3, 5),
+    "lowercase": True,
+    "alternate_sign": False,
+    "norm": "l2",
+}
+
+
+def make_vectorizer():
+    return HashingVectorizer(dtype=np.float32, **VECTORIZER_PARAMS)
+
+
+def hash_texts(texts):
+    """CSR rows for raw OCR strings (also used for online scoring)."""
+    texts = pd.Series(texts, dtype="string").fillna("")
+    return make_vectorizer().transform(texts.tolist()).tocsr()
+
+
+def build_text_matrix(path=OCR_FILE, chunk_size=CHUNK_SIZE):
+    blocks = []
+    for chunk in pd.read_csv(path, usecols=["ocr_text"], chunksize=chunk_size):
+        blocks.append(hash_texts(chunk["ocr_text"]))
+    return sparse.vstack(blocks, format="csr") if blocks else sparse.csr_matrix((0, N_FEATURES))
+
+
+def main():
+    logger.info("🔤 Building hashed OCR text features...")
+
+    if not OCR_FILE.exists():
+        raise FileNotFoundError(f"OCR file not found: {OCR_FILE}")
+
+    # Same OCR file + same hashing config → nothing to do
+    fp = hashlib.sha256(
+        (file_digest(OCR_FILE, {}) + json.dumps(VECTORIZER_PARAMS, sort_keys=True)).encode()
+    ).hexdigest()
+    if OUT_FILE.exists() and META_FILE.exists():
+        if json.loads(META_FILE.read_text()).get("fingerprint") == fp:
+            logger.info(f"♻️ Text features up to date → {OUT_FILE}")
+            return
+
+    matrix = build_text_matrix(OCR_FILE)
+    OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    sparse.save_npz(OUT_FILE, matrix)
+
+    META_FILE.write_text(json.dumps({
+        "fingerprint": fp,
+        "rows": matrix.shape[0],
+        "n_features": matrix.shape[1],
+        "nnz": int(matrix.nnz),
+        "vectorizer": VECTORIZER_PARAMS,
+    }, indent=4))
+
+    density = matrix.nnz / max(1, matrix.shape[0] * matrix.shape[1])
+    logger.info(f"📐 {matrix.shape[0]} × {matrix.shape[1]} sparse matrix, density {density:.4%}")
+    logger.success(f"✅ Text features saved → {OUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,6 @@ import pandas as pd
 from pathlib import Path
 from loguru import logger
 import mlflow
-import mlflow.sklearn
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.compose import ColumnTransformer
@@ -20,6 +19,8 @@ import xgboost as xgb
 import lightgbm as lgb
 from catboost import CatBoostClassifier
 
+from src.training.mlflow_utils_04 import log_metrics, log_params, log_pipeline
+
 # ===============================
 # Paths
 # ===============================
@@ -46,7 +47,7 @@ def load_data():
 # Train/Test Split
 # ===============================
 def split_data(df):
-    X = df.drop(columns=["failure_label"])
+    X = df.drop(columns=["failure_label", "failure_rule_mask"], errors="ignore")
     y = df["failure_label"]
 
     X_train, X_temp, y_train, y_temp = train_test_split(
@@ -89,8 +90,7 @@ def train_with_mlflow(model_name, model, preprocessor, X_train, y_train, X_val,
     with mlflow.start_run(run_name=model_name):
 
         if params:
-            for k, v in params.items():
-                mlflow.log_param(k, v)
+            log_params(params)
 
         pipeline = Pipeline(steps=[
             ("preprocessor", preprocessor),
@@ -101,9 +101,9 @@ def train_with_mlflow(model_name, model, preprocessor, X_train, y_train, X_val,
         y_pred = pipeline.predict(X_val)
 
         f1 = f1_score(y_val, y_pred)
-        mlflow.log_metric("f1_score", f1)
+        log_metrics({"f1_score": f1})
 
-        mlflow.sklearn.log_model(pipeline, model_name)
+        log_pipeline(model_name, pipeline)  # uploads in the background
 
         logger.info(f"📊 {model_name} F1 Score: {f1:.4f}")
         return pipeline, f1
@@ -1,36 +1,50 @@
+import os
+
 from loguru import logger
 
-from .load_data_01 import load_data, split_data
-from .preprocessing_02 import build_preprocessor
+from .split_cache import load_split
+from .preprocessing_02 import build_preprocessor, encoder_for
 from .model_definitions_03 import get_all_models
-from .trainer_05 import train_model_with_mlflow
+from .trainer_05 import train_model_on_matrices
+from .matrix_cache import cache_key, transform_splits
+from .parallel_training import train_models_parallel
 from .model_selector_06 import select_and_save_best_model
-from .mlflow_utils_04 import init_experiment
+from .mlflow_utils_04 import flush_artifacts, init_experiment
 
+EXPERIMENT_NAME = "ledgerx_failure_model"
 
-def main():
+# Train all candidates at once in worker processes (CPU budget split between them)
+PARALLEL_TRAINING = os.environ.get("LEDGERX_PARALLEL_TRAINING", "0") == "1"
 
-    logger.info("🚀 Modular Training Pipeline Started (5 Models)")
 
-    df = load_data()
-    X_train, X_val, X_test, y_train, y_val, y_test = split_data(df)
+def prepare_matrices(model_names, X_train, X_val, X_test, y_train):
+    """
+    Fit one preprocessor per categorical encoder in use (usually just one)
+    and map every model to its (cache_key, fitted_preprocessor, matrices).
+    """
+    by_encoder = {}
+    for encoder in {encoder_for(name) for name in model_names}:
+        unfitted = build_preprocessor(encoder=encoder)
+        key = cache_key(unfitted, X_train, X_val, X_test, y_train)
+        preprocessor, matrices = transform_splits(unfitted, X_train, X_val, X_test, y_train)
+        by_encoder[encoder] = (key, preprocessor, matrices)
 
-    preprocessor = build_preprocessor()
+    return {name: by_encoder[encoder_for(name)] for name in model_names}
 
-    init_experiment("ledgerx_failure_model")
 
-    models = get_all_models()
+def train_sequential(models, prepared, y_train, y_val):
     results = {}
 
     for model_name, (model, params) in models.items():
+        _, preprocessor, matrices = prepared[model_name]
         try:
-            pipeline, f1 = train_model_with_mlflow(
+            pipeline, f1 = train_model_on_matrices(
                 model_name=model_name,
                 model=model,
-                preprocessor=preprocessor,
-                X_train=X_train,
+                fitted_preprocessor=preprocessor,
+                Z_train=matrices["train"],
                 y_train=y_train,
-                X_val=X_val,
+                Z_val=matrices["val"],
                 y_val=y_val,
                 params=params,
             )
@@ -39,7 +53,30 @@ def main():
         except Exception as e:
             logger.error(f"❌ {model_name} failed: {e}")
 
+    return results
+
+
+def main():
+
+    logger.info("🚀 Modular Training Pipeline Started (5 Models)")
+
+    X_train, X_val, X_test, y_train, y_val, y_test = load_split()
+
+    init_experiment(EXPERIMENT_NAME)
+
+    models = get_all_models()
+
+    # Fit once per encoder; models train on the shared cached matrices
+    prepared = prepare_matrices(models, X_train, X_val, X_test, y_train)
+
+    if PARALLEL_TRAINING:
+        cache_keys = {name: key for name, (key, _, _) in prepared.items()}
+        results = train_models_parallel(models, cache_keys, y_train, y_val, EXPERIMENT_NAME)
+    else:
+        results = train_sequential(models, prepared, y_train, y_val)
+
     best_name, best_f1 = select_and_save_best_model(results)
+    flush_artifacts()
 
     logger.info(f"🎉 Pipeline Finished — Best Model: {best_name} (F1={best_f1:.4f})")
 
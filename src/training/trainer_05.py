@@ -5,6 +5,7 @@ from loguru import logger
 import mlflow
 
 from .mlflow_utils_04 import log_params, log_metrics, log_pipeline
+from .model_definitions_03 import hardware_run_params
 
 # ======================================================
 # CLEAN ALL TRAINING WARNINGS
@@ -20,6 +21,84 @@ import os
 os.environ["CATBOOST_VERBOSE"] = "0"
 os.environ["CUBLAS_WORKSPACE_CONFIG"] = ":4096:8"
 
+# Boosting rounds without validation improvement before stopping (0 = off)
+EARLY_STOPPING_ROUNDS = int(os.environ.get("LEDGERX_EARLY_STOPPING_ROUNDS", "50"))
+BOOSTING_FAMILIES = ("xgboost", "lightgbm", "catboost")
+
+
+def fit_with_early_stopping(model, Z_train, y_train, Z_val, y_val, rounds=None, callbacks=None):
+    """
+    Fit `model` on transformed matrices. Boosting models use (Z_val, y_val)
+    as eval set and stop once logloss stops improving; the stored model
+    predicts with its best iteration. Returns that iteration as a 0-based
+    index for every library (best_iteration + 1 trees), or None.
+
+    `callbacks` are extra per-iteration callbacks in the model library's
+    own format (e.g. Optuna pruning, src/training/pruning.py).
+    """
+    rounds = EARLY_STOPPING_ROUNDS if rounds is None else rounds
+    family = type(model).__module__.split(".")[0]
+    callbacks = list(callbacks or [])
+
+    if family not in BOOSTING_FAMILIES or (rounds <= 0 and not callbacks):
+        model.fit(Z_train, y_train)
+        return None
+
+    stop_after = rounds if rounds > 0 else None
+
+    if family == "xgboost":
+        model.set_params(early_stopping_rounds=stop_after, callbacks=callbacks or None)
+        try:
+            model.fit(Z_train, y_train, eval_set=[(Z_val, y_val)], verbose=False)
+        finally:
+            model.set_params(callbacks=None)  # never pickle trial callbacks with the model
+        return int(model.best_iteration) if stop_after else None
+
+    if family == "lightgbm":
+        import lightgbm as lgb
+
+        if stop_after:
+            callbacks.insert(0, lgb.early_stopping(stop_after, verbose=False))
+        model.fit(Z_train, y_train, eval_set=[(Z_val, y_val)], callbacks=callbacks)
+        # LightGBM counts iterations from 1; XGBoost and CatBoost from 0
+        return int(model.best_iteration_) - 1 if stop_after else None
+
+    model.fit(
+        Z_train, y_train,
+        eval_set=(Z_val, y_val),
+        early_stopping_rounds=stop_after,
+        use_best_model=bool(stop_after),
+        callbacks=callbacks or None,
+    )
+    return int(model.get_best_iteration()) if stop_after else None
+
+
+def fit_pipeline(preprocessor, model, X_train, y_train, X_val, y_val, callbacks=None):
+    """
+    Fit preprocessor + model as one Pipeline, with the validation split
+    passed to the model *after* preprocessing (a raw eval set would not
+    match the transformed training columns).
+    """
+    Z_train = preprocessor.fit_transform(X_train, y_train)
+    Z_val = preprocessor.transform(X_val)
+    best_iteration = fit_with_early_stopping(
+        model, Z_train, y_train, Z_val, y_val, callbacks=callbacks
+    )
+
+    pipeline = Pipeline(
+        steps=[
+            ("preprocessor", preprocessor),
+            ("model", model),
+        ]
+    )
+    return pipeline, best_iteration
+
+
+def log_best_iteration(model_name, best_iteration):
+    if best_iteration is not None:
+        log_metrics({"best_iteration": best_iteration})
+        logger.info(f"⏹️ {model_name} early-stopped at iteration {best_iteration}")
+
 
 def train_model_with_mlflow(
     model_name: str,
@@ -39,21 +118,61 @@ def train_model_with_mlflow(
 
         if params:
             log_params(params)
+        log_params(hardware_run_params())
 
-        pipeline = Pipeline(
-            steps=[
-                ("preprocessor", preprocessor),
-                ("model", model),
-            ]
+        logger.info(f"🚂 Training {model_name} ...")
+        pipeline, best_iteration = fit_pipeline(
+            preprocessor, model, X_train, y_train, X_val, y_val
         )
 
+        y_pred = pipeline.predict(X_val)
+        f1 = f1_score(y_val, y_pred)
+
+        log_metrics({"f1_score": f1})
+        log_best_iteration(model_name, best_iteration)
+        log_pipeline(model_name, pipeline)
+
+        logger.info(f"📊 {model_name} – F1 Score: {f1:.4f}")
+
+        return pipeline, f1
+
+
+def train_model_on_matrices(
+    model_name: str,
+    model,
+    fitted_preprocessor,
+    Z_train,
+    y_train,
+    Z_val,
+    y_val,
+    params=None,
+):
+    """
+    Same as train_model_with_mlflow, but on already-transformed matrices
+    (src/training/matrix_cache.py). The fitted preprocessor is only
+    attached afterwards, so the logged artifact is still a full Pipeline.
+    """
+    with mlflow.start_run(run_name=model_name):
+
+        if params:
+            log_params(params)
+        log_params(hardware_run_params())
+
         logger.info(f"🚂 Training {model_name} ...")
-        pipeline.fit(X_train, y_train)
+        best_iteration = fit_with_early_stopping(model, Z_train, y_train, Z_val, y_val)
 
-        y_pred = pipeline.predict(X_val)
+        y_pred = model.predict(Z_val)
         f1 = f1_score(y_val, y_pred)
 
+        pipeline = Pipeline(
+            steps=[
+                ("preprocessor", fitted_preprocessor),
+                ("model", model),
+            ]
+        )
+
         log_metrics({"f1_score": f1})
+        log_best_iteration(model_name, best_iteration)
         log_pipeline(model_name, pipeline)
 
         logger.info(f"📊 {model_name} – F1 Score: {f1:.4f}")
@@ -0,0 +1,88 @@
+"""
+Fitted-pipeline checkpoints for tuning trials
+---------------------------------------------
+Every completed trial stores its fitted pipeline, so the winning model is
+promoted as-is instead of being refitted after the search. Each study
+keeps at most MAX_CHECKPOINTS files; the least recently used go first,
+but the study's best trial is never evicted.
+
+    data/optuna/checkpoints/<study_name>/trial_00012.pkl
+
+LEDGERX_TRIAL_CHECKPOINTS sets the cap (0 disables checkpointing).
+"""
+
+import os
+from pathlib import Path
+
+import joblib
+from loguru import logger
+from optuna.trial import TrialState
+
+CHECKPOINT_DIR = Path("data/optuna/checkpoints")
+MAX_CHECKPOINTS = int(os.environ.get("LEDGERX_TRIAL_CHECKPOINTS", "5"))
+
+
+def checkpoint_path(study_name, number):
+    return CHECKPOINT_DIR / study_name / f"trial_{number:05d}.pkl"
+
+
+def _trial_number(path):
+    return int(path.stem.split("_")[1])
+
+
+def evict(study_dir, values, keep):
+    """Drop least recently used checkpoints beyond the cap, never the best one."""
+    paths = sorted(study_dir.glob("trial_*.pkl"), key=lambda p: p.stat().st_mtime)
+    if len(paths) <= keep:
+        return []
+
+    scored = [p for p in paths if _trial_number(p) in values]
+    best = max(scored, key=lambda p: values[_trial_number(p)]) if scored else None
+
+    evicted = []
+    for path in paths:
+        if len(paths) - len(evicted) <= keep:
+            break
+        if path != best:
+            path.unlink(missing_ok=True)  # another worker may have evicted it already
+            evicted.append(path)
+    return evicted
+
+
+def save_checkpoint(trial, pipeline, value):
+    """Store the trial's fitted pipeline and apply the study's cap."""
+    if MAX_CHECKPOINTS <= 0:
+        return None
+
+    path = checkpoint_path(trial.study.study_name, trial.number)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    joblib.dump(pipeline, tmp)
+    tmp.replace(path)
+    trial.set_user_attr("checkpoint", str(path))
+
+    # The running trial is not COMPLETE yet, so add its value by hand
+    values = {
+        t.number: t.value
+        for t in trial.study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,))
+    }
+    values[trial.number] = value
+    evict(path.parent, values, MAX_CHECKPOINTS)
+    return path
+
+
+def load_checkpoint(trial, study_name):
+    """
+    Fitted pipeline of a finished trial of `study_name`, or None when it
+    was not kept. Trials copied in from an earlier study (warm start)
+    point at another study's checkpoint, fitted on other data: rejected.
+    """
+    path = trial.user_attrs.get("checkpoint")
+    if not path or not Path(path).exists():
+        return None
+    if Path(path) != checkpoint_path(study_name, trial.number):
+        logger.warning(f"⚠️ Trial #{trial.number} checkpoint {path} belongs to another study; ignored")
+        return None
+    os.utime(path)  # recently used
+    logger.info(f"📦 Loaded trial #{trial.number} checkpoint → {path}")
+    return joblib.load(path)
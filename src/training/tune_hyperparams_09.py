@@ -1,15 +1,27 @@
 import os
-import optuna
 import joblib
 import mlflow
-import mlflow.sklearn
 import pandas as pd
 from datetime import datetime
 from sklearn.metrics import f1_score
 from sklearn.pipeline import Pipeline
 
-from .load_data_01 import load_data, split_data
-from .preprocessing_02 import build_preprocessor
+from .split_cache import load_split, split_key
+from .parallel_tuning import finished_trials, tune_families_parallel
+from .pruning import PRUNER, fit_trial, pruning_summary
+from .fidelity import parse_schedule, rung_counts
+from .warm_start import data_fingerprint
+from .trial_checkpoints import load_checkpoint, save_checkpoint
+from .preprocessing_02 import build_preprocessor, encoder_for
+from .trainer_05 import fit_pipeline
+from .mlflow_utils_04 import log_metrics, log_params
+from .model_definitions_03 import (
+    catboost_categorical_params,
+    catboost_device_params,
+    hardware_run_params,
+    lightgbm_device_params,
+    xgboost_device_params,
+)
 
 from catboost import CatBoostClassifier
 from xgboost import XGBClassifier
@@ -20,6 +32,11 @@ MLFLOW_EXPERIMENT = "ledgerx_failure_model_tuning"
 MODEL_SAVE_PATH = "models/best_model_tuned.pkl"
 REPORT_PATH = "data/reports/tuning_report.txt"
 
+MODEL_NAMES = {"catboost": "CatBoost", "xgboost": "XGBoost", "lightgbm": "LightGBM"}
+
+# Refit the winner on train+val instead of promoting its trial checkpoint
+REFIT_FULL = os.environ.get("LEDGERX_REFIT_FULL", "0") == "1"
+
 
 # ---------------------------------------------------------
 # Model Evaluation Using F1 Score (your main metric)
@@ -32,9 +49,12 @@ def evaluate(model, X_val, y_val):
 # ---------------------------------------------------------
 # OBJECTIVE: CatBoost
 # ---------------------------------------------------------
-def objective_catboost(trial, X_train, y_train, X_val, y_val, preprocessor):
+def objective_catboost(trial, X_train, y_train, X_val, y_val, preprocessor, rungs=None):
 
     params = {
+        # Device defaults first so the tuned border_count wins
+        **catboost_device_params(),
+        **catboost_categorical_params(),
         "iterations": trial.suggest_int("iterations", 200, 800),
         "depth": trial.suggest_int("depth", 4, 10),
         "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.3),
@@ -42,25 +62,21 @@ def objective_catboost(trial, X_train, y_train, X_val, y_val, preprocessor):
         "border_count": trial.suggest_int("border_count", 32, 255),
         "loss_function": "Logloss",
         "verbose": False,
-        "task_type": "GPU"
     }
 
     model = CatBoostClassifier(**params)
 
-    pipeline = Pipeline([
-        ("preprocessor", preprocessor),
-        ("model", model)
-    ])
+    pipeline = fit_trial(trial, preprocessor, model, X_train, y_train, X_val, y_val, rungs=rungs)
 
-    pipeline.fit(X_train, y_train)
     f1 = evaluate(pipeline, X_val, y_val)
+    save_checkpoint(trial, pipeline, f1)
     return f1
 
 
 # ---------------------------------------------------------
 # OBJECTIVE: XGBoost
 # ---------------------------------------------------------
-def objective_xgb(trial, X_train, y_train, X_val, y_val, preprocessor):
+def objective_xgb(trial, X_train, y_train, X_val, y_val, preprocessor, rungs=None):
 
     params = {
         "max_depth": trial.suggest_int("max_depth", 3, 10),
@@ -69,25 +85,22 @@ def objective_xgb(trial, X_train, y_train, X_val, y_val, preprocessor):
         "subsample": trial.suggest_float("subsample", 0.5, 1.0),
         "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
         "eval_metric": "logloss",
-        "tree_method": "hist"
+        **xgboost_device_params(),
     }
 
     model = XGBClassifier(**params)
 
-    pipeline = Pipeline([
-        ("preprocessor", preprocessor),
-        ("model", model)
-    ])
+    pipeline = fit_trial(trial, preprocessor, model, X_train, y_train, X_val, y_val, rungs=rungs)
 
-    pipeline.fit(X_train, y_train)
     f1 = evaluate(pipeline, X_val, y_val)
+    save_checkpoint(trial, pipeline, f1)
     return f1
 
 
 # ---------------------------------------------------------
 # OBJECTIVE: LightGBM
 # ---------------------------------------------------------
-def objective_lgbm(trial, X_train, y_train, X_val, y_val, preprocessor):
+def objective_lgbm(trial, X_train, y_train, X_val, y_val, preprocessor, rungs=None):
 
     params = {
         "num_leaves": trial.suggest_int("num_leaves", 20, 150),
@@ -96,41 +109,84 @@ def objective_lgbm(trial, X_train, y_train, X_val, y_val, preprocessor):
         "n_estimators": trial.suggest_int("n_estimators", 200, 1000),
         "subsample": trial.suggest_float("subsample", 0.5, 1.0),
         "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
-        "min_child_samples": trial.suggest_int("min_child_samples", 5, 50)
+        "min_child_samples": trial.suggest_int("min_child_samples", 5, 50),
+        **lightgbm_device_params(),
     }
 
     model = LGBMClassifier(**params)
 
-    pipeline = Pipeline([
-        ("preprocessor", preprocessor),
-        ("model", model)
-    ])
+    pipeline = fit_trial(trial, preprocessor, model, X_train, y_train, X_val, y_val, rungs=rungs)
 
-    pipeline.fit(X_train, y_train)
     f1 = evaluate(pipeline, X_val, y_val)
+    save_checkpoint(trial, pipeline, f1)
     return f1
 
 
+OBJECTIVES = {
+    "catboost": objective_catboost,
+    "xgboost": objective_xgb,
+    "lightgbm": objective_lgbm,
+}
+
+
+def family_preprocessor(family):
+    return build_preprocessor(encoder=encoder_for(MODEL_NAMES[family]))
+
+
+# ---------------------------------------------------------
+# FINAL MODEL FROM THE BEST PARAMETERS
+# ---------------------------------------------------------
+def build_tuned_model(family, params, rounds=None):
+    if family == "catboost":
+        model = CatBoostClassifier(**{
+            **catboost_device_params(), **catboost_categorical_params(), **params, "verbose": False,
+        })
+    elif family == "xgboost":
+        model = XGBClassifier(**params, **xgboost_device_params())
+    else:
+        model = LGBMClassifier(**params, **lightgbm_device_params())
+
+    if rounds is not None:
+        model.set_params(**{"iterations" if family == "catboost" else "n_estimators": rounds})
+    return model
+
+
+def refit_full(family, params, best_iteration, X_train, y_train, X_val, y_val):
+    """Fit on train+val with the round count early stopping found (no eval set left)."""
+    rounds = best_iteration + 1 if best_iteration is not None else None
+    pipeline = Pipeline(steps=[
+        ("preprocessor", family_preprocessor(family)),
+        ("model", build_tuned_model(family, params, rounds)),
+    ])
+    pipeline.fit(pd.concat([X_train, X_val]), pd.concat([y_train, y_val]))
+    return pipeline
+
+
 # ---------------------------------------------------------
-# RUN OPTUNA STUDY FOR ONE MODEL
+# LOG A FINISHED OPTUNA STUDY FOR ONE MODEL
 # ---------------------------------------------------------
-def run_study(model_name, objective_fn, X_train, y_train, X_val, y_val, preprocessor):
+def log_study(model_name, study):
 
     mlflow.set_experiment(MLFLOW_EXPERIMENT)
 
     with mlflow.start_run(run_name=f"Tuning_{model_name}"):
 
-        study = optuna.create_study(direction="maximize")
-        study.optimize(
-            lambda trial: objective_fn(trial, X_train, y_train, X_val, y_val, preprocessor),
-            n_trials=20,
-            show_progress_bar=True
-        )
+        log_params({**study.best_params, **hardware_run_params()})
+        mlflow.set_tags({"optuna_study": study.study_name, "optuna_pruner": PRUNER})
 
-        mlflow.log_params(study.best_params)
-        mlflow.log_metric("best_f1", study.best_value)
+        summary = pruning_summary(study)
+        metrics = {
+            "best_f1": study.best_value,
+            "n_trials": finished_trials(study),
+            "pruned_trials": summary["pruned"],
+            "pruning_seconds_saved": summary["seconds_saved"],
+        }
+        best_iteration = study.best_trial.user_attrs.get("best_iteration")
+        if best_iteration is not None:
+            metrics["best_iteration"] = best_iteration
+        log_metrics(metrics)
 
-    return study.best_value, study.best_params
+    return study.best_value, study.best_params, summary
 
 
 # ---------------------------------------------------------
@@ -140,33 +196,22 @@ def main():
 
     print("\n📘 Starting Hyperparameter Tuning...")
 
-    df = load_data()
-    X_train, X_val, X_test, y_train, y_val, y_test = split_data(df)
-
-    preprocessor = build_preprocessor()
-
-    results = {}
-
-    # ---- CatBoost ----
-    print("\n🔍 Tuning CatBoost...")
-    results["catboost"] = run_study(
-        "CatBoost", objective_catboost,
-        X_train, y_train, X_val, y_val, preprocessor
+    X_train, X_val, X_test, y_train, y_val, y_test = load_split()
+
+    # ---- CatBoost, XGBoost, LightGBM: tuned side by side ----
+    print(f"\n🔍 Tuning {', '.join(MODEL_NAMES.values())} in parallel...")
+    studies = tune_families_parallel(
+        MODEL_NAMES,
+        split_key=split_key(),
+        encoders={family: encoder_for(name) for family, name in MODEL_NAMES.items()},
+        fingerprint=data_fingerprint(y_train),
+        experiment=MLFLOW_EXPERIMENT,
+        report_path=REPORT_PATH,
     )
+    if not studies:
+        raise RuntimeError("No tuning study produced a completed trial.")
 
-    # ---- XGBoost ----
-    print("\n🔍 Tuning XGBoost...")
-    results["xgboost"] = run_study(
-        "XGBoost", objective_xgb,
-        X_train, y_train, X_val, y_val, preprocessor
-    )
-
-    # ---- LightGBM ----
-    print("\n🔍 Tuning LightGBM...")
-    results["lightgbm"] = run_study(
-        "LightGBM", objective_lgbm,
-        X_train, y_train, X_val, y_val, preprocessor
-    )
+    results = {family: log_study(MODEL_NAMES[family], study) for family, study in studies.items()}
 
     # -----------------------------------------------------
     # Select best tuned model
@@ -177,22 +222,27 @@ def main():
     print(f"\n🏆 Best Tuned Model: {best_model_name.upper()}")
     print(best_params)
 
-    # Build final model
-    if best_model_name == "catboost":
-        model = CatBoostClassifier(**best_params, verbose=False, task_type="GPU")
-    elif best_model_name == "xgboost":
-        model = XGBClassifier(**best_params)
-    else:
-        model = LGBMClassifier(**best_params)
-
-    final_preprocessor = build_preprocessor()
-
-    final_pipeline = Pipeline([
-        ("preprocessor", final_preprocessor),
-        ("model", model)
-    ])
+    # Promote the best trial's fitted pipeline instead of refitting it
+    best_trial = studies[best_model_name].best_trial
+    best_iteration = best_trial.user_attrs.get("best_iteration")
+    final_pipeline = None if REFIT_FULL else load_checkpoint(
+        best_trial, studies[best_model_name].study_name
+    )
 
-    final_pipeline.fit(X_train, y_train)
+    if final_pipeline is not None:
+        final_source = f"trial #{best_trial.number} checkpoint (no refit)"
+    elif REFIT_FULL:
+        final_pipeline = refit_full(
+            best_model_name, best_params, best_iteration, X_train, y_train, X_val, y_val
+        )
+        final_source = "refit on train+val with the recorded best iteration count"
+    else:
+        final_pipeline, best_iteration = fit_pipeline(
+            family_preprocessor(best_model_name), build_tuned_model(best_model_name, best_params),
+            X_train, y_train, X_val, y_val,
+        )
+        final_source = "refit (trial checkpoint not kept)"
+    print(f"📦 Final model: {final_source}")
 
     # Save final tuned model
     joblib.dump(final_pipeline, MODEL_SAVE_PATH)
@@ -202,11 +252,29 @@ def main():
     with open(REPORT_PATH, "w") as f:
         f.write("LedgerX – Hyperparameter Tuning Report\n")
         f.write(f"Generated: {datetime.now()}\n\n")
-        f.write(f"Best Model: {best_model_name}\n\n")
+        f.write(f"Best Model: {best_model_name}\n")
+        if best_iteration is not None:
+            f.write(f"Best Iteration (early stopping): {best_iteration}\n")
+        f.write(f"Final Model: {final_source}\n")
+        f.write("\n")
         f.write("Best Parameters:\n")
         for k, v in best_params.items():
             f.write(f"- {k}: {v}\n")
 
+        fidelity = parse_schedule()
+        f.write(f"\nTrial Pruning ({'fidelity rungs' if fidelity else PRUNER}):\n")
+        for family, (_, _, summary) in results.items():
+            f.write(
+                f"- {family}: {summary['complete']} completed, {summary['pruned']} pruned, "
+                f"~{summary['seconds_saved']:.1f}s fit time saved\n"
+            )
+
+        if fidelity:
+            f.write(f"\nFidelity Rungs ({' → '.join(f'{x:.0%}' for x in fidelity)}), trials per rung:\n")
+            for family, study in studies.items():
+                counts = rung_counts(study, fidelity)
+                f.write(f"- {family}: {' → '.join(map(str, counts))}\n")
+
     print(f"📄 Tuning Report Saved → {REPORT_PATH}")
     print("\n🎉 Hyperparameter Tuning Completed!\n")
 
@@ -0,0 +1,177 @@
+"""
+Warm-started tuning studies
+---------------------------
+A new study (new split key = new data) does not start from scratch:
+
+- best: the previous best configurations are enqueued as its first
+  trials — top trials of the family's latest earlier study in the
+  journal, the last MLflow "Tuning_<Model>" run and tuning_report.txt
+- history: additionally, when the training data is close to the one the
+  earlier study saw (row count and failure rate), its finished trials
+  are copied in and only WARM_TRIAL_FRACTION of the usual budget runs
+
+    LEDGERX_WARM_START = best (default) | history | off
+"""
+
+import math
+import os
+from datetime import datetime
+from pathlib import Path
+
+import optuna
+from loguru import logger
+from optuna.trial import TrialState
+
+WARM_START = os.environ.get("LEDGERX_WARM_START", "best").lower()
+
+WARM_START_TRIALS = 3        # top trials taken from the previous study
+WARM_TRIAL_FRACTION = 0.25   # new trials when the history is reused
+MAX_ROW_DRIFT = 0.10         # relative change in training rows
+MAX_POS_RATE_DRIFT = 0.02    # absolute change in failure rate
+
+
+# ===============================
+# Data fingerprint
+# ===============================
+
+def data_fingerprint(y_train):
+    return {"rows": int(len(y_train)), "pos_rate": float(y_train.mean())}
+
+
+def fingerprint_close(current, previous):
+    if not previous or not previous.get("rows"):
+        return False
+    if current.get("fidelity") != previous.get("fidelity"):
+        return False  # rung scores and full-data scores do not mix
+    row_drift = abs(current["rows"] / previous["rows"] - 1)
+    rate_drift = abs(current["pos_rate"] - previous["pos_rate"])
+    return row_drift <= MAX_ROW_DRIFT and rate_drift <= MAX_POS_RATE_DRIFT
+
+
+# ===============================
+# Sources of previous parameters
+# ===============================
+
+def _coerce(value):
+    """MLflow params and report lines are strings; restore int / float."""
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            pass
+    return value
+
+
+def previous_study(storage, prefix, current_name):
+    """Latest other study whose name starts with `prefix` and has completed trials."""
+    summaries = [
+        s for s in optuna.get_all_study_summaries(storage, include_best_trial=False)
+        if s.study_name.startswith(prefix) and s.study_name != current_name
+    ]
+    for summary in sorted(summaries, key=lambda s: s.datetime_start or datetime.min, reverse=True):
+        study = optuna.load_study(study_name=summary.study_name, storage=storage)
+        if study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,)):
+            return study
+    return None
+
+
+def params_from_study(study, k=WARM_START_TRIALS):
+    trials = study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,))
+    best = sorted(trials, key=lambda t: t.value, reverse=True)[:k]
+    return [dict(t.params) for t in best]
+
+
+def params_from_mlflow(experiment, model_name):
+    try:
+        import mlflow
+
+        runs = mlflow.search_runs(
+            experiment_names=[experiment],
+            filter_string=f"tags.mlflow.runName = 'Tuning_{model_name}'",
+            order_by=["start_time DESC"],
+            max_results=1,
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ MLflow lookup for warm start failed: {e}")
+        return []
+
+    if runs.empty:
+        return []
+    params = {
+        col[len("params."):]: _coerce(value)
+        for col, value in runs.iloc[0].items()
+        # Columns of other runs' params are NaN in this row
+        if col.startswith("params.") and not col.startswith("params.hw_") and isinstance(value, str)
+    }
+    return [params] if params else []
+
+
+def params_from_report(report_path, family):
+    """Best parameters from tuning_report.txt, if `family` was the best model."""
+    path = Path(report_path)
+    if not path.exists():
+        return []
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    if f"Best Model: {family}" not in lines or "Best Parameters:" not in lines:
+        return []
+
+    params = {}
+    for line in lines[lines.index("Best Parameters:") + 1:]:
+        if not line.startswith("- "):
+            break
+        key, _, value = line[2:].partition(": ")
+        params[key] = _coerce(value)
+    return [params] if params else []
+
+
+# ===============================
+# Seeding
+# ===============================
+
+def seed_study(study, storage, prefix, family, model_name, fingerprint,
+               n_trials, experiment=None, report_path=None, mode=None):
+    """
+    Warm-start a freshly created `study`; returns its trial budget.
+    `prefix` selects earlier studies of the same family and encoder.
+    """
+    mode = (mode or WARM_START).lower()
+    study.set_user_attr("data_fingerprint", fingerprint)
+    if mode == "off":
+        return n_trials
+
+    previous = previous_study(storage, prefix, study.study_name)
+    budget = n_trials
+
+    if mode == "history" and previous is not None and fingerprint_close(
+        fingerprint, previous.user_attrs.get("data_fingerprint")
+    ):
+        history = previous.get_trials(states=(TrialState.COMPLETE, TrialState.PRUNED))
+        for trial in history:
+            # Fitted on the previous split: never promote it from this study
+            trial.user_attrs.pop("checkpoint", None)
+        study.add_trials(history)
+        budget = len(history) + math.ceil(n_trials * WARM_TRIAL_FRACTION)
+        logger.info(
+            f"♻️ {family}: reused {len(history)} trials from {previous.study_name} "
+            f"(data fingerprint close), {budget - len(history)} new trials"
+        )
+        return budget
+
+    candidates = params_from_study(previous) if previous is not None else []
+    if experiment:
+        candidates += params_from_mlflow(experiment, model_name)
+    if report_path:
+        candidates += params_from_report(report_path, family)
+
+    seen = set()
+    for params in candidates:
+        key = tuple(sorted(params.items()))
+        if key in seen:
+            continue
+        seen.add(key)
+        study.enqueue_trial(params, skip_if_exists=True)
+
+    if seen:
+        logger.info(f"🌱 {family}: enqueued {len(seen)} previous best configuration(s)")
+    return budget
@@ -0,0 +1,43 @@
+# tests/conftest.py
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def make_data():
+    """make_data(n, seed) → (X, y): numeric features, label driven by column "a"."""
+
+    def make(n, seed, n_features=5, threshold=0.5, noise=0.3):
+        rng = np.random.default_rng(seed)
+        X = pd.DataFrame(rng.random((n, n_features)), columns=list("abcdefgh")[:n_features])
+        y = pd.Series((X["a"] + rng.normal(0, noise, n) > threshold).astype(int))
+        return X, y
+
+    return make
+
+
+@pytest.fixture
+def make_invoices():
+    """
+    make_invoices(n, seed) → (X, y): cleaned / model-ready invoice columns
+    with a long-tailed vendor_name; failure_label = currency is UNK.
+    """
+
+    def make(n, seed):
+        rng = np.random.default_rng(seed)
+        vendors = np.array([f"vendor line {i}" for i in range(500)], dtype=object)
+        X = pd.DataFrame({
+            "invoice_number": np.where(rng.random(n) < 0.1, None, "INV"),
+            "vendor_name": vendors[rng.zipf(1.5, n) % 500],
+            "currency": rng.choice(["USD", "EUR", "UNK"], n),
+            "invoice_number_length": rng.integers(3, 12, n),
+            "invoice_age_days": rng.integers(0, 4000, n),
+            "total_amount": rng.uniform(0, 1000, n).round(2),
+            "ocr_text_length": 0,
+            "blur_flag": 0,
+        })
+        y = pd.Series((X["currency"] == "UNK").astype(int), name="failure_label")
+        return X, y
+
+    return make
@@ -0,0 +1,78 @@
+# tests/test_artifact_store.py
+import os
+import time
+
+import mlflow
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.training import artifact_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    monkeypatch.setattr(artifact_store, "CAS_DIR", tmp_path / "cas")
+    mlflow.set_tracking_uri(f"file://{tmp_path / 'mlruns'}")
+    mlflow.set_experiment("cas_test")
+    yield tmp_path / "cas"
+    mlflow.set_tracking_uri(None)
+
+
+def _pipeline(seed=0):
+    rng = np.random.default_rng(seed)
+    X, y = rng.random((50, 3)), np.tile([0, 1], 25)
+    return Pipeline([("scale", StandardScaler()), ("model", LogisticRegression())]).fit(X, y)
+
+
+def test_identical_objects_are_stored_once(store):
+    scaler = _pipeline().named_steps["scale"]
+
+    sha, size, written = artifact_store.put(scaler)
+    assert written and size > 0
+    assert artifact_store.put(scaler) == (sha, size, False)
+    assert list(store.glob("*/*.pkl")) == [artifact_store.blob_path(sha)]
+
+
+def test_pipeline_round_trip_shares_unchanged_steps(store):
+    first, second = _pipeline(0), _pipeline(1)
+    X = np.random.default_rng(2).random((5, 3))
+
+    with mlflow.start_run(run_name="LogisticRegression") as run_a:
+        artifact_store.log_pipeline_ref(run_a.info.run_id, "LogisticRegression", first)
+    with mlflow.start_run(run_name="LogisticRegression") as run_b:
+        artifact_store.log_pipeline_ref(run_b.info.run_id, "LogisticRegression", first)
+    with mlflow.start_run(run_name="LogisticRegression") as run_c:
+        artifact_store.log_pipeline_ref(run_c.info.run_id, "LogisticRegression", second)
+
+    assert len(list(store.glob("*/*.pkl"))) == 4  # two runs share both blobs
+    loaded = artifact_store.load_pipeline_ref(run_c.info.run_id, "LogisticRegression")
+    assert [name for name, _ in loaded.steps] == ["scale", "model"]
+    np.testing.assert_allclose(loaded.predict_proba(X), second.predict_proba(X))
+
+    tags = mlflow.get_run(run_a.info.run_id).data.tags
+    assert tags["cas.LogisticRegression.model"] == artifact_store.put(first.named_steps["model"])[0]
+
+
+def test_gc_deletes_blobs_of_expired_runs_only(store):
+    old, new = _pipeline(0), _pipeline(1)
+    with mlflow.start_run(run_name="LogisticRegression") as run:
+        artifact_store.log_pipeline_ref(run.info.run_id, "LogisticRegression", old)
+    with mlflow.start_run(run_name="LogisticRegression") as run:
+        artifact_store.log_pipeline_ref(run.info.run_id, "LogisticRegression", new)
+
+    # Every blob is past the grace period, runs are 60 days old
+    later = time.time() + 60 * 86400
+    for path in store.glob("*/*.pkl"):
+        os.utime(path, (later - 2 * artifact_store.GRACE_SECONDS,) * 2)
+
+    assert artifact_store.collect_garbage(keep_days=30, keep_last=1, dry_run=True, now=later)[0] == 2
+    assert len(list(store.glob("*/*.pkl"))) == 4
+
+    deleted, freed = artifact_store.collect_garbage(keep_days=30, keep_last=1, now=later)
+    assert deleted == 2 and freed > 0
+    loaded = artifact_store.load_pipeline_ref(run.info.run_id, "LogisticRegression")
+    assert loaded.named_steps["model"].coef_.tolist() == new.named_steps["model"].coef_.tolist()
@@ -0,0 +1,65 @@
+# tests/test_bias_slicing.py
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+from src.training.bias_slicing_10 import evaluate_slices
+
+
+def reference_slices(y_true, y_pred, groups, group_name, min_support):
+    """The per-group mask loop evaluate_slices replaces."""
+    df = pd.DataFrame({"y_true": y_true, "y_pred": y_pred, "g": groups})
+    rows = []
+    for value in sorted(df["g"].dropna().unique()):
+        part = df[df["g"] == value]
+        if len(part) < min_support:
+            continue
+        t, p = part["y_true"], part["y_pred"]
+        rows.append({
+            "group": group_name,
+            "value": str(value),
+            "support": len(part),
+            "accuracy": round(accuracy_score(t, p), 4),
+            "precision": round(precision_score(t, p, zero_division=0), 4),
+            "recall": round(recall_score(t, p, zero_division=0), 4),
+            "f1": round(f1_score(t, p, zero_division=0), 4),
+        })
+    return rows
+
+
+def test_slices_match_per_group_sklearn_metrics():
+    rng = np.random.default_rng(0)
+    n = 3000
+    index = pd.Index(rng.permutation(n) + 1000)  # test rows keep their original labels
+    y_true = pd.Series(rng.integers(0, 2, n), index=index)
+    y_pred = rng.integers(0, 2, n)
+
+    vendors = pd.Series(rng.choice([f"vendor_{i}" for i in range(150)] + [None], n), index=index)
+    amount_bucket = pd.cut(
+        pd.Series(rng.uniform(0, 30000, n), index=index),
+        bins=[-1, 1000, 5000, 20000, float("inf")],
+        labels=["0–1k", "1k–5k", "5k–20k", "20k+"],
+    )
+    blur = pd.Series(rng.integers(0, 2, n), index=index)
+
+    for groups, name, min_support in [
+        (vendors, "vendor_name", 20),
+        (vendors, "vendor_name", 1),
+        (amount_bucket, "amount_bucket", 20),
+        (blur, "blur_flag", 10),
+    ]:
+        expected = reference_slices(y_true, y_pred, groups, name, min_support)
+        assert evaluate_slices(y_true, y_pred, groups, name, min_support) == expected
+
+
+def test_single_class_slice_uses_zero_division():
+    y_true = pd.Series([0, 0, 0, 1, 1, 1])
+    y_pred = np.array([0, 0, 0, 1, 1, 0])
+    groups = pd.Series(["a", "a", "a", "b", "b", "b"])
+
+    rows = evaluate_slices(y_true, y_pred, groups, "g", min_support=1)
+    assert rows[0] == {
+        "group": "g", "value": "a", "support": 3,
+        "accuracy": 1.0, "precision": 0.0, "recall": 0.0, "f1": 0.0,
+    }
+    assert rows[1]["recall"] == 0.6667 and rows[1]["precision"] == 1.0
@@ -0,0 +1,67 @@
+# tests/test_bootstrap_metrics.py
+import numpy as np
+import pytest
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    precision_score,
+    recall_score,
+    roc_auc_score,
+)
+
+from src.training import bootstrap_metrics
+
+
+def noisy_scores(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = rng.integers(0, 2, n)
+    # Rounded scores so ties occur
+    y_prob = np.round(np.clip(0.3 * y_true + rng.random(n) * 0.7, 0, 1), 2)
+    return y_true, (y_prob >= 0.5).astype(int), y_prob
+
+
+def sklearn_metrics(y_true, y_pred, y_prob):
+    return {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "precision": precision_score(y_true, y_pred, zero_division=0),
+        "recall": recall_score(y_true, y_pred, zero_division=0),
+        "f1": f1_score(y_true, y_pred, zero_division=0),
+        "roc_auc": roc_auc_score(y_true, y_prob),
+    }
+
+
+def test_replicate_weights_match_sklearn_on_resampled_rows():
+    y_true, y_pred, y_prob = noisy_scores()
+    groups = bootstrap_metrics._tie_groups(y_true.astype(bool), y_prob)
+
+    idx = np.random.default_rng(1).integers(0, len(y_true), size=(3, len(y_true)))
+    W = np.stack([np.bincount(row, minlength=len(y_true)) for row in idx]).astype(float)
+    got = bootstrap_metrics.weighted_metrics(W, y_true.astype(bool), y_pred.astype(bool), groups)
+
+    for b, row in enumerate(idx):
+        expected = sklearn_metrics(y_true[row], y_pred[row], y_prob[row])
+        for metric, value in expected.items():
+            assert got[metric][b] == pytest.approx(value)
+
+
+def test_bootstrap_ci_brackets_point_estimate():
+    y_true, y_pred, y_prob = noisy_scores()
+    intervals = bootstrap_metrics.bootstrap_ci(y_true, y_pred, y_prob, n_replicates=500)
+
+    for metric, value in sklearn_metrics(y_true, y_pred, y_prob).items():
+        point, low, high = intervals[metric]
+        assert point == pytest.approx(value)
+        assert low < point < high
+
+
+def test_threshold_sweep_matches_thresholded_predictions():
+    y_true, _, y_prob = noisy_scores()
+    sweep = bootstrap_metrics.threshold_sweep(y_true, y_prob)
+
+    assert sweep["threshold"].is_monotonic_decreasing
+    assert len(sweep) == len(np.unique(y_prob))
+    for _, row in sweep.iloc[::7].iterrows():
+        y_pred = (y_prob >= row["threshold"]).astype(int)
+        assert row["tp"] == ((y_pred == 1) & (y_true == 1)).sum()
+        assert row["f1"] == pytest.approx(f1_score(y_true, y_pred))
+        assert row["precision"] == pytest.approx(precision_score(y_true, y_pred))
@@ -0,0 +1,43 @@
+# tests/test_categorical_encoders.py
+from catboost import CatBoostClassifier
+
+from src.training import matrix_cache
+from src.training.preprocessing_02 import (
+    ENCODERS,
+    build_preprocessor,
+    encoder_for,
+    native_cat_feature_indices,
+)
+
+
+def test_every_encoder_keeps_rows_and_caps_width(make_invoices):
+    X, y = make_invoices(2000, 0)
+    widths = {}
+    for encoder in ENCODERS:
+        Z = build_preprocessor(text_features=False, encoder=encoder).fit_transform(X, y)
+        assert Z.shape[0] == len(X)
+        widths[encoder] = Z.shape[1]
+
+    assert widths["onehot_capped"] < widths["onehot"]
+    assert widths["target"] == widths["native"] == 7
+    assert encoder_for("CatBoost", "native") == "native"
+    assert encoder_for("XGBoost", "native") == "onehot_capped"
+
+
+def test_native_matrices_cache_and_feed_catboost(tmp_path, monkeypatch, make_invoices):
+    monkeypatch.setattr(matrix_cache, "CACHE_DIR", tmp_path)
+    X, y = make_invoices(600, 1)
+    X_train, X_val, X_test = X.iloc[:400], X.iloc[400:500], X.iloc[500:]
+
+    _, matrices = matrix_cache.transform_splits(
+        build_preprocessor(text_features=False, encoder="native"),
+        X_train, X_val, X_test, y.iloc[:400],
+    )
+    assert matrices["train"].dtype == object
+
+    model = CatBoostClassifier(
+        iterations=20, verbose=False, allow_writing_files=False,
+        cat_features=native_cat_feature_indices(),
+    )
+    model.fit(matrices["train"], y.iloc[:400])
+    assert (model.predict(matrices["val"]) == y.iloc[400:500].to_numpy()).mean() > 0.9
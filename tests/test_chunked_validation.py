@@ -0,0 +1,134 @@
+# tests/test_chunked_validation.py
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.stages import chunked_validation as cv
+
+
+def ge_result(success, element_count, unexpected):
+    return SimpleNamespace(
+        success=success,
+        result={
+            "element_count": element_count,
+            "unexpected_count": len(unexpected),
+            "partial_unexpected_list": list(unexpected),
+        },
+    )
+
+
+def merge_all(results):
+    merged = None
+    for result in results:
+        merged = cv.merge_results(merged, cv.summarize_result(result))
+    return cv.finalize_result(merged)
+
+
+def test_merge_all_passing_chunks():
+    merged = merge_all([ge_result(True, 100, []), ge_result(True, 50, [])])
+
+    assert merged["success"] is True
+    assert merged["element_count"] == 150
+    assert merged["unexpected_count"] == 0
+    assert merged["unexpected_percent"] == 0.0
+
+
+def test_merge_fails_if_any_chunk_fails():
+    merged = merge_all([
+        ge_result(True, 100, []),
+        ge_result(False, 100, ["a", "b", "c"]),
+        ge_result(False, 50, ["d"]),
+    ])
+
+    assert merged["success"] is False
+    assert merged["element_count"] == 250
+    assert merged["unexpected_count"] == 4
+    assert merged["unexpected_percent"] == pytest.approx(100.0 * 4 / 250)
+    assert merged["partial_unexpected_list"] == ["a", "b", "c", "d"]
+
+
+def test_merge_matches_single_pass():
+    rng = np.random.default_rng(0)
+    flags = rng.random(1000) < 0.07
+    chunks = [flags[i: i + 128] for i in range(0, len(flags), 128)]
+
+    merged = merge_all([ge_result(not c.any(), len(c), np.flatnonzero(c)) for c in chunks])
+
+    assert merged["element_count"] == len(flags)
+    assert merged["unexpected_count"] == flags.sum()
+    assert merged["unexpected_percent"] == pytest.approx(100.0 * flags.mean())
+
+
+def test_merge_caps_unexpected_samples():
+    chunks = [ge_result(False, 10, [f"{i}-{j}" for j in range(10)]) for i in range(5)]
+    merged = merge_all(chunks)
+
+    assert merged["unexpected_count"] == 50
+    assert merged["partial_unexpected_list"] == [
+        f"{i}-{j}" for i in range(5) for j in range(10)
+    ][: cv.MAX_UNEXPECTED_SAMPLES]
+
+
+def test_finalize_empty_result():
+    merged = cv.finalize_result(cv.summarize_result(SimpleNamespace(success=True, result={})))
+    assert merged["element_count"] == 0
+    assert merged["unexpected_percent"] == 0.0
+
+
+def test_required_sample_size_is_hoeffding_bound():
+    n = cv.required_sample_size(0.01, 0.05)
+    assert n == 18445
+    # Doubling the tolerance needs a quarter of the rows
+    assert cv.required_sample_size(0.02, 0.05) == pytest.approx(n / 4, abs=1)
+
+
+def frame_chunks(n_rows, chunk_size):
+    for start in range(0, n_rows, chunk_size):
+        rows = np.arange(start, min(start + chunk_size, n_rows))
+        yield pd.DataFrame({"file_name": rows.astype(str), "row": rows})
+
+
+def test_sample_size_and_no_replacement():
+    sample = cv.draw_uniform_sample(frame_chunks(1000, 64), 300)
+
+    assert len(sample) == 300
+    assert sample["row"].is_unique
+    assert list(sample.columns) == ["file_name", "row"]
+
+
+def test_sample_smaller_file_keeps_every_row():
+    sample = cv.draw_uniform_sample(frame_chunks(40, 16), 300)
+    assert sorted(sample["row"]) == list(range(40))
+
+
+def test_sample_of_empty_file():
+    sample = cv.draw_uniform_sample(iter([]), 10, columns=["file_name", "row"])
+    assert sample.empty
+    assert list(sample.columns) == ["file_name", "row"]
+
+
+def test_sample_is_uniform_across_rows_and_chunks():
+    n_rows, n, draws = 200, 50, 400
+    hits = np.zeros(n_rows)
+    for seed in range(draws):
+        sample = cv.draw_uniform_sample(frame_chunks(n_rows, 32), n, seed=seed)
+        hits[sample["row"].to_numpy()] += 1
+
+    # Each row is kept with probability n / n_rows
+    expected = draws * n / n_rows
+    assert np.abs(hits - expected).max() < 5 * np.sqrt(expected * (1 - n / n_rows))
+
+    # No chunk position is favoured: first and last chunk are sampled alike
+    first, last = hits[:32].mean(), hits[-8:].mean()
+    assert abs(first - last) < 0.15 * expected
+
+
+def test_sample_is_reproducible_per_seed():
+    a = cv.draw_uniform_sample(frame_chunks(500, 50), 40, seed=7)
+    b = cv.draw_uniform_sample(frame_chunks(500, 50), 40, seed=7)
+    c = cv.draw_uniform_sample(frame_chunks(500, 50), 40, seed=8)
+
+    pd.testing.assert_frame_equal(a, b)
+    assert set(a["row"]) != set(c["row"])
@@ -0,0 +1,84 @@
+# tests/test_detect_duplicate_invoices.py
+import pandas as pd
+
+from src.stages import detect_duplicate_invoices
+from src.stages.detect_duplicate_invoices import InvoiceHashIndex, detect_duplicates
+
+
+def make_batch(rows):
+    return pd.DataFrame(
+        rows, columns=["invoice_number", "invoice_date", "total_amount", "vendor_name", "currency"]
+    )
+
+
+def test_resubmitted_invoices_flagged_across_batches(tmp_path):
+    first = make_batch([
+        ["INV-00123", "2024-03-01", 150.00, "ACME Corp.", "USD"],
+        ["INV-00456", "2024-03-02", 99.99, "Globex", "EUR"],
+    ])
+    second = make_batch([
+        # same invoice, different scan formatting
+        ["inv00123", "2024-03-01", 150.0, "acme corp", "USD"],
+        # invoice number misread by OCR, everything else identical
+        ["INV-00465", "2024-03-02", 99.99, "Globex", "EUR"],
+        # genuinely new
+        ["INV-00789", "2024-03-05", 10.00, "Initech", "USD"],
+    ])
+
+    index_dir = tmp_path / "index"
+    detect_duplicates(first, InvoiceHashIndex(index_dir))
+    flags = detect_duplicates(second, InvoiceHashIndex(index_dir))
+
+    assert flags["is_exact_duplicate"].tolist() == [1, 0, 0]
+    assert flags["is_possible_duplicate"].tolist() == [0, 1, 0]
+    assert flags["duplicate_of"].tolist() == [0, 1, -1]
+
+    # Re-running the same batch is idempotent (no self-matches)
+    rerun = detect_duplicates(second, InvoiceHashIndex(index_dir))
+    pd.testing.assert_frame_equal(flags, rerun)
+
+
+def test_rerun_on_rewritten_cumulative_file_keeps_flags(tmp_path, monkeypatch):
+    for name, path in [
+        ("INPUT_FILE", tmp_path / "fatura_cleaned.csv"),
+        ("INDEX_DIR", tmp_path / "index"),
+        ("FLAGS_FILE", tmp_path / "fatura_duplicates.csv"),
+        ("REPORT_FILE", tmp_path / "duplicate_invoices.json"),
+    ]:
+        monkeypatch.setattr(detect_duplicate_invoices, name, path)
+
+    rows = make_batch([
+        ["INV-00123", "2024-03-01", 150.00, "ACME Corp.", "USD"],
+        ["INV-00456", "2024-03-02", 99.99, "Globex", "EUR"],
+        ["inv00123", "2024-03-01", 150.0, "acme corp", "USD"],   # resubmission
+        ["INV-00789", "2024-03-05", 10.00, "Initech", "USD"],
+        ["INV-00789", "2024-03-05", 10.00, "Initech", "USD"],    # identical rescan
+    ])
+
+    flag_columns = ["invoice_ordinal", "is_exact_duplicate", "is_possible_duplicate", "duplicate_of"]
+
+    def run(df):
+        df.to_csv(detect_duplicate_invoices.INPUT_FILE, index=False)
+        detect_duplicate_invoices.main()
+        return pd.read_csv(detect_duplicate_invoices.FLAGS_FILE)[flag_columns]
+
+    first = run(rows)
+    assert first["is_exact_duplicate"].tolist() == [0, 0, 1, 0, 1]
+
+    # Upstream rewrote the file: new invoices appended, existing rows reordered
+    modified = pd.concat([
+        rows.iloc[[3, 0, 4, 1, 2]],
+        make_batch([
+            ["INV-00999", "2024-04-01", 5.00, "Umbrella", "USD"],
+            ["INV-00456", "2024-03-02", 99.99, "Globex", "EUR"],  # new resubmission
+        ]),
+    ])
+    second = run(modified)
+
+    # Same ordinals and flags for every row seen before
+    pd.testing.assert_frame_equal(
+        second.iloc[:5].reset_index(drop=True),
+        first.iloc[[3, 0, 4, 1, 2]].reset_index(drop=True),
+    )
+    assert second["is_exact_duplicate"].tolist()[5:] == [0, 1]
+    assert second["duplicate_of"].iloc[6] == first["invoice_ordinal"].iloc[1]
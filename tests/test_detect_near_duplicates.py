@@ -0,0 +1,118 @@
+# tests/test_detect_near_duplicates.py
+import numpy as np
+import pandas as pd
+
+from src.stages import detect_near_duplicates as nd
+
+
+def invoice_text(rng, n_words=60):
+    words = ["invoice", "total", "vendor", "amount", "tax", "due", "bill", "qty", "item", "usd"]
+    return " ".join(f"{rng.choice(words)}{rng.integers(0, 10_000)}" for _ in range(n_words))
+
+
+def rescan(text, rng, n_edits=3):
+    """OCR-style misreads: a few single-character substitutions."""
+    chars = list(text)
+    for pos in rng.choice(len(chars), n_edits, replace=False):
+        chars[pos] = "x"
+    return "".join(chars)
+
+
+def reference_shingles(text, k=nd.SHINGLE_SIZE):
+    data = text.encode("utf-8")
+    out = []
+    for i in range(len(data) - k + 1):
+        h = 0
+        for byte in data[i: i + k]:
+            h = (h * 257 + byte) % 2**64
+        out.append(h & 0xFFFFFFFF)
+    return out
+
+
+def test_shingles_stay_inside_each_document():
+    texts = ["abcdefg", "xy", "", "hello world"]
+    doc_ids, hashes = nd.shingle_hashes(texts)
+
+    for doc, text in enumerate(texts):
+        assert hashes[doc_ids == doc].tolist() == reference_shingles(text)
+    assert np.all(np.diff(doc_ids) >= 0)
+
+
+def test_signatures_match_per_document_minimum():
+    rng = np.random.default_rng(0)
+    texts = [invoice_text(rng, 5) for _ in range(3)] + ["abc", ""]
+    signatures = nd.minhash_signatures(texts)
+
+    for doc, text in enumerate(texts):
+        shingles = np.asarray(reference_shingles(text), dtype=np.uint64)
+        if len(shingles) == 0:  # shorter than one shingle
+            assert (signatures[doc] == nd.EMPTY_SLOT).all()
+            continue
+        permuted = (nd.PERM_A[:, None] * shingles[None, :] + nd.PERM_B[:, None]) >> np.uint64(32)
+        np.testing.assert_array_equal(signatures[doc], permuted.min(axis=1).astype(np.uint32))
+
+
+def test_rescans_cluster_together_and_distinct_texts_do_not():
+    rng = np.random.default_rng(1)
+    originals = [invoice_text(rng) for _ in range(40)]
+    texts = originals + [rescan(originals[3], rng), rescan(originals[17], rng), rescan(originals[17], rng)]
+
+    labels, edges = nd.cluster_near_duplicates(nd.minhash_signatures(nd.normalize_text(texts).tolist()))
+
+    assert labels[40] == labels[3]
+    assert labels[41] == labels[42] == labels[17]
+    assert labels[3] != labels[17]
+    # Every other original is alone in its cluster
+    others = [i for i in range(40) if i not in (3, 17)]
+    assert len(set(labels[others])) == len(others)
+    assert not set(labels[others]) & {labels[3], labels[17]}
+    assert len(edges) >= 3
+
+
+def test_stage_output_rows_align_with_input(tmp_path, monkeypatch):
+    monkeypatch.setattr(nd, "INPUT_FILE", tmp_path / "fatura_ocr.csv")
+    monkeypatch.setattr(nd, "CACHE_DIR", tmp_path / "minhash")
+    monkeypatch.setattr(nd, "OUT_FILE", tmp_path / "fatura_near_duplicates.csv")
+    monkeypatch.setattr(nd, "CHUNK_SIZE", 7)  # several chunks
+
+    rng = np.random.default_rng(2)
+    texts = [invoice_text(rng) for _ in range(20)]
+    texts[12] = rescan(texts[4], rng)
+    texts[19] = texts[4].upper()  # normalization: identical after lowercasing
+    texts[8] = None               # no OCR text: never a duplicate
+    pd.DataFrame({
+        "file_name": [f"scan_{i:03d}.jpg" for i in range(20)],
+        "ocr_text": texts,
+    }).to_csv(nd.INPUT_FILE, index=False)
+
+    nd.main()
+    first = pd.read_csv(nd.OUT_FILE)
+
+    assert first["row"].tolist() == [4, 12, 19]
+    assert first["file_name"].tolist() == ["scan_004.jpg", "scan_012.jpg", "scan_019.jpg"]
+    assert first["is_representative"].tolist() == [1, 0, 0]
+    assert set(first["representative"]) == {"scan_004.jpg"}
+    assert set(first["cluster_size"]) == {3}
+
+    # Second run reads every signature from the cache and gives the same output
+    def no_hashing(texts):
+        raise AssertionError("cached signatures should be reused")
+
+    monkeypatch.setattr(nd, "minhash_signatures", no_hashing)
+    nd.main()
+    pd.testing.assert_frame_equal(pd.read_csv(nd.OUT_FILE), first)
+
+
+def test_near_duplicate_flag_needs_row_aligned_clusters(tmp_path, monkeypatch):
+    from src.training import build_failure_labels
+
+    path = tmp_path / "fatura_near_duplicates.csv"
+    monkeypatch.setattr(build_failure_labels, "NEAR_DUPLICATES_FILE", path)
+    pd.DataFrame({"row": range(4), "is_representative": [1, 0, 1, 0]}).to_csv(path, index=False)
+
+    df = pd.DataFrame({"invoice_number": ["a", "b", "c", "d"]})
+    assert build_failure_labels.derive_near_duplicate_flag(df).tolist() == [0, 1, 0, 1]
+
+    # OCR file and cleaned file out of step: no flags rather than wrong ones
+    assert build_failure_labels.derive_near_duplicate_flag(df.head(3)).tolist() == [0, 0, 0]
+    assert build_failure_labels.derive_near_duplicate_flag(pd.concat([df, df])).sum() == 0
@@ -0,0 +1,66 @@
+# tests/test_device_selection.py
+import pytest
+
+from src.training import model_definitions_03 as md
+
+CACHED = [md.gpu_forced, md.xgboost_has_gpu, md.lightgbm_has_gpu, md.catboost_has_gpu, md.hardware_profile]
+
+
+@pytest.fixture
+def device(monkeypatch, tmp_path):
+    monkeypatch.setattr(md, "HARDWARE_PROFILE_FILE", tmp_path / "hardware_profile.json")
+
+    def select(mode, gpus):
+        monkeypatch.setattr(md, "DEVICE", mode)
+        monkeypatch.setattr(md, "gpu_available", lambda: gpus)
+        for fn in CACHED:
+            fn.cache_clear()
+
+    yield select
+    for fn in CACHED:
+        fn.cache_clear()
+
+
+def no_probe():
+    raise AssertionError("probe fit ran outside auto mode")
+
+
+def test_gpu_mode_forces_gpu_params_without_probing(device, monkeypatch):
+    device("gpu", gpus=True)
+    monkeypatch.setattr(md, "_probe_data", no_probe)
+
+    assert md.xgboost_device_params()["device"] == "cuda"
+    assert md.lightgbm_device_params() == {"device": "gpu"}
+    assert md.catboost_device_params() == {"task_type": "GPU"}
+
+
+def test_gpu_mode_without_gpu_raises(device):
+    device("gpu", gpus=False)
+
+    for params in (md.xgboost_device_params, md.lightgbm_device_params, md.catboost_device_params):
+        with pytest.raises(RuntimeError, match="no GPU"):
+            params()
+
+
+def test_cpu_mode_never_probes(device, monkeypatch):
+    device("cpu", gpus=True)
+    monkeypatch.setattr(md, "_probe_data", no_probe)
+
+    assert md.xgboost_device_params()["device"] == "cpu"
+    assert md.lightgbm_device_params()["device"] == "cpu"
+    assert md.catboost_device_params()["task_type"] == "CPU"
+
+
+def test_benchmark_only_in_auto_mode(device, monkeypatch):
+    monkeypatch.setattr(md, "_benchmark_fits", lambda: {"xgboost": 1.0})
+
+    device("gpu", gpus=True)
+    assert md.hardware_profile()["benchmark_seconds"] == {}
+
+    device("cpu", gpus=False)
+    assert md.hardware_profile()["benchmark_seconds"] == {}
+
+    device("auto", gpus=False)
+    profile = md.hardware_profile()
+    assert profile["benchmark_seconds"] == {"xgboost": 1.0}
+    assert profile["devices"]["catboost"] == "CPU"
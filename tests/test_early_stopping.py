@@ -0,0 +1,54 @@
+# tests/test_early_stopping.py
+import lightgbm as lgb
+import xgboost as xgb
+from catboost import CatBoostClassifier
+from sklearn.linear_model import LogisticRegression
+
+from src.training.trainer_05 import fit_with_early_stopping
+
+
+def test_boosting_models_stop_on_validation_split(make_data):
+    X_train, y_train = make_data(2000, 0)
+    X_val, y_val = make_data(500, 1)
+
+    models = [
+        xgb.XGBClassifier(n_estimators=1000, learning_rate=0.3),
+        lgb.LGBMClassifier(n_estimators=1000, learning_rate=0.3, verbose=-1),
+        CatBoostClassifier(iterations=1000, learning_rate=0.3, verbose=False, allow_writing_files=False),
+    ]
+    best = [fit_with_early_stopping(m, X_train, y_train, X_val, y_val, rounds=20) for m in models]
+    assert all(b is not None and b < 500 for b in best)
+
+    # 0-based for every library: best + 1 trees are used
+    xgb_model, lgb_model, cat_model = models
+    assert best[0] == xgb_model.best_iteration
+    assert best[1] + 1 == lgb_model.best_iteration_
+    assert best[2] + 1 == cat_model.tree_count_
+
+    assert fit_with_early_stopping(LogisticRegression(), X_train, y_train, X_val, y_val) is None
+
+
+def test_train_model_on_matrices_logs_best_iteration(tmp_path, monkeypatch, make_data):
+    import mlflow
+
+    from src.training import trainer_05
+
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri(f"file://{tmp_path}")
+    mlflow.set_experiment("early_stopping_test")
+    monkeypatch.setattr(trainer_05, "hardware_run_params", lambda: {})
+    monkeypatch.setattr(trainer_05, "log_pipeline", lambda name, pipeline: None)
+
+    X_train, y_train = make_data(1000, 0)
+    X_val, y_val = make_data(300, 1)
+    try:
+        pipeline, f1 = trainer_05.train_model_on_matrices(
+            "LightGBM", lgb.LGBMClassifier(n_estimators=500, verbose=-1),
+            None, X_train, y_train, X_val, y_val,
+        )
+        run = mlflow.search_runs(search_all_experiments=True).iloc[0]
+    finally:
+        mlflow.set_tracking_uri(None)
+
+    assert f1 > 0.5
+    assert run["metrics.best_iteration"] < 500
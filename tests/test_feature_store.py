@@ -0,0 +1,89 @@
+# tests/test_feature_store.py
+import os
+
+import pandas as pd
+
+from src.training import feature_store
+
+
+def test_versions_lookup_and_export_stamp(tmp_path, monkeypatch):
+    monkeypatch.setattr(feature_store, "STORE_DIR", tmp_path / "store")
+    monkeypatch.setattr(feature_store, "PARTITION_ROWS", 10)
+
+    df = pd.DataFrame({
+        "invoice_id": range(25),
+        "total_amount": [float(i) for i in range(25)],
+    })
+    assert feature_store.find_version("d" * 64, "s" * 64) is None
+
+    version_dir = feature_store.materialize(df, "d" * 64, "s" * 64)
+    assert feature_store.find_version("d" * 64, "s" * 64) == version_dir
+    assert len(list(version_dir.glob("part-*.parquet"))) == 3
+
+    hits = feature_store.lookup([21, 3, 99])
+    assert hits["invoice_id"].tolist() == [21, 3, 99]
+    assert hits["total_amount"].iloc[:2].tolist() == [21.0, 3.0]
+    assert hits["total_amount"].isna().iloc[2]
+
+    export = tmp_path / "model_ready.csv"
+    df.to_csv(export, index=False)
+    feature_store.set_latest(version_dir, export_path=export)
+    pd.testing.assert_frame_equal(feature_store.read_if_current(export), df)
+
+    # Any edit to the CSV falls back to reading it directly
+    df.head(5).to_csv(export, index=False)
+    assert feature_store.read_if_current(export) is None
+
+
+def test_temporal_columns_refresh_without_touching_static(tmp_path, monkeypatch):
+    monkeypatch.setattr(feature_store, "STORE_DIR", tmp_path / "store")
+
+    static = pd.DataFrame({
+        "invoice_id": range(3),
+        "invoice_date": pd.to_datetime(["2024-01-01", "2024-06-01", None]),
+        "failure_label": [0, 1, 1],
+    })
+    version_dir = feature_store.materialize(static, "d" * 64, "s" * 64)
+    columns = ["invoice_id", "invoice_date", "invoice_age_days", "failure_label"]
+
+    ages = {}
+    for as_of in ["2024-12-31", "2025-12-31"]:
+        age = (pd.Timestamp(as_of) - static["invoice_date"]).dt.days
+        timed = pd.DataFrame({"invoice_id": static["invoice_id"], "invoice_age_days": age})
+        temporal = feature_store.materialize_temporal(timed, version_dir, "t" * 64, as_of, columns)
+        assert feature_store.find_temporal(version_dir, "t" * 64, as_of) == temporal
+        ages[as_of] = feature_store.read_features(version_dir, temporal=temporal)
+
+    assert ages["2024-12-31"].columns.tolist() == columns
+    assert ages["2024-12-31"]["invoice_age_days"].tolist()[:2] == [365, 213]
+    assert ages["2025-12-31"]["invoice_age_days"].tolist()[:2] == [730, 578]
+    assert len(list(version_dir.glob("part-*.parquet"))) == 1
+
+
+def test_store_and_csv_paths_load_same_dtypes(tmp_path, monkeypatch):
+    from src.training import load_data_01
+
+    monkeypatch.setattr(feature_store, "STORE_DIR", tmp_path / "store")
+    export = tmp_path / "model_ready.csv"
+    monkeypatch.setattr(load_data_01, "DATA_FILE", export)
+
+    df = pd.DataFrame({
+        "invoice_id": range(3),
+        "invoice_date": pd.to_datetime(["2024-01-01", "2024-06-01", None]),
+        "failure_label": [0, 1, 1],
+    })
+    version_dir = feature_store.materialize(df, "d" * 64, "s" * 64)
+    df.to_csv(export, index=False)
+    feature_store.set_latest(version_dir, export_path=export)
+
+    from_store = load_data_01.load_data()
+    assert feature_store.read_if_current(export) is not None
+
+    # Same bytes, new mtime → the CSV fallback
+    stat = export.stat()
+    os.utime(export, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+    assert feature_store.read_if_current(export) is None
+    from_csv = load_data_01.load_data()
+
+    assert from_csv["invoice_date"].dtype.kind == "M"
+    pd.testing.assert_frame_equal(from_csv, from_store)
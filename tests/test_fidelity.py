@@ -0,0 +1,58 @@
+# tests/test_fidelity.py
+import numpy as np
+import optuna
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from src.training import fidelity
+
+
+def test_schedule_always_ends_on_full_data():
+    assert fidelity.parse_schedule("") == ()
+    assert fidelity.parse_schedule("0.2, 0.05") == (0.05, 0.2, 1.0)
+    assert fidelity.parse_schedule("0.1,1.0") == (0.1, 1.0)
+    with pytest.raises(ValueError):
+        fidelity.parse_schedule("0,0.5")
+
+
+def test_rungs_are_nested_stratified_and_materialized_once(tmp_path, make_data):
+    X, y = make_data(2000, 0, n_features=3, threshold=0.8, noise=0)
+    schedule = (0.05, 0.2, 1.0)
+
+    rungs = fidelity.materialize_rungs(X, y, schedule, tmp_path)
+    (_, X5, y5), (_, X20, _), (_, X100, _) = rungs
+
+    assert set(X5.index) <= set(X20.index) <= set(X100.index)
+    assert len(X100) == len(X)
+    assert abs(y5.mean() - y.mean()) < 0.02
+    # Written via temp file + rename: no partial files left behind
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["0.05.npy", "0.2.npy", "1.0.npy"]
+
+    # Stored positions win over recomputation
+    np.save(tmp_path / "0.05.npy", np.arange(10))
+    again = fidelity.materialize_rungs(X, y, schedule, tmp_path)
+    assert list(again[0][1].index) == list(range(10))
+
+
+def test_trials_below_the_rung_cut_are_not_promoted(make_data):
+    X_train, y_train = make_data(1000, 0, n_features=3, threshold=0.8, noise=0)
+    X_val, y_val = make_data(300, 1, n_features=3, threshold=0.8, noise=0)
+    rungs = fidelity.materialize_rungs(X_train, y_train, (0.1, 1.0))
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.create_study(
+        direction="maximize", pruner=optuna.pruners.ThresholdPruner(lower=1.1)
+    )
+
+    def objective(trial):
+        fidelity.fit_on_rungs(
+            trial, StandardScaler(), LogisticRegression(), rungs, X_val, y_val
+        )
+        return 1.0
+
+    study.optimize(objective, n_trials=1)
+    trial = study.trials[0]
+
+    assert trial.state == optuna.trial.TrialState.PRUNED
+    assert trial.user_attrs["rung_fraction"] == 0.1
+    assert fidelity.rung_counts(study, (0.1, 1.0)) == [1, 0]
@@ -0,0 +1,55 @@
+# tests/test_label_rules.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.training.label_rules import CompiledRules, legacy_failure_label, make_benchmark_frame
+
+
+def test_default_rules_match_legacy_labels():
+    df = make_benchmark_frame(20_000, seed=7)
+    engine = CompiledRules.from_file()
+    mask = engine.evaluate(df)
+
+    np.testing.assert_array_equal((mask != 0).astype(int), legacy_failure_label(df).to_numpy())
+
+
+def test_mask_records_each_fired_rule():
+    engine = CompiledRules([
+        {"name": "cheap", "column": "total_amount", "op": "lt", "value": 10},
+        {"name": "no_vendor", "column": "vendor_name", "op": "isnull"},
+        {"name": "not_usd", "column": "currency", "op": "ne", "value": "USD"},
+        {"name": "old", "column": "invoice_date", "op": "le", "value": "2010-12-31", "type": "date"},
+    ])
+    df = pd.DataFrame({
+        "total_amount": [5.0, 50.0, np.nan, 1.0],
+        "vendor_name": ["a", None, "b", None],
+        "currency": ["USD", "USD", None, "EUR"],
+        "invoice_date": ["2020-01-01", "2005-05-05", "not a date", "2001-01-01"],
+    })
+
+    mask = engine.evaluate(df)
+
+    assert mask.tolist() == [0b0001, 0b1010, 0b0100, 0b1111]
+    assert engine.fired(mask[1]) == ["no_vendor", "old"]
+    assert engine.counts(mask) == {"cheap": 2, "no_vendor": 2, "not_usd": 2, "old": 2}
+
+
+def test_unknown_op_is_rejected():
+    with pytest.raises(ValueError, match="unknown op"):
+        CompiledRules([{"name": "x", "column": "currency", "op": "like", "value": "U%"}])
+
+
+def test_rule_engine_changes_the_feature_definition_hash(monkeypatch):
+    from src.training import build_failure_labels, feature_store, label_rules
+
+    def static_hash():
+        return feature_store.definition_hash(
+            build_failure_labels.STATIC_FUNCTIONS, build_failure_labels.static_definition_params()
+        )
+
+    before = static_hash()
+    assert label_rules.CompiledRules in build_failure_labels.STATIC_FUNCTIONS
+
+    monkeypatch.setitem(label_rules.COMPARE_OPS, "eq", np.not_equal)
+    assert static_hash() != before
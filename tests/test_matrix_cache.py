@@ -0,0 +1,47 @@
+# tests/test_matrix_cache.py
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.training import matrix_cache
+
+
+def make_split(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "vendor_name": rng.choice(["a", "b", "c"], n),
+        "total_amount": rng.uniform(0, 100, n),
+    })
+
+
+def make_preprocessor():
+    return ColumnTransformer(
+        [
+            ("cat", OneHotEncoder(handle_unknown="ignore"), ["vendor_name"]),
+            ("num", StandardScaler(), ["total_amount"]),
+        ],
+        sparse_threshold=1.0,
+    )
+
+
+def test_fit_once_then_reuse_memory_mapped_matrices(tmp_path, monkeypatch):
+    monkeypatch.setattr(matrix_cache, "CACHE_DIR", tmp_path)
+    X_train, X_val, X_test = make_split(200, 0), make_split(50, 1), make_split(50, 2)
+
+    fitted, matrices = matrix_cache.transform_splits(make_preprocessor(), X_train, X_val, X_test)
+    expected = make_preprocessor().fit(X_train).transform(X_val)
+
+    assert sparse.issparse(matrices["val"])
+    assert not matrices["val"].data.flags.owndata  # view of the mapped file
+    np.testing.assert_allclose(matrices["val"].toarray(), expected.toarray())
+    np.testing.assert_allclose(fitted.transform(X_val).toarray(), expected.toarray())
+
+    # Second call hits the cache; a different split gets a different entry
+    _, again = matrix_cache.transform_splits(make_preprocessor(), X_train, X_val, X_test)
+    np.testing.assert_allclose(again["train"].toarray(), matrices["train"].toarray())
+    assert len(list(tmp_path.iterdir())) == 1
+
+    matrix_cache.transform_splits(make_preprocessor(), X_train.iloc[1:], X_val, X_test)
+    assert len(list(tmp_path.iterdir())) == 2
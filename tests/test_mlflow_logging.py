@@ -0,0 +1,81 @@
+# tests/test_mlflow_logging.py
+import threading
+
+import mlflow
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.training import artifact_store, mlflow_utils_04
+
+
+@pytest.fixture
+def tracking(tmp_path, monkeypatch):
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri(f"file://{tmp_path}")
+    experiment_id = mlflow.set_experiment("logging_test").experiment_id
+    yield experiment_id
+    mlflow.set_tracking_uri(None)
+
+
+def test_params_and_metrics_are_batched(tracking, monkeypatch):
+    calls = []
+    log_batch = mlflow.tracking.MlflowClient.log_batch
+
+    def counting_log_batch(self, run_id, **kwargs):
+        calls.append(kwargs)
+        return log_batch(self, run_id, **kwargs)
+
+    monkeypatch.setattr(mlflow.tracking.MlflowClient, "log_batch", counting_log_batch)
+
+    with mlflow.start_run() as run:
+        mlflow_utils_04.log_params({f"p{i}": i for i in range(150)})
+        mlflow_utils_04.log_metrics({"f1_score": 0.9, "best_iteration": 12})
+
+    data = mlflow.get_run(run.info.run_id).data
+    assert len(calls) == 3  # 100 + 50 params, then all metrics at once
+    assert len(data.params) == 150 and data.params["p149"] == "149"
+    assert data.metrics == {"f1_score": 0.9, "best_iteration": 12}
+
+
+def test_pipeline_upload_runs_in_background_and_flushes(tracking, monkeypatch):
+    monkeypatch.setattr(mlflow_utils_04, "ARTIFACT_STORE", "mlflow")
+    rng = np.random.default_rng(0)
+    X, y = rng.random((50, 3)), np.tile([0, 1], 25)
+    pipeline = Pipeline([("scale", StandardScaler()), ("model", LogisticRegression())]).fit(X, y)
+
+    with mlflow.start_run() as run:
+        mlflow_utils_04.log_pipeline("LogisticRegression", pipeline)
+
+    assert mlflow_utils_04.flush_artifacts() == []
+    models = mlflow.search_logged_models(experiment_ids=[tracking], output_format="list")
+    assert [m.source_run_id for m in models] == [run.info.run_id]
+
+
+def test_logging_outside_a_run_raises(tracking):
+    with pytest.raises(RuntimeError, match="No active MLflow run"):
+        mlflow_utils_04.log_params({"p": 1})
+    assert mlflow.active_run() is None
+
+
+def test_pipeline_is_snapshotted_before_a_shared_step_is_refit(tracking, tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_store, "CAS_DIR", tmp_path / ".cas")
+    monkeypatch.setattr(mlflow_utils_04, "ARTIFACT_STORE", "cas")
+    rng = np.random.default_rng(0)
+    X, y = rng.random((50, 3)), np.tile([0, 1], 25)
+    scaler = StandardScaler()
+    first = Pipeline([("scale", scaler), ("model", LogisticRegression())]).fit(X, y)
+
+    # Keep the uploader busy so the job is still queued during the refit
+    release = threading.Event()
+    mlflow_utils_04._get_uploader().submit("blocker", release.wait)
+    with mlflow.start_run() as run:
+        mlflow_utils_04.log_pipeline("LogisticRegression", first)
+    Pipeline([("scale", scaler), ("model", LogisticRegression())]).fit(X * 100, y)
+    release.set()
+
+    assert mlflow_utils_04.flush_artifacts() == []
+    logged = artifact_store.load_pipeline_ref(run.info.run_id, "LogisticRegression")
+    np.testing.assert_allclose(logged.named_steps["scale"].mean_, X.mean(axis=0))
@@ -0,0 +1,24 @@
+# tests/test_parallel_training.py
+import lightgbm as lgb
+from catboost import CatBoostClassifier
+from sklearn.linear_model import LogisticRegression
+
+from src.training.parallel_training import allocate_cores, set_thread_budget
+
+NAMES = ["LogisticRegression", "RandomForest", "XGBoost", "LightGBM", "CatBoost"]
+
+
+def test_core_budget_never_oversubscribes():
+    for cores in [1, 3, 5, 8, 16, 64]:
+        budget = allocate_cores(NAMES, cores)
+        assert min(budget.values()) >= 1
+        assert sum(budget.values()) == max(cores, len(NAMES))
+
+    budget = allocate_cores(NAMES, 16)
+    assert budget["CatBoost"] > budget["LogisticRegression"]
+
+
+def test_thread_budget_uses_each_library_parameter():
+    assert set_thread_budget(CatBoostClassifier(), 3).get_params()["thread_count"] == 3
+    assert set_thread_budget(lgb.LGBMClassifier(), 2).get_params()["n_jobs"] == 2
+    assert set_thread_budget(LogisticRegression(), 1).get_params()["n_jobs"] == 1
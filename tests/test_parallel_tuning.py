@@ -0,0 +1,67 @@
+# tests/test_parallel_tuning.py
+import platform
+import subprocess
+import sys
+
+import optuna
+from optuna.trial import TrialState
+
+from src.training import parallel_tuning
+
+
+def objective(trial):
+    return -(trial.suggest_float("x", -1, 1) ** 2)
+
+
+def resume(name, journal):
+    """A new process sees the stored trials through the journal file."""
+    return parallel_tuning.load_study(name, parallel_tuning.open_storage(journal))
+
+
+def test_journal_study_resumes_after_interruption(tmp_path):
+    journal = tmp_path / "tuning.journal"
+    name = parallel_tuning.study_name("xgboost", "onehot", "abc123")
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    study = parallel_tuning.load_study(name, parallel_tuning.open_storage(journal))
+    study.optimize(objective, n_trials=3)
+
+    # Left RUNNING by a worker that has exited, as after a crash
+    crashed = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                             capture_output=True, text=True, check=True)
+    dead = {"host": platform.node(), "pid": int(crashed.stdout)}
+    study.ask().set_user_attr(parallel_tuning.OWNER_ATTR, dead)
+
+    resumed = resume(name, journal)
+    assert parallel_tuning.fail_interrupted_trials(resumed) == 1
+    assert parallel_tuning.finished_trials(resumed) == 3
+    assert not resumed.get_trials(states=(TrialState.RUNNING,))
+    assert resumed.best_value == study.best_value
+
+
+def test_trials_of_live_processes_are_not_failed(tmp_path, monkeypatch):
+    journal = tmp_path / "tuning.journal"
+    name = parallel_tuning.study_name("xgboost", "onehot", "abc123")
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = parallel_tuning.load_study(name, parallel_tuning.open_storage(journal))
+
+    # A concurrent run on this host, one on another host, one not tagged yet
+    study.ask().set_user_attr(parallel_tuning.OWNER_ATTR, parallel_tuning.trial_owner())
+    study.ask().set_user_attr(parallel_tuning.OWNER_ATTR, {"host": "other-host", "pid": 1})
+    study.ask()
+
+    assert parallel_tuning.fail_interrupted_trials(resume(name, journal)) == 0
+    assert len(study.get_trials(states=(TrialState.RUNNING,))) == 3
+
+    # Untagged past the grace period: the worker died before tagging it
+    monkeypatch.setattr(parallel_tuning, "UNOWNED_GRACE_SECONDS", -1)
+    assert parallel_tuning.fail_interrupted_trials(resume(name, journal)) == 1
+
+
+def test_workers_per_family_keeps_two_threads_per_trial(monkeypatch):
+    monkeypatch.setattr(parallel_tuning, "TUNING_WORKERS", None)
+    assert parallel_tuning.workers_per_family(1) == 1
+    assert parallel_tuning.workers_per_family(8) == 4
+
+    monkeypatch.setattr(parallel_tuning, "TUNING_WORKERS", "3")
+    assert parallel_tuning.workers_per_family(8) == 3
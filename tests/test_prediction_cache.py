@@ -0,0 +1,64 @@
+# tests/test_prediction_cache.py
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.training import load_data_01, prediction_cache, split_cache
+from tests.test_split_cache import write_dataset
+
+
+def setup_stage(tmp_path, monkeypatch):
+    data_file = tmp_path / "model_ready.csv"
+    write_dataset(data_file)
+    monkeypatch.setattr(load_data_01, "DATA_FILE", data_file)
+    monkeypatch.setattr(split_cache, "SPLITS_DIR", tmp_path / "splits")
+    monkeypatch.setattr(prediction_cache, "PREDICTIONS_DIR", tmp_path / "predictions")
+
+    X_train, _, X_test, y_train, _, y_test = split_cache.load_split()
+    pipeline = Pipeline([
+        ("preprocessor", ColumnTransformer([
+            ("num", StandardScaler(), ["total_amount", "blur_flag"]),
+            ("cat", Pipeline([
+                ("impute", SimpleImputer(strategy="constant", fill_value="missing")),
+                ("onehot", OneHotEncoder(handle_unknown="ignore")),
+            ]), ["vendor_name"]),
+        ])),
+        ("model", LogisticRegression()),
+    ]).fit(X_train, y_train)
+
+    model_path = tmp_path / "best_model.pkl"
+    joblib.dump(pipeline, model_path)
+    return pipeline, model_path, X_test, y_test
+
+
+def test_predictions_match_pipeline_and_are_reused(tmp_path, monkeypatch):
+    pipeline, model_path, X_test, y_test = setup_stage(tmp_path, monkeypatch)
+
+    first = prediction_cache.load_predictions(model_path)
+    np.testing.assert_array_equal(first.y_pred, pipeline.predict(X_test))
+    np.testing.assert_allclose(first.y_prob, pipeline.predict_proba(X_test)[:, 1])
+    pd.testing.assert_series_equal(first.y_true, y_test)
+    assert first.features.shape == (len(y_test), len(first.feature_names))
+    assert "num__total_amount" in first.feature_names
+
+    def no_inference(_):
+        raise AssertionError("cached predictions should be reused")
+
+    monkeypatch.setattr(prediction_cache, "_predict", no_inference)
+    second = prediction_cache.load_predictions(model_path)
+    assert second.key == first.key
+    np.testing.assert_array_equal(second.y_prob, first.y_prob)
+
+
+def test_new_model_file_gets_new_entry(tmp_path, monkeypatch):
+    pipeline, model_path, _, _ = setup_stage(tmp_path, monkeypatch)
+    key = prediction_cache.prediction_key(model_path)
+
+    pipeline.set_params(model__C=0.01)
+    joblib.dump(pipeline, model_path)
+    assert prediction_cache.prediction_key(model_path) != key
@@ -0,0 +1,47 @@
+# tests/test_pruning.py
+import lightgbm as lgb
+import optuna
+import pytest
+import xgboost as xgb
+from catboost import CatBoostClassifier
+from sklearn.preprocessing import StandardScaler
+
+from src.training.pruning import REPORT_INTERVAL, fit_trial, make_pruner, pruning_summary
+
+
+class PruneAtFirstReport(optuna.pruners.BasePruner):
+    def prune(self, study, trial):
+        return True
+
+
+@pytest.mark.parametrize("model", [
+    xgb.XGBClassifier(n_estimators=300, eval_metric="logloss"),
+    lgb.LGBMClassifier(n_estimators=300, verbose=-1),
+    CatBoostClassifier(iterations=300, verbose=False, allow_writing_files=False),
+])
+def test_every_library_reports_and_stops_pruned_trials(model, make_data):
+    X_train, y_train = make_data(1000, 0)
+    X_val, y_val = make_data(300, 1)
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.create_study(direction="maximize", pruner=PruneAtFirstReport())
+
+    def objective(trial):
+        fit_trial(trial, StandardScaler(), model, X_train, y_train, X_val, y_val)
+        return 1.0
+
+    study.optimize(objective, n_trials=1)
+    trial = study.trials[0]
+
+    assert trial.state == optuna.trial.TrialState.PRUNED
+    assert trial.user_attrs["rounds_trained"] == REPORT_INTERVAL
+    assert list(trial.intermediate_values) == [REPORT_INTERVAL]
+    assert trial.intermediate_values[REPORT_INTERVAL] < 0  # -logloss
+
+    summary = pruning_summary(study)
+    assert summary["pruned"] == 1 and summary["seconds_saved"] > 0
+
+
+def test_unknown_pruner_is_rejected():
+    assert isinstance(make_pruner("hyperband"), optuna.pruners.HyperbandPruner)
+    with pytest.raises(ValueError):
+        make_pruner("asha")
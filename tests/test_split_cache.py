@@ -0,0 +1,62 @@
+# tests/test_split_cache.py
+import numpy as np
+import pandas as pd
+
+from src.training import load_data_01, split_cache
+
+
+def write_dataset(path, n=400):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "invoice_id": np.arange(n),
+        "vendor_name": rng.choice(["acme", "globex", None], n),
+        "invoice_date": pd.date_range("2020-01-01", periods=n, freq="D").astype(str),
+        "total_amount": rng.uniform(0, 1000, n),
+        "blur_flag": rng.integers(0, 2, n),
+        "failure_label": rng.integers(0, 2, n),
+    })
+    df["failure_rule_mask"] = df["failure_label"] * rng.integers(1, 32, n)
+    df.to_csv(path, index=False)
+
+
+def assert_same(left, right):
+    for a, b in zip(left, right):
+        if isinstance(a, pd.DataFrame):
+            pd.testing.assert_frame_equal(a, b)
+        else:
+            pd.testing.assert_series_equal(a, b)
+
+
+def test_cached_split_matches_split_data(tmp_path, monkeypatch):
+    data_file = tmp_path / "model_ready.csv"
+    write_dataset(data_file)
+    monkeypatch.setattr(load_data_01, "DATA_FILE", data_file)
+    monkeypatch.setattr(split_cache, "SPLITS_DIR", tmp_path / "splits")
+
+    expected = load_data_01.split_data(load_data_01.load_data())
+    first = split_cache.load_split()
+    second = split_cache.load_split()
+
+    assert_same(first, expected)
+    assert_same(second, expected)
+    # The rule mask encodes the label; it never becomes a feature
+    assert all("failure_rule_mask" not in X.columns for X in first[:3])
+    assert len(list((tmp_path / "splits").glob("*/meta.json"))) == 1
+
+    # Column projection keeps rows and targets
+    X_train, _, _, y_train, _, _ = split_cache.load_split(columns=["vendor_name"])
+    assert list(X_train.columns) == ["vendor_name"]
+    pd.testing.assert_index_equal(X_train.index, expected[0].index)
+    pd.testing.assert_series_equal(y_train, expected[3])
+
+
+def test_new_dataset_version_gets_new_split(tmp_path, monkeypatch):
+    data_file = tmp_path / "model_ready.csv"
+    write_dataset(data_file)
+    monkeypatch.setattr(load_data_01, "DATA_FILE", data_file)
+    monkeypatch.setattr(split_cache, "SPLITS_DIR", tmp_path / "splits")
+
+    key = split_cache.split_key()
+    write_dataset(data_file, n=300)
+    assert split_cache.split_key() != key
+    assert len(split_cache.load_split()[0]) == 210
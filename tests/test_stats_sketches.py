@@ -0,0 +1,46 @@
+# tests/test_stats_sketches.py
+import numpy as np
+import pandas as pd
+
+from src.stages.stats_sketches import (
+    CLEANED_SPEC,
+    DatasetSketch,
+    load_or_build,
+    merge_sketches,
+    save_sketch_for,
+    sketch_path,
+)
+
+
+def test_sharded_sketches_merge_to_full_statistics(tmp_path, make_invoices):
+    shards = [make_invoices(20_000, seed)[0] for seed in range(3)]
+    full = pd.concat(shards, ignore_index=True)
+
+    paths = []
+    for i, shard in enumerate(shards):
+        csv = tmp_path / f"part_{i}.csv"
+        shard.to_csv(csv, index=False)
+        save_sketch_for(csv, DatasetSketch(**CLEANED_SPEC).update(shard))
+        paths.append(sketch_path(csv))
+
+    merged = merge_sketches(paths)
+
+    assert merged.rows == len(full)
+    assert merged.null_counts["invoice_number"] == full["invoice_number"].isna().sum()
+    assert np.isclose(merged.sums["total_amount"], full["total_amount"].sum())
+
+    true_distinct = full["vendor_name"].nunique()
+    assert abs(merged.distinct_count("vendor_name") - true_distinct) / true_distinct < 0.03
+
+    p50 = merged.quantiles("total_amount", [0.5])[0]
+    true_rank = (full["total_amount"] <= p50).mean()
+    assert abs(true_rank - 0.5) < 0.02
+
+
+def test_stale_sketch_is_rebuilt(tmp_path, make_invoices):
+    csv = tmp_path / "fatura_cleaned.csv"
+    make_invoices(100, 0)[0].to_csv(csv, index=False)
+    assert load_or_build(csv, CLEANED_SPEC).rows == 100
+
+    make_invoices(250, 1)[0].to_csv(csv, index=False)
+    assert load_or_build(csv, CLEANED_SPEC).rows == 250
@@ -0,0 +1,57 @@
+# tests/test_text_features.py
+import pickle
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.training import preprocessing_02, text_features
+
+
+def test_preprocessor_stacks_hashed_text_without_densifying(tmp_path, monkeypatch):
+    ocr = tmp_path / "fatura_ocr.csv"
+    pd.DataFrame({
+        "file_name": ["a.jpg", "b.jpg", "c.jpg"],
+        "ocr_text": ["INVOICE 001 total 10 USD", None, "Bill to ACME total 99 EUR"],
+    }).to_csv(ocr, index=False)
+
+    matrix = text_features.build_text_matrix(ocr, chunk_size=2)
+    assert matrix.shape == (3, text_features.N_FEATURES)
+    assert matrix[1].nnz == 0
+
+    npz = tmp_path / "text.npz"
+    sparse.save_npz(npz, matrix)
+    monkeypatch.setattr(preprocessing_02, "TEXT_FEATURES_FILE", npz)
+
+    X = pd.DataFrame({
+        "invoice_id": [2, 0, 7],
+        "vendor_name": ["ACME", "X", "Y"],
+        "currency": ["EUR", "USD", "USD"],
+        "invoice_number_length": [3, 4, 5],
+        "invoice_age_days": [10, 20, 30],
+        "total_amount": [99.0, 10.0, 5.0],
+        "ocr_text_length": [0, 0, 0],
+        "blur_flag": [0, 0, 0],
+    })
+    pre = preprocessing_02.build_preprocessor(text_features=True)
+    out = pre.fit_transform(X)
+
+    assert sparse.issparse(out)
+    text = out[:, -text_features.N_FEATURES:]
+    assert (text[0] != matrix[2]).nnz == 0
+    assert (text[1] != matrix[0]).nnz == 0
+    assert text[2].nnz == 0  # unknown invoice → zero row
+
+    # Raw text at scoring time is hashed, not looked up by invoice_id;
+    # cache is not pickled
+    restored = pickle.loads(pickle.dumps(pre))
+    assert "_cache" not in restored.named_steps["columns"].named_transformers_["text"].__dict__
+    new_text = ["Credit note 42 total 7 TRY", None, ""]
+    scored = restored.transform(X.assign(ocr_text=new_text))[:, -text_features.N_FEATURES:]
+    assert (scored[0] != text_features.hash_texts(new_text[:1])[0]).nnz == 0
+    assert (scored[0] != matrix[2]).nnz > 0
+    assert (scored[1] != matrix[0]).nnz == 0 and matrix[0].nnz > 0  # no text → stored row
+    assert scored[2].nnz == 0  # empty text is hashed, not looked up
+
+    # Without the column the stored rows are used, like in training
+    np.testing.assert_allclose(restored.transform(X).toarray(), out.toarray())
@@ -0,0 +1,47 @@
+# tests/test_trial_checkpoints.py
+import os
+
+import optuna
+
+from src.training import trial_checkpoints
+
+
+def test_lru_cap_never_evicts_the_best_trial(tmp_path, monkeypatch):
+    monkeypatch.setattr(trial_checkpoints, "CHECKPOINT_DIR", tmp_path)
+    monkeypatch.setattr(trial_checkpoints, "MAX_CHECKPOINTS", 2)
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.create_study(study_name="s", direction="maximize")
+    scores = [0.9, 0.1, 0.2, 0.3, 0.4]
+
+    def objective(trial):
+        value = scores[trial.number]
+        trial_checkpoints.save_checkpoint(trial, {"trial": trial.number}, value)
+        # Distinct mtimes so LRU order is deterministic
+        path = trial_checkpoints.checkpoint_path("s", trial.number)
+        os.utime(path, (trial.number, trial.number))
+        return value
+
+    study.optimize(objective, n_trials=len(scores))
+
+    kept = sorted(p.name for p in (tmp_path / "s").iterdir())
+    assert kept == ["trial_00000.pkl", "trial_00004.pkl"]
+    assert trial_checkpoints.load_checkpoint(study.best_trial, "s") == {"trial": 0}
+    assert trial_checkpoints.load_checkpoint(study.trials[1], "s") is None
+
+
+def test_checkpoint_of_another_study_is_not_promoted(tmp_path, monkeypatch):
+    monkeypatch.setattr(trial_checkpoints, "CHECKPOINT_DIR", tmp_path)
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    previous = optuna.create_study(study_name="old_split", direction="maximize")
+
+    def objective(trial):
+        trial_checkpoints.save_checkpoint(trial, {"study": "old_split"}, 0.9)
+        return 0.9
+
+    previous.optimize(objective, n_trials=1)
+
+    # A warm-started study that copied the trial without its checkpoint attr
+    # stripped still must not load the old pipeline
+    current = optuna.create_study(study_name="new_split", direction="maximize")
+    current.add_trials(previous.trials)
+    assert trial_checkpoints.load_checkpoint(current.best_trial, "new_split") is None
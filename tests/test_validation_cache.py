@@ -0,0 +1,38 @@
+# tests/test_validation_cache.py
+import os
+
+from src.stages import validation_cache
+from src.stages.validation_cache import fingerprint, load_result, save_result
+
+
+def test_result_reused_until_input_or_rules_change(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.stages.validation_cache.CACHE_DIR", tmp_path / "cache")
+    monkeypatch.delenv("LEDGERX_FORCE_VALIDATION", raising=False)
+
+    data = tmp_path / "fatura_cleaned.csv"
+    data.write_text("invoice_number,total_amount\nINV1,10.0\n")
+    rules = {"expected_columns": ["invoice_number", "total_amount"]}
+
+    fp = fingerprint([data], rules)
+    assert load_result("schema_check", fp) is None
+
+    save_result("schema_check", fp, {"report": "ok"})
+    assert load_result("schema_check", fingerprint([data], rules)) == {"report": "ok"}
+
+    # A different rule set must not hit the cache
+    assert fingerprint([data], {"expected_columns": ["invoice_number"]}) != fp
+
+    # Same content rewritten (new mtime) → same fingerprint via the streaming hash
+    stat = data.stat()
+    data.write_text("invoice_number,total_amount\nINV1,10.0\n")
+    os.utime(data, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+    assert fingerprint([data], rules) == fp
+
+    # Changed content → cache miss
+    data.write_text("invoice_number,total_amount\nINV1,99.0\n")
+    assert load_result("schema_check", fingerprint([data], rules)) is None
+
+    # Force flag bypasses a matching entry
+    monkeypatch.setenv("LEDGERX_FORCE_VALIDATION", "1")
+    save_result("schema_check", fp, {"report": "ok"})
+    assert validation_cache.load_result("schema_check", fp) is None
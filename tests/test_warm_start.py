@@ -0,0 +1,59 @@
+# tests/test_warm_start.py
+import optuna
+from optuna.trial import TrialState
+
+from src.training import parallel_tuning, warm_start
+
+
+def objective(trial):
+    trial.set_user_attr("checkpoint", f"trial_{trial.number:05d}.pkl")
+    return -(trial.suggest_float("x", -1, 1) ** 2) + trial.suggest_int("depth", 2, 8) / 100
+
+
+def make_previous(storage, fingerprint):
+    study = parallel_tuning.load_study("ledgerx_xgboost_onehot_old", storage)
+    study.set_user_attr("data_fingerprint", fingerprint)
+    study.optimize(objective, n_trials=6)
+    return study
+
+
+def test_new_study_enqueues_previous_best_trials(tmp_path):
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    storage = parallel_tuning.open_storage(tmp_path / "tuning.journal")
+    previous = make_previous(storage, {"rows": 1000, "pos_rate": 0.3, "fidelity": []})
+
+    report = tmp_path / "tuning_report.txt"
+    report.write_text("Best Model: xgboost\n\nBest Parameters:\n- x: 0.5\n- depth: 3\n")
+
+    study = parallel_tuning.load_study("ledgerx_xgboost_onehot_new", storage)
+    budget = warm_start.seed_study(
+        study, storage, "ledgerx_xgboost_onehot_", "xgboost", "XGBoost",
+        {"rows": 5000, "pos_rate": 0.1, "fidelity": []}, 20,
+        report_path=report, mode="history",  # fingerprint too far: no history reuse
+    )
+
+    waiting = [
+        t.system_attrs["fixed_params"] for t in study.get_trials(states=(TrialState.WAITING,))
+    ]
+    assert budget == 20
+    assert len(waiting) == warm_start.WARM_START_TRIALS + 1
+    assert waiting[0] == previous.best_params
+    assert {"x": 0.5, "depth": 3} in waiting
+
+
+def test_close_fingerprint_reuses_history_with_smaller_budget(tmp_path):
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    storage = parallel_tuning.open_storage(tmp_path / "tuning.journal")
+    previous = make_previous(storage, {"rows": 1000, "pos_rate": 0.3, "fidelity": []})
+
+    study = parallel_tuning.load_study("ledgerx_xgboost_onehot_new", storage)
+    budget = warm_start.seed_study(
+        study, storage, "ledgerx_xgboost_onehot_", "xgboost", "XGBoost",
+        {"rows": 1050, "pos_rate": 0.31, "fidelity": []}, 20, mode="history",
+    )
+
+    assert parallel_tuning.finished_trials(study) == 6
+    assert budget == 6 + 5
+    assert study.best_value == previous.best_value
+    # Copied trials never point at the previous study's fitted pipelines
+    assert all("checkpoint" not in t.user_attrs for t in study.trials)